@@ -0,0 +1,46 @@
+"""
+Per request overhead of resolving CustomerService dependencies.
+
+Compares creating Kafka producer and Firebase notificator for every request
+with the shared application lifetime suppliers.
+
+Usage:
+    python -m benchmarks.dependency_overhead [number_of_requests]
+"""
+
+import asyncio
+import sys
+import time
+
+from confluent_kafka import Producer
+
+from src.shared.dependencies import provide_customer_service
+from src.supplier.firebase_supplier import PushFirebaseNotificator
+from src.supplier.kafka_supplier import kafka_settings
+
+
+async def resolve_with_producer_per_request() -> None:
+    Producer(**{"bootstrap.servers": kafka_settings.bootstrap_servers})
+    PushFirebaseNotificator()
+    await provide_customer_service()
+
+
+async def resolve_with_shared_suppliers() -> None:
+    await provide_customer_service()
+
+
+async def measure(resolve, requests: int) -> str:
+    started = time.perf_counter()
+    for _ in range(requests):
+        await resolve()
+    elapsed = time.perf_counter() - started
+    return f"{elapsed / requests * 1_000_000:.1f}us per request"
+
+
+async def main(requests: int) -> None:
+    print("producer per request:", await measure(resolve_with_producer_per_request, requests))
+    print("shared suppliers:    ", await measure(resolve_with_shared_suppliers, requests))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,78 @@
+"""
+Per route overhead of resolving dependencies, with the shared service container
+and with the whole service graph rebuilt for every request as before.
+
+Database session and authenticated user are replaced with stubs, so only building the services is measured.
+
+Usage:
+    python -m benchmarks.dependency_resolution [number_of_requests]
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+
+from fastapi.dependencies.utils import solve_dependencies
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+
+from src.main import app
+from src.shared import dependencies
+from src.shared.dependencies import (
+    ServiceContainer,
+    provide_coach_service,
+    provide_customer_for_coach,
+    provide_database_unit_of_work,
+    provide_user_service,
+)
+
+
+async def provide_stub_user_service():
+    return await provide_coach_service()
+
+
+def make_request(route: APIRoute) -> Request:
+    return Request({
+        "type": "http",
+        "method": next(iter(route.methods)),
+        "path": route.path,
+        "headers": [],
+        "query_string": b"",
+        "path_params": {name: str(uuid.uuid4()) for name in route.param_convertors},
+    })
+
+
+async def measure(route: APIRoute, requests: int, rebuild_container: bool) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        if rebuild_container:
+            dependencies.container = ServiceContainer()
+        await solve_dependencies(
+            request=make_request(route), dependant=route.dependant, dependency_overrides_provider=app
+        )
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+async def main(requests: int) -> None:
+    app.dependency_overrides[provide_database_unit_of_work] = lambda: None
+    app.dependency_overrides[provide_user_service] = provide_stub_user_service
+    app.dependency_overrides[provide_customer_for_coach] = lambda: None
+    shared_container = dependencies.container
+
+    print(f"{'route':<70} {'rebuilt':>10} {'shared':>10}")
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+
+        rebuilt = await measure(route, requests, rebuild_container=True)
+        dependencies.container = shared_container
+        shared = await measure(route, requests, rebuild_container=False)
+        route_name = f"{','.join(sorted(route.methods))} {route.path}"
+        print(f"{route_name:<70} {rebuilt:>8.1f}us {shared:>8.1f}us")
+
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
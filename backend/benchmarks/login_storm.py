@@ -0,0 +1,40 @@
+"""
+Login storm: many concurrent password verifications on one worker.
+
+Compares event loop lag when bcrypt runs on the loop
+and when it runs in the password hashing executor.
+
+Usage:
+    python -m benchmarks.login_storm [number_of_logins]
+"""
+
+import asyncio
+import sys
+import time
+
+from benchmarks.utils import EventLoopLagProbe
+from src.utils import password_context, get_hashed_password, verify_password
+
+
+async def verify_on_event_loop(password: str, hashed_password: str) -> bool:
+    return password_context.verify(password, hashed_password)
+
+
+async def run_storm(verify, logins: int, hashed_password: str) -> str:
+    await asyncio.sleep(0.05)
+    with EventLoopLagProbe() as probe:
+        started = time.perf_counter()
+        await asyncio.gather(*(verify("qwerty123456", hashed_password) for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0.05)
+    return f"{logins} logins in {elapsed:.2f}s, {probe.report()}"
+
+
+async def main(logins: int) -> None:
+    hashed_password = await get_hashed_password("qwerty123456")
+    print("bcrypt on event loop: ", await run_storm(verify_on_event_loop, logins, hashed_password))
+    print("bcrypt in executor:   ", await run_storm(verify_password, logins, hashed_password))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
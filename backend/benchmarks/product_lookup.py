@@ -0,0 +1,80 @@
+"""
+Concurrent product lookups against local DynamoDB on one worker.
+
+Compares event loop lag when PynamoDB is called on the loop
+and when it's called in the DynamoDB executor.
+Product cache is cleared before every lookup, so each lookup reaches DynamoDB.
+
+Usage:
+    docker compose --profile benchmark up -d dynamodb-local
+    DYNAMO_DB_HOST=http://localhost:8001 python -m benchmarks.product_lookup [number_of_lookups]
+"""
+
+import asyncio
+import sys
+import time
+
+from benchmarks.utils import EventLoopLagProbe
+from src.persistence.dynamo_db_models import Product
+from src.repository.product_repository import ProductRepository
+from src.schemas.product_dto import ProductDtoSchema
+from src.shared.cache import product_cache
+from src.shared.config import DYNAMO_DB_HOST
+
+PRODUCTS_AMOUNT = 100
+
+
+def prepare_products() -> list[str]:
+    if not Product.exists():
+        Product.create_table(read_capacity_units=100, write_capacity_units=100, wait=True)
+
+    barcodes = [f"benchmark-{number}" for number in range(PRODUCTS_AMOUNT)]
+    with Product.batch_write() as batch:
+        for barcode in barcodes:
+            batch.save(
+                Product(
+                    barcode=barcode,
+                    name=f"Benchmark product {barcode}",
+                    type="gram",
+                    proteins=10,
+                    fats=10,
+                    carbs=10,
+                    calories=170,
+                    vendor_name="Benchmark",
+                    user_id="benchmark",
+                )
+            )
+    return barcodes
+
+
+async def get_product_on_event_loop(barcode: str) -> ProductDtoSchema:
+    product_cache.clear()
+    return ProductDtoSchema.from_product(Product.get(barcode))
+
+
+async def get_product_in_executor(barcode: str) -> ProductDtoSchema:
+    product_cache.clear()
+    return await ProductRepository().get_product_by_barcode(barcode)
+
+
+async def run_lookups(get_product, lookups: int, barcodes: list[str]) -> str:
+    await asyncio.sleep(0.05)
+    with EventLoopLagProbe() as probe:
+        started = time.perf_counter()
+        await asyncio.gather(*(get_product(barcodes[number % len(barcodes)]) for number in range(lookups)))
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0.05)
+    return f"{lookups} lookups in {elapsed:.2f}s, {probe.report()}"
+
+
+async def main(lookups: int) -> None:
+    if not DYNAMO_DB_HOST:
+        sys.exit("DYNAMO_DB_HOST must point to local DynamoDB, see the module docstring")
+
+    barcodes = prepare_products()
+    print("PynamoDB on event loop: ", await run_lookups(get_product_on_event_loop, lookups, barcodes))
+    print("PynamoDB in executor:   ", await run_lookups(get_product_in_executor, lookups, barcodes))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,33 @@
+"""
+Access token decoding throughput, with and without the verified token cache.
+
+Usage:
+    python -m benchmarks.token_decoding [number_of_decodes]
+"""
+
+import asyncio
+import sys
+import time
+
+from src.shared.cache import token_cache
+from src.utils import create_access_token, decode_jwt_token
+
+
+async def measure(decodes: int, token: str, cached: bool) -> str:
+    started = time.perf_counter()
+    for _ in range(decodes):
+        if not cached:
+            token_cache.clear()
+        await decode_jwt_token(token)
+    elapsed = time.perf_counter() - started
+    return f"{decodes / elapsed:,.0f} decodes/s, {elapsed / decodes * 1_000_000:.1f}us per decode"
+
+
+async def main(decodes: int) -> None:
+    token = await create_access_token("+79054445566")
+    print("without cache:", await measure(decodes, token, cached=False))
+    print("with cache:   ", await measure(decodes, token, cached=True))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
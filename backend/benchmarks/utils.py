@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+
+class EventLoopLagProbe:
+    """
+    Measures how late the event loop wakes up a coroutine sleeping for the interval
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _probe(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(time.perf_counter() - started - self.interval)
+
+    def __enter__(self) -> "EventLoopLagProbe":
+        self._task = asyncio.create_task(self._probe())
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._task.cancel()
+
+    def report(self) -> str:
+        lags = sorted(self.lags) or [0.0]
+        p50 = lags[len(lags) // 2]
+        p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+        return f"loop lag p50={p50 * 1000:.1f}ms p99={p99 * 1000:.1f}ms max={lags[-1] * 1000:.1f}ms"
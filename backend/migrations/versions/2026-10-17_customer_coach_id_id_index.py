@@ -0,0 +1,23 @@
+"""customer coach_id id index
+
+Revision ID: b47d0e2c6f15
+Revises: 8c2e4b7f1a90
+Create Date: 2026-10-17 20:21:48.117093
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b47d0e2c6f15'
+down_revision = '8c2e4b7f1a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_customer_coach_id_id', 'customer', ['coach_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_customer_coach_id_id', table_name='customer')
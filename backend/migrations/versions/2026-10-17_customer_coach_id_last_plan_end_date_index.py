@@ -0,0 +1,28 @@
+"""customer coach_id last_plan_end_date id index
+
+Revision ID: 5c7e2a9f4b18
+Revises: 2b8f5d0e7a13
+Create Date: 2026-10-17 23:12:46.381529
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5c7e2a9f4b18'
+down_revision = '2b8f5d0e7a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_customer_coach_id_last_plan_end_date_id',
+        'customer',
+        ['coach_id', 'last_plan_end_date', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_customer_coach_id_last_plan_end_date_id', table_name='customer')
@@ -0,0 +1,32 @@
+"""customer last_plan_end_date
+
+Revision ID: 8c2e4b7f1a90
+Revises: 3f6a1d8e9c42
+Create Date: 2026-10-17 19:03:17.552904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2e4b7f1a90'
+down_revision = '3f6a1d8e9c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('customer', sa.Column('last_plan_end_date', sa.Date(), nullable=True))
+    op.execute(
+        """
+        UPDATE customer
+        SET last_plan_end_date = (
+            SELECT max(trainingplan.end_date) FROM trainingplan WHERE trainingplan.customer_id = customer.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('customer', 'last_plan_end_date')
@@ -0,0 +1,42 @@
+"""dietday consumed nutrients
+
+Revision ID: 4e7b9a2c1d3f
+Revises: c056c3289a75
+Create Date: 2026-10-17 10:12:41.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e7b9a2c1d3f'
+down_revision = 'c056c3289a75'
+branch_labels = None
+depends_on = None
+
+NUTRIENTS = ("calories", "proteins", "fats", "carbs")
+MEALS = ("breakfast", "lunch", "dinner", "snacks")
+
+
+def upgrade() -> None:
+    for nutrient in NUTRIENTS:
+        op.add_column(
+            'dietday',
+            sa.Column(f'consumed_{nutrient}', sa.Float(), server_default='0', nullable=False),
+        )
+
+    # backfill from the meals totals
+    op.execute(
+        "UPDATE dietday SET "
+        + ", ".join(
+            f"consumed_{nutrient} = "
+            + " + ".join(f"COALESCE(({meal} ->> 'total_{nutrient}')::float, 0)" for meal in MEALS)
+            for nutrient in NUTRIENTS
+        )
+    )
+
+
+def downgrade() -> None:
+    for nutrient in NUTRIENTS:
+        op.drop_column('dietday', f'consumed_{nutrient}')
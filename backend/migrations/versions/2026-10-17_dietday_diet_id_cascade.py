@@ -0,0 +1,25 @@
+"""dietday diet_id on delete cascade
+
+Revision ID: 6d1f9a3c2e57
+Revises: b47d0e2c6f15
+Create Date: 2026-10-17 21:05:12.480361
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '6d1f9a3c2e57'
+down_revision = 'b47d0e2c6f15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_constraint('dietday_diet_id_fkey', 'dietday', type_='foreignkey')
+    op.create_foreign_key('dietday_diet_id_fkey', 'dietday', 'diet', ['diet_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    op.drop_constraint('dietday_diet_id_fkey', 'dietday', type_='foreignkey')
+    op.create_foreign_key('dietday_diet_id_fkey', 'dietday', 'diet', ['diet_id'], ['id'])
@@ -0,0 +1,39 @@
+"""dietday meals jsonb
+
+Revision ID: 2d8c5f0e7a14
+Revises: 9b1f6e3a8c27
+Create Date: 2026-10-17 12:41:09.837615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '2d8c5f0e7a14'
+down_revision = '9b1f6e3a8c27'
+branch_labels = None
+depends_on = None
+
+MEALS = ("breakfast", "lunch", "dinner", "snacks")
+
+
+def upgrade() -> None:
+    for meal in MEALS:
+        op.alter_column(
+            'dietday',
+            meal,
+            type_=postgresql.JSONB(astext_type=sa.Text()),
+            postgresql_using=f'{meal}::jsonb',
+        )
+
+
+def downgrade() -> None:
+    for meal in MEALS:
+        op.alter_column(
+            'dietday',
+            meal,
+            type_=sa.JSON(),
+            postgresql_using=f'{meal}::json',
+        )
@@ -0,0 +1,90 @@
+"""dietday unique diet date
+
+Revision ID: 9b1f6e3a8c27
+Revises: 4e7b9a2c1d3f
+Create Date: 2026-10-17 11:03:52.204917
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1f6e3a8c27'
+down_revision = '4e7b9a2c1d3f'
+branch_labels = None
+depends_on = None
+
+NUTRIENTS = ("calories", "proteins", "fats", "carbs")
+MEALS = ("breakfast", "lunch", "dinner", "snacks")
+
+dietday = sa.table(
+    'dietday',
+    sa.column('id'),
+    sa.column('diet_id'),
+    sa.column('date'),
+    *(sa.column(meal, sa.JSON()) for meal in MEALS),
+    *(sa.column(f'consumed_{nutrient}', sa.Float()) for nutrient in NUTRIENTS),
+)
+
+
+def merge_meals(day_id, meal_type: str, meals: list) -> dict:
+    """
+    Sums the meals totals and joins their products, a meal of unknown shape stops the migration
+    """
+    merged = {f"total_{nutrient}": 0 for nutrient in NUTRIENTS}
+    merged["products"] = []
+    for meal in meals:
+        if not meal:
+            continue
+
+        is_mergeable = (
+            isinstance(meal, dict)
+            and set(meal) <= set(merged)
+            and isinstance(meal.get("products", []), list)
+            and all(isinstance(meal.get(f"total_{nutrient}", 0), (int, float)) for nutrient in NUTRIENTS)
+        )
+        if not is_mergeable:
+            raise RuntimeError(
+                f"Can't merge {meal_type} of duplicated diet day {day_id}, unexpected meal {meal!r}. "
+                f"Merge the duplicated days of its diet and date manually and run the migration again"
+            )
+
+        for nutrient in NUTRIENTS:
+            merged[f"total_{nutrient}"] += meal.get(f"total_{nutrient}") or 0
+        merged["products"].extend(meal.get("products", []))
+
+    return merged
+
+
+def upgrade() -> None:
+    # eaten products of the duplicated days are merged into the most filled in one
+    connection = op.get_bind()
+    duplicated_dates = connection.execute(
+        sa.select(dietday.c.diet_id, dietday.c.date)
+        .group_by(dietday.c.diet_id, dietday.c.date)
+        .having(sa.func.count() > 1)
+    ).all()
+
+    for diet_id, date in duplicated_dates:
+        days = connection.execute(
+            sa.select(dietday)
+            .where(sa.and_(dietday.c.diet_id == diet_id, dietday.c.date == date))
+            .order_by(dietday.c.consumed_calories.desc(), dietday.c.id)
+        ).mappings().all()
+        surviving_day = days[0]
+
+        merged_values = {
+            meal: merge_meals(surviving_day["id"], meal, [day[meal] for day in days]) for meal in MEALS
+        }
+        for nutrient in NUTRIENTS:
+            merged_values[f"consumed_{nutrient}"] = sum(day[f"consumed_{nutrient}"] for day in days)
+
+        connection.execute(dietday.update().where(dietday.c.id == surviving_day["id"]).values(merged_values))
+        connection.execute(dietday.delete().where(dietday.c.id.in_([day["id"] for day in days[1:]])))
+
+    op.create_unique_constraint('uq_dietday_diet_id_date', 'dietday', ['diet_id', 'date'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_dietday_diet_id_date', 'dietday', type_='unique')
@@ -0,0 +1,24 @@
+"""drop customer coach_id id index
+
+Revision ID: 9a4e7c1b3d26
+Revises: 6d1f9a3c2e57
+Create Date: 2026-10-17 21:40:33.902174
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4e7c1b3d26'
+down_revision = '6d1f9a3c2e57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # customer is looked up by the primary key, the index was never used
+    op.drop_index('ix_customer_coach_id_id', table_name='customer')
+
+
+def downgrade() -> None:
+    op.create_index('ix_customer_coach_id_id', 'customer', ['coach_id', 'id'], unique=False)
@@ -0,0 +1,39 @@
+"""outbox message table
+
+Revision ID: e5c19b7d2f08
+Revises: 7a3e0c9d5b61
+Create Date: 2026-10-17 16:05:44.912370
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'e5c19b7d2f08'
+down_revision = '7a3e0c9d5b61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('outbox_message',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('created', sa.DateTime(), nullable=False),
+    sa.Column('modified', sa.DateTime(), nullable=True),
+    sa.Column('deleted', sa.DateTime(), nullable=True),
+    sa.Column('message_type', sa.String(length=50), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_outbox_message_id'), 'outbox_message', ['id'], unique=False)
+    op.create_index(op.f('ix_outbox_message_next_attempt_at'), 'outbox_message', ['next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_outbox_message_next_attempt_at'), table_name='outbox_message')
+    op.drop_index(op.f('ix_outbox_message_id'), table_name='outbox_message')
+    op.drop_table('outbox_message')
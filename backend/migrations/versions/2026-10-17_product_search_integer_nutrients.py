@@ -0,0 +1,31 @@
+"""product search integer nutrients
+
+Revision ID: 2b8f5d0e7a13
+Revises: 9a4e7c1b3d26
+Create Date: 2026-10-17 22:10:05.771840
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b8f5d0e7a13'
+down_revision = '9a4e7c1b3d26'
+branch_labels = None
+depends_on = None
+
+NUTRIENT_COLUMNS = ('proteins', 'fats', 'carbs', 'calories')
+
+
+def upgrade() -> None:
+    # the same types as ProductDtoSchema has, so values aren't truncated on read
+    for column in NUTRIENT_COLUMNS:
+        op.alter_column(
+            'product_search', column, type_=sa.Integer(), existing_nullable=False, postgresql_using=f'round({column})'
+        )
+
+
+def downgrade() -> None:
+    for column in NUTRIENT_COLUMNS:
+        op.alter_column('product_search', column, type_=sa.Float(), existing_nullable=False)
@@ -0,0 +1,52 @@
+"""product search table
+
+Revision ID: 7a3e0c9d5b61
+Revises: 2d8c5f0e7a14
+Create Date: 2026-10-17 14:22:37.604128
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3e0c9d5b61'
+down_revision = '2d8c5f0e7a14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_table('product_search',
+    sa.Column('barcode', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('proteins', sa.Float(), nullable=False),
+    sa.Column('fats', sa.Float(), nullable=False),
+    sa.Column('carbs', sa.Float(), nullable=False),
+    sa.Column('calories', sa.Float(), nullable=False),
+    sa.Column('vendor_name', sa.String(length=255), nullable=False),
+    sa.Column('user_id', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('barcode')
+    )
+    op.create_index(
+        'ix_product_search_name_trgm',
+        'product_search',
+        ['name'],
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_product_search_vendor_name_trgm',
+        'product_search',
+        ['vendor_name'],
+        postgresql_using='gin',
+        postgresql_ops={'vendor_name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_product_search_vendor_name_trgm', table_name='product_search')
+    op.drop_index('ix_product_search_name_trgm', table_name='product_search')
+    op.drop_table('product_search')
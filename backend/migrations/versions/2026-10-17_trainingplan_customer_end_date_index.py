@@ -0,0 +1,25 @@
+"""trainingplan customer_id end_date index
+
+Revision ID: 3f6a1d8e9c42
+Revises: e5c19b7d2f08
+Create Date: 2026-10-17 18:12:31.408216
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6a1d8e9c42'
+down_revision = 'e5c19b7d2f08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_trainingplan_customer_id_end_date', 'trainingplan', ['customer_id', 'end_date'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trainingplan_customer_id_end_date', table_name='trainingplan')
@@ -0,0 +1,37 @@
+"""
+Copies DynamoDB products catalog to the Postgres product search table.
+Products already mirrored are refreshed, so the script is safe to rerun.
+
+Usage:
+    python -m scripts.backfill_product_search
+"""
+
+import asyncio
+
+from src.database import SessionLocal
+from src.persistence.dynamo_db_models import Product
+from src.repository.product_repository import ProductRepository
+from src.schemas.product_dto import ProductDtoSchema
+
+COMMIT_EVERY = 500
+
+
+async def main() -> None:
+    product_repository = ProductRepository()
+    mirrored = 0
+
+    async with SessionLocal() as uow:
+        for product in Product.scan():
+            await product_repository.insert_product_to_search(uow, ProductDtoSchema.from_product(product))
+            mirrored += 1
+            if mirrored % COMMIT_EVERY == 0:
+                await uow.commit()
+                print(f"mirrored {mirrored} products")
+
+        await uow.commit()
+
+    print(f"done, mirrored {mirrored} products")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
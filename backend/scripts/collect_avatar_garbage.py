@@ -0,0 +1,36 @@
+"""
+Removes avatar files superseded by newer uploads or left by deleted users.
+Files younger than AVATAR_GARBAGE_GRACE_SECONDS are kept, so the script is safe to run by cron
+while the application accepts uploads.
+
+Usage:
+    python -m scripts.collect_avatar_garbage
+"""
+
+import asyncio
+import os
+
+from sqlalchemy import select, union
+
+from src import Coach, Customer
+from src.database import SessionLocal
+from src.shared.config import STATIC_DIR, AVATAR_GARBAGE_GRACE_SECONDS
+from src.shared.images import collect_avatar_garbage
+
+
+async def main() -> None:
+    async with SessionLocal() as uow:
+        result = await uow.execute(
+            union(
+                select(Coach.photo_path).where(Coach.photo_path.is_not(None)),
+                select(Customer.photo_path).where(Customer.photo_path.is_not(None)),
+            )
+        )
+        referenced_files = {os.path.basename(photo_path) for photo_path in result.scalars()}
+
+    removed = collect_avatar_garbage(STATIC_DIR, referenced_files, AVATAR_GARBAGE_GRACE_SECONDS)
+    print(f"done, removed {len(removed)} files, {len(referenced_files)} avatars are in use")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -12,4 +12,6 @@ from src.persistence.models import (
     Exercise,
     ExercisesOnTraining,
     CustomerHistoryProducts,
+    ProductSearch,
+    OutboxMessage,
 )
@@ -2,25 +2,94 @@
 Database settings module
 """
 
-import os
+import asyncio
+import time
 
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession  # type: ignore
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession  # type: ignore
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
 
-from src.shared.config import DATABASE_URL, TEST_ENV
+from src.shared.config import (
+    DATABASE_URL,
+    TEST_ENV,
+    TEST_DATABASE_URL,
+    DATABASE_POOL_SIZE,
+    DATABASE_MAX_OVERFLOW,
+    DATABASE_POOL_TIMEOUT,
+    DATABASE_POOL_RECYCLE,
+    DATABASE_POOL_PRE_PING,
+)
+from src.shared.metrics import metrics
 
 
-if TEST_ENV == "active":
-    TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
-    engine = create_async_engine(
-        TEST_DATABASE_URL, future=True, echo=False, poolclass=NullPool
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Connection pool which reports how long requests wait for a free connection
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            metrics.increment("database.pool.checkout_failures")
+            raise
+        finally:
+            metrics.observe("database.pool.checkout_wait_seconds", time.perf_counter() - started)
+
+
+def create_database_engine(database_url: str, pooled: bool = True, name: str = "database") -> AsyncEngine:
+    """
+    Creates engine keeping connections opened between requests.
+    Engine without pool opens new connection on every checkout.
+    Pool gauges are reported under the engine name.
+    """
+    if not pooled:
+        return create_async_engine(database_url, future=True, echo=False, poolclass=NullPool)
+
+    pooled_engine = create_async_engine(
+        database_url,
+        future=True,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DATABASE_POOL_SIZE,
+        max_overflow=DATABASE_MAX_OVERFLOW,
+        pool_timeout=DATABASE_POOL_TIMEOUT,
+        pool_recycle=DATABASE_POOL_RECYCLE,
+        pool_pre_ping=DATABASE_POOL_PRE_PING,
     )
+
+    def pool_saturation() -> float:
+        # zero pool size or negative overflow mean the pool isn't limited
+        pool_capacity = DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW
+        if DATABASE_POOL_SIZE <= 0 or DATABASE_MAX_OVERFLOW < 0 or pool_capacity <= 0:
+            return 0.0
+        return pooled_engine.pool.checkedout() / pool_capacity
+
+    # engine replaces the pool when it's disposed, so the current one is asked every time
+    metrics.register_gauge(f"{name}.pool.checked_out", lambda: pooled_engine.pool.checkedout())
+    metrics.register_gauge(f"{name}.pool.saturation", pool_saturation)
+    return pooled_engine
+
+
+async def warm_up_engine(db_engine: AsyncEngine, connections: int) -> None:
+    """
+    Opens pool connections in advance,
+    so the first requests of the worker don't pay for the connection handshake
+    """
+    if connections <= 0 or isinstance(db_engine.pool, NullPool):
+        return
+
+    opened_connections = await asyncio.gather(*(db_engine.connect() for _ in range(connections)))
+    for connection in opened_connections:
+        await connection.close()
+
+
+if TEST_ENV == "active":
+    engine = create_database_engine(TEST_DATABASE_URL, pooled=False)
 else:
-    engine = create_async_engine(
-        DATABASE_URL, future=True, echo=False, poolclass=NullPool
-    )
+    engine = create_database_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(
     engine, expire_on_commit=False, class_=AsyncSession
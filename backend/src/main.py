@@ -1,10 +1,27 @@
+import asyncio
 import os
 
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.cors import CORSMiddleware
 
-from src.shared.config import STATIC_DIR
+from src.database import engine, warm_up_engine, SessionLocal
+from src.service.outbox_dispatcher import OutboxDispatcher
+from src.service.user_service import avatar_executor
+from src.shared.config import (
+    STATIC_DIR,
+    TEST_ENV,
+    DATABASE_POOL_WARM_UP_CONNECTIONS,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_POLL_INTERVAL_SECONDS,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_MAX_RETRY_DELAY_SECONDS,
+    OUTBOX_LEASE_SECONDS,
+)
+from src.supplier.firebase_supplier import push_firebase_notificator
+from src.supplier.kafka_supplier import kafka_customer_invite_supplier, kafka_executor
+from src.shared.dependencies import container
+from src.shared.metrics import metrics
+from src.shared.static_files import ImmutableStaticFiles
 from src.presentation.authentication_router import auth_router
 from src.presentation.customer_router import customer_router
 from src.presentation.library_router import gym_router
@@ -30,7 +47,7 @@ def get_application() -> FastAPI:
 
     as_coach.mount(
         "/static",
-        StaticFiles(directory=STATIC_DIR),
+        ImmutableStaticFiles(directory=STATIC_DIR),
         name="static"
     )
 
@@ -44,6 +61,54 @@ def get_application() -> FastAPI:
     for router in app_routers:
         as_coach.include_router(router, prefix="/api")
 
+    @as_coach.on_event("startup")
+    async def build_service_container() -> None:
+        container.build()
+
+    @as_coach.on_event("startup")
+    async def warm_up_database_pool() -> None:
+        await warm_up_engine(engine, DATABASE_POOL_WARM_UP_CONNECTIONS)
+
+    @as_coach.on_event("startup")
+    async def start_outbox_dispatcher() -> None:
+        # tests check outbox messages themselves
+        if TEST_ENV == "active":
+            return
+
+        outbox_dispatcher = OutboxDispatcher(
+            session_factory=SessionLocal,
+            outbox_repository=container.outbox_repository,
+            coach_repository=container.coach_repository,
+            customer_repository=container.customer_repository,
+            push_notificator=push_firebase_notificator,
+            kafka_supplier=kafka_customer_invite_supplier,
+            batch_size=OUTBOX_BATCH_SIZE,
+            poll_interval=OUTBOX_POLL_INTERVAL_SECONDS,
+            max_attempts=OUTBOX_MAX_ATTEMPTS,
+            max_retry_delay=OUTBOX_MAX_RETRY_DELAY_SECONDS,
+            lease_duration=OUTBOX_LEASE_SECONDS,
+        )
+        as_coach.state.outbox_dispatcher_task = asyncio.create_task(outbox_dispatcher.run())
+
+    @as_coach.on_event("shutdown")
+    async def stop_outbox_dispatcher() -> None:
+        outbox_dispatcher_task = getattr(as_coach.state, "outbox_dispatcher_task", None)
+        if outbox_dispatcher_task is not None:
+            outbox_dispatcher_task.cancel()
+
+    @as_coach.on_event("shutdown")
+    async def flush_kafka_producer() -> None:
+        kafka_customer_invite_supplier.close()
+        kafka_executor.shutdown()
+
+    @as_coach.on_event("shutdown")
+    async def stop_avatar_processing() -> None:
+        avatar_executor.shutdown()
+
+    @as_coach.on_event("shutdown")
+    async def close_database_pool() -> None:
+        await engine.dispose()
+
     return as_coach
 
 
@@ -53,3 +118,9 @@ app = get_application()
 @app.get("/health")
 async def check_health():
     return {"version": "AsCoach v1.0.0"}
+
+
+# nginx doesn't proxy it, metrics are scraped inside the docker network
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return metrics.snapshot()
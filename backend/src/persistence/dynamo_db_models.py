@@ -1,7 +1,7 @@
 from pynamodb.attributes import UnicodeAttribute, NumberAttribute
 from pynamodb.models import Model
 
-from src.shared.config import DYNAMO_DB_PRODUCTS_TABLE_NAME, DYNAMO_DB_PRODUCTS_TABLE_REGION
+from src.shared.config import DYNAMO_DB_PRODUCTS_TABLE_NAME, DYNAMO_DB_PRODUCTS_TABLE_REGION, DYNAMO_DB_HOST
 
 
 class Product(Model):
@@ -18,3 +18,4 @@ class Product(Model):
     class Meta:
         table_name = DYNAMO_DB_PRODUCTS_TABLE_NAME
         region = DYNAMO_DB_PRODUCTS_TABLE_REGION
+        host = DYNAMO_DB_HOST
@@ -3,9 +3,9 @@ import enum
 import uuid
 
 from sqlalchemy import (
-    Column, DateTime, String, Enum, Date, ForeignKey, Text, Integer, JSON, Float
+    Column, DateTime, String, Enum, Date, ForeignKey, Text, Integer, JSON, Float, UniqueConstraint, Index
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import RelationshipProperty, relationship
 
 from src import Base
@@ -65,7 +65,11 @@ class Customer(Base, BaseModel):
     Customer, created by coach, gets training plan.
     """
     __tablename__ = "customer"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # keyset pages of the coach customers list
+        Index("ix_customer_coach_id_last_plan_end_date_id", "coach_id", "last_plan_end_date", "id"),
+        {'extend_existing': True},
+    )
 
     username = Column("username", String(100), nullable=True, index=True, doc="It's phone number")
     telegram_username = Column("telegram_username", String(50), nullable=True, index=True, doc="It's telegram username")
@@ -89,6 +93,8 @@ class Customer(Base, BaseModel):
     photo_path = Column("photo_path", String(255), nullable=True)
     email = Column("email", String(100), nullable=True)
     fcm_token = Column("fcm_token", String(255), nullable=True)
+    # end date of the latest training plan, maintained by training plan writes
+    last_plan_end_date = Column("last_plan_end_date", Date, nullable=True)
 
     def __repr__(self):
         return f"Customer: {self.last_name} {self.first_name}"
@@ -117,11 +123,60 @@ class CustomerHistoryProducts(Base, BaseModel):
         return f"Product history: {self.customer_id} {self.product_barcode} {self.product_amount}"
 
 
+class ProductSearch(Base):
+    """
+    Postgres mirror of DynamoDB products catalog used for text search.
+    Name and vendor name have trigram indexes for substring search.
+    """
+    __tablename__ = "product_search"
+    __table_args__ = (
+        Index("ix_product_search_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index(
+            "ix_product_search_vendor_name_trgm",
+            "vendor_name",
+            postgresql_using="gin",
+            postgresql_ops={"vendor_name": "gin_trgm_ops"},
+        ),
+    )
+
+    barcode = Column("barcode", String(50), primary_key=True)
+    name = Column("name", String(255), nullable=False)
+    type = Column("type", String(50), nullable=False)
+    proteins = Column("proteins", Integer, nullable=False)
+    fats = Column("fats", Integer, nullable=False)
+    carbs = Column("carbs", Integer, nullable=False)
+    calories = Column("calories", Integer, nullable=False)
+    vendor_name = Column("vendor_name", String(255), nullable=False)
+    user_id = Column("user_id", String(50), nullable=False)
+
+    def __repr__(self):
+        return f"Product search: {self.barcode} {self.name}"
+
+
+class OutboxMessage(Base, BaseModel):
+    """
+    Message to external service written in the same transaction as the change it's about.
+    Delivered by the outbox dispatcher and removed after delivery.
+    """
+    __tablename__ = "outbox_message"
+
+    message_type = Column("message_type", String(50), nullable=False)
+    payload = Column("payload", JSONB, nullable=False)
+    attempts = Column("attempts", Integer, nullable=False, default=0)
+    next_attempt_at = Column("next_attempt_at", DateTime, nullable=False, default=datetime.datetime.now, index=True)
+    last_error = Column("last_error", Text)
+
+    def __repr__(self):
+        return f"Outbox message: {self.message_type} {self.id}"
+
+
 class TrainingPlan(Base, BaseModel):
     """
     Contains training, diets, notes and also relates to customer.
     """
     __tablename__ = "trainingplan"
+    # customer's last plan is found by the index without reading all the plans
+    __table_args__ = (Index("ix_trainingplan_customer_id_end_date", "customer_id", "end_date"),)
 
     start_date = Column("start_date", Date)
     end_date = Column("end_date", Date)
@@ -163,16 +218,23 @@ class Diet(Base, BaseModel):
 
 class DietDays(Base, BaseModel):
     __tablename__ = "dietday"
+    __table_args__ = (UniqueConstraint("diet_id", "date", name="uq_dietday_diet_id_date"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
     date = Column(Date, nullable=False)
 
-    breakfast = Column(JSON, default={})
-    lunch = Column(JSON, default={})
-    dinner = Column(JSON, default={})
-    snacks = Column(JSON, default={})
+    breakfast = Column(JSONB, default={})
+    lunch = Column(JSONB, default={})
+    dinner = Column(JSONB, default={})
+    snacks = Column(JSONB, default={})
+
+    # sums of the meals totals, kept up to date with the meals
+    consumed_calories = Column(Float, nullable=False, default=0, server_default="0")
+    consumed_proteins = Column(Float, nullable=False, default=0, server_default="0")
+    consumed_fats = Column(Float, nullable=False, default=0, server_default="0")
+    consumed_carbs = Column(Float, nullable=False, default=0, server_default="0")
 
-    diet_id = Column(UUID(as_uuid=True), ForeignKey("diet.id"), nullable=False)
+    diet_id = Column(UUID(as_uuid=True), ForeignKey("diet.id", ondelete="CASCADE"), nullable=False)
     diet = relationship("Diet", back_populates="diet_days")
 
     def __repr__(self):
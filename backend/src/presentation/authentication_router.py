@@ -15,7 +15,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.service.coach_service import CoachService
 from src.service.customer_service import CustomerService
-from src.shared.exceptions import UsernameIsTaken, NotValidCredentials
+from src.service.user_service import UserType
+from src.shared.exceptions import UsernameIsTaken, NotValidCredentials, PhotoTooLarge
 from src.shared.dependencies import (
     provide_database_unit_of_work,
     provide_user_service,
@@ -24,17 +25,43 @@ from src.shared.dependencies import (
 )
 from src.persistence.models import Gender
 from src.presentation.schemas.profile_schema import (
+    AvatarVariantOut,
     UserProfileOut,
     NewUserPassword,
     CurrentUserOut,
 )
 from src.presentation.schemas.login_schema import LoginOut
 from src.presentation.schemas.register_schema import CoachRegistrationData, UserRegisterOut
+from src.shared.config import AVATAR_SIZES
+from src.shared.images import AVATAR_FILE_NAME_PATTERN, AVATAR_FORMATS, avatar_file_name
 from src.utils import password_context, get_hashed_password
 
 auth_router = APIRouter()
 
 
+def provide_photo_variants(photo_link: str | None) -> list[AvatarVariantOut] | None:
+    """
+    Links to all sizes and formats of the avatar, photos uploaded before variants were introduced have none
+    """
+    if photo_link is None:
+        return None
+
+    directory, file_name = photo_link.rsplit("/", 1)
+    match = AVATAR_FILE_NAME_PATTERN.match(file_name)
+    if match is None:
+        return None
+
+    return [
+        AvatarVariantOut(
+            size=size,
+            format=extension,
+            link=f"{directory}/{avatar_file_name(match['digest'], size, extension)}",
+        )
+        for size in AVATAR_SIZES
+        for extension in AVATAR_FORMATS
+    ]
+
+
 @auth_router.post(
     "/signup",
     summary="Creates new coach",
@@ -175,6 +202,7 @@ async def get_profile(
         dict: full info about current user
     """
     user = service.user
+    photo_link = user.photo_link.split('/backend')[1] if user.photo_link else None
     return UserProfileOut(
         id=str(user.id),
         first_name=user.first_name,
@@ -184,7 +212,8 @@ async def get_profile(
         birthday=user.birthday,
         email=user.email,
         username=user.username,
-        photo_link=user.photo_link.split('/backend')[1] if user.photo_link else None,
+        photo_link=photo_link,
+        photo_variants=provide_photo_variants(photo_link),
     )
 
 
@@ -224,20 +253,22 @@ async def update_profile(
     """
     user = service.user
 
-    updated_user = await service.update_profile(
-        uow=uow,
-        user=user,
-        password=user.password,
-        fcm_token=user.fcm_token,
-        first_name=first_name,
-        username=username,
-        last_name=last_name,
-        photo=photo,
-        gender=gender,
-        birthday=birthday,
-        email=email,
-    )
+    try:
+        updated_user = await service.update_profile(
+            uow=uow,
+            user=user,
+            first_name=first_name,
+            username=username,
+            last_name=last_name,
+            photo=photo,
+            gender=gender,
+            birthday=birthday,
+            email=email,
+        )
+    except PhotoTooLarge:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Photo is too large")
 
+    photo_link = updated_user.photo_link.split('/backend')[1] if updated_user.photo_link else None
     return UserProfileOut(
         id=str(updated_user.id),
         first_name=updated_user.first_name,
@@ -247,7 +278,8 @@ async def update_profile(
         birthday=updated_user.birthday,
         email=updated_user.email,
         username=updated_user.username,
-        photo_link=updated_user.photo_link.split('/backend')[1] if updated_user.photo_link else None,
+        photo_link=photo_link,
+        photo_variants=provide_photo_variants(photo_link),
     )
 
 
@@ -270,6 +302,7 @@ async def delete_profile(
     status_code=status.HTTP_200_OK)
 async def confirm_password(
     current_password: str = Form(...),
+    uow: AsyncSession = Depends(provide_database_unit_of_work),
     service: CoachService | CustomerService = Depends(provide_user_service)
 ) -> dict:
     """
@@ -277,12 +310,17 @@ async def confirm_password(
 
     Args:
         current_password: current user password
+        uow: db session injection
         service: service for interacting with profile
 
     Returns:
         success or failed response
     """
-    user = service.user
+    # authenticated user is cached without the password hash, so the hash is read from the database
+    if service.user_type == UserType.COACH.value:
+        user = await service.get_coach_by_username(uow, service.user.username)
+    else:
+        user = await service.get_customer_by_username(uow, service.user.username)
 
     is_confirmed = await service.confirm_coach_password(user, current_password)
     if is_confirmed:
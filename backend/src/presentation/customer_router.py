@@ -2,7 +2,7 @@ import logging
 from typing import Any, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from starlette import status
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,6 +12,8 @@ from src.service.training_plan_service import TrainingPlanService, TrainingPlanC
 from src.presentation.schemas.customer_schema import (
     CustomerOut,
     CustomerCreateIn,
+    CustomerListItemOut,
+    CustomersPageOut,
 )
 from src.presentation.schemas.training_plan_schema import TrainingPlanIn, TrainingPlanOut, TrainingPlanOutFull
 from src.presentation.schemas.register_schema import CustomerRegistrationData
@@ -21,10 +23,14 @@ from src.shared.dependencies import (
     provide_user_service,
     provide_training_plan_service,
     provide_push_notification_service,
+    provide_customer_for_coach,
+    provide_customer_for_coach_only,
 )
-from src.utils import validate_uuid, generate_random_password
+from src.utils import generate_random_password
 from src.service.notification_service import NotificationService
 from src.shared.config import OTP_LENGTH
+from src.schemas.customer_dto import CustomerDtoSchema
+from src.shared.exceptions import InvalidCursor
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -127,59 +133,83 @@ async def get_customers(
     return customers
 
 
+@customer_router.get(
+    "/customers/paginated",
+    summary="Gets user's customers page by page",
+    response_model=CustomersPageOut,
+    status_code=status.HTTP_200_OK)
+async def get_customers_page(
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+    coach_service: CoachService = Depends(provide_user_service),
+    customer_service: CustomerService = Depends(provide_customer_service),
+    uow: AsyncSession = Depends(provide_database_unit_of_work),
+) -> CustomersPageOut:
+    """
+    Gets customers for current coach in the same order as the full list,
+    active customers go first and archived ones after them
+
+    Args:
+        limit: max number of customers in response
+        cursor: next_cursor from the previous page, the first page is returned without it
+        coach_service: current application coach
+        customer_service: service to work with customer domain
+        uow: db session injection
+    Raises:
+        400 in case if cursor is malformed
+    Returns:
+        page of customers and cursor of the next page
+    """
+    coach = coach_service.user
+    try:
+        customers, next_cursor = await customer_service.get_customers_page_by_coach_id(
+            uow=uow, coach_id=str(coach.id), limit=limit, cursor=cursor,
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Not valid cursor")
+
+    return CustomersPageOut(
+        customers=[
+            CustomerListItemOut(
+                id=str(customer.id),
+                first_name=customer.first_name,
+                last_name=customer.last_name,
+                phone_number=customer.username,
+                last_plan_end_date=(
+                    customer.last_plan_end_date.strftime("%Y-%m-%d") if customer.last_plan_end_date else None
+                ),
+                archived=customer.archived,
+            )
+            for customer in customers
+        ],
+        next_cursor=next_cursor,
+    )
+
+
 @customer_router.get(
     "/customers/{customer_id}",
     response_model=CustomerOut,
     status_code=status.HTTP_200_OK)
 async def get_customer(
-    customer_id: str,
-    user_service: CoachService = Depends(provide_user_service),
-    customer_service: CustomerService = Depends(provide_customer_service),
-    training_plan_service: TrainingPlanService = Depends(provide_training_plan_service),
-    uow: AsyncSession = Depends(provide_database_unit_of_work),
+    customer: CustomerDtoSchema = Depends(provide_customer_for_coach),
 ) -> CustomerOut:
     """
     Gets specific customer by ID.
 
     Args:
-        customer_id: str(UUID) of specified customer.
-        user_service: service for interacting with profile
-        customer_service: service for interacting with customer
-        training_plan_service: service for interacting with customer training plans
-        uow: db session injection
+        customer: customer of the current coach from the path
 
     Raise:
         HTTPException: 400 when passed is not correct UUID as customer_id.
         HTTPException: 404 when customer not found.
-        HTTPException: 400 when specified customer does not belong to the current coach.
+        HTTPException: 403 when specified customer does not belong to the current coach.
     """
-    if not await validate_uuid(customer_id):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Passed customer_id is not correct UUID value"
-        )
-
-    customer = await customer_service.get_customer_by_pk(uow, pk=customer_id)
-
-    if str(customer.coach_id) != str(user_service.user.id):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="The client belong to another coach"
-        )
-
-    if not customer:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Customer with id {customer_id} not found"
-        )
-
-    training_plans = await training_plan_service.get_customer_training_plans(uow, str(customer.id))
     return CustomerOut(
         id=str(customer.id),
         first_name=customer.first_name,
         last_name=customer.last_name,
         phone_number=customer.username,
-        last_plan_end_date=training_plans[0].end_date.strftime("%Y-%m-%d") if training_plans else None
+        last_plan_end_date=customer.last_plan_end_date.strftime("%Y-%m-%d") if customer.last_plan_end_date else None
     )
 
 
@@ -190,9 +220,7 @@ async def get_customer(
     response_model=TrainingPlanOut)
 async def create_training_plan(
     training_plan_data: TrainingPlanIn,
-    customer_id: str,
-    customer_service: CustomerService = Depends(provide_customer_service),
-    user_service: CoachService = Depends(provide_user_service),
+    customer: CustomerDtoSchema = Depends(provide_customer_for_coach_only),
     training_plan_service: TrainingPlanService = Depends(provide_training_plan_service),
     push_notification_service: NotificationService = Depends(provide_push_notification_service),
     uow: AsyncSession = Depends(provide_database_unit_of_work),
@@ -203,21 +231,18 @@ async def create_training_plan(
 
     Args:
         training_plan_data: data from application user to create new training plan
-        customer_id: customer's str(UUID)
-        customer_service: service for interacting with customer
-        user_service: service for interacting with profile
+        customer: customer of the current coach from the path
         training_plan_service: service for interacting with customer training plans
         push_notification_service: service responsible to send push notification through FireBase service
         uow: db session injection
-    """
-    customer = await customer_service.get_customer_by_pk(uow, pk=customer_id)
-    if not customer:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Customer with id {customer_id} not found")
 
+    Raise:
+        HTTPException: 403 when customer belongs to another coach or customer tries to create own plan
+    """
     try:
         training_plan = await training_plan_service.create_training_plan(
             uow=uow,
-            customer_id=customer_id,
+            customer_id=str(customer.id),
             data=training_plan_data,
         )
     except TrainingPlanCreationException:
@@ -229,7 +254,8 @@ async def create_training_plan(
     push_tittle = "Создан новый тренировочный план"
     push_body = f"с {training_plan.start_date} до {training_plan.end_date}"
     notification_data = {"title": push_tittle, "body": push_body}
-    await push_notification_service.send_push_notification(customer.fcm_token, notification_data)
+    await push_notification_service.send_push_notification(customer.fcm_token, notification_data, uow=uow)
+    await uow.commit()
 
     return TrainingPlanOut(
         id=str(training_plan.id),
@@ -248,9 +274,7 @@ async def create_training_plan(
     summary="Returns all training plans for customer",
     status_code=status.HTTP_200_OK)
 async def get_all_training_plans(
-    customer_id: str,
-    user_service: CoachService = Depends(provide_user_service),
-    customer_service: CustomerService = Depends(provide_customer_service),
+    customer: CustomerDtoSchema = Depends(provide_customer_for_coach),
     training_plan_service: TrainingPlanService = Depends(provide_training_plan_service),
     uow: AsyncSession = Depends(provide_database_unit_of_work),
 ) -> list[TrainingPlanOut]:
@@ -259,16 +283,10 @@ async def get_all_training_plans(
     Endpoint can be used by both the coach and the customer
 
     Args:
-        customer_id: customer's str(UUID)
-        user_service: service for interacting with profile
-        customer_service: service for interacting with customer
+        customer: customer of the current coach or the customer himself from the path
         training_plan_service: service responsible for training plans creation
         uow: db session injection
     """
-    customer = await customer_service.get_customer_by_pk(uow, pk=customer_id)
-    if customer is None:
-        raise HTTPException(status_code=404, detail=f"customer with id={customer_id} doesn't exist")
-
     training_plans = await training_plan_service.get_customer_training_plans(uow, str(customer.id))
 
     response = [
@@ -294,10 +312,8 @@ async def get_all_training_plans(
     status_code=status.HTTP_200_OK)
 async def get_training_plan(
     training_plan_id: UUID,
-    customer_id: str,  # TODO: make uuid it raises 500 now if not uuid
-    user_service: CoachService = Depends(provide_user_service),
+    customer: CustomerDtoSchema = Depends(provide_customer_for_coach),
     training_plan_service: TrainingPlanService = Depends(provide_training_plan_service),
-    customer_service: CustomerService = Depends(provide_customer_service),
     uow: AsyncSession = Depends(provide_database_unit_of_work),
 ) -> TrainingPlanOutFull:
     """
@@ -306,21 +322,15 @@ async def get_training_plan(
 
     Args:
         training_plan_id: str(UUID) of specified training plan
-        customer_id: str(UUID) of specified customer
-        user_service: service for interacting with profile
+        customer: customer of the current coach or the customer himself from the path
         training_plan_service: service for interacting with customer training plans
-        customer_service: service for interacting with customer
         uow: db session injection
 
     Raise:
         HTTPException: 404 when customer or training plan are not found
+        HTTPException: 403 when customer belongs to another coach
     """
-    customer = await customer_service.get_customer_by_pk(uow, pk=customer_id)
-    if customer is None:
-        logger.info(f"customer.does.not.exist, id={customer_id}")
-        raise HTTPException(status_code=404, detail=f"Customer with id={customer_id} doesn't exist")
-
-    training_plan = await training_plan_service.get_training_plan_by_id(uow, training_plan_id)
+    training_plan = await training_plan_service.get_training_plan_by_id(uow, training_plan_id, customer_id=customer.id)
     if training_plan is None:
         logger.info(f"training.plan.does.not.exist, id={training_plan_id}")
         raise HTTPException(status_code=404, detail=f"Training plan with id={training_plan_id} doesn't exist")
@@ -339,8 +349,33 @@ async def get_training_plan(
         notes=training_plan.notes,
     )
 
-    # TODO: сделать на уровне слоя данных, поняв где нарушается сортировка
-    for training in response.trainings:
-        training.exercises.sort(key=lambda x: x.ordering)
-
     return response
+
+
+@customer_router.delete(
+    "/customers/{customer_id}/training_plans/{training_plan_id}",
+    summary="Deletes customer's training plan",
+    status_code=status.HTTP_204_NO_CONTENT)
+async def delete_training_plan(
+    training_plan_id: UUID,
+    customer: CustomerDtoSchema = Depends(provide_customer_for_coach_only),
+    training_plan_service: TrainingPlanService = Depends(provide_training_plan_service),
+    uow: AsyncSession = Depends(provide_database_unit_of_work),
+) -> None:
+    """
+    Deletes specific training plan of the customer
+
+    Args:
+        training_plan_id: str(UUID) of specified training plan
+        customer: customer of the current coach from the path
+        training_plan_service: service for interacting with customer training plans
+        uow: db session injection
+
+    Raise:
+        HTTPException: 404 when customer or training plan are not found
+        HTTPException: 403 when customer belongs to another coach or customer tries to delete own plan
+    """
+    deleted_id = await training_plan_service.delete_training_plan(uow, customer_id=customer.id, id_=training_plan_id)
+    if deleted_id is None:
+        logger.info(f"training.plan.does.not.exist, id={training_plan_id}")
+        raise HTTPException(status_code=404, detail=f"Training plan with id={training_plan_id} doesn't exist")
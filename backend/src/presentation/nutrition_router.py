@@ -2,7 +2,7 @@ import logging
 from datetime import date
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.presentation.schemas.nutrition_schema import (
@@ -13,7 +13,7 @@ from src.presentation.schemas.nutrition_schema import (
     HistoryProductOut,
 )
 from src.presentation.schemas.product_schema import ProductCreateIn, ProductCreateOut
-from src.shared.exceptions import BarcodeAlreadyExistExc
+from src.shared.exceptions import BarcodeAlreadyExistExc, ProductNotFound
 from src.service.coach_service import CoachService
 from src.service.customer_service import CustomerService
 from src.service.diet_service import DietService
@@ -91,12 +91,18 @@ async def add_product_to_diet_meal(
     """
     user = user_service.user
 
-    updated_daily_diet = await diet_service.put_product_to_diet_meal(
-        uow=uow,
-        daily_diet_id=request.daily_diet_id,
-        meal_type=request.meal_type,
-        adding_products_data=request.product_data,
-    )
+    try:
+        updated_daily_diet = await diet_service.put_product_to_diet_meal(
+            uow=uow,
+            daily_diet_id=request.daily_diet_id,
+            meal_type=request.meal_type,
+            adding_products_data=request.product_data,
+        )
+    except ProductNotFound as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Products not found: {', '.join(exc.barcodes)}",
+        )
 
     if updated_daily_diet is None:
         raise HTTPException(
@@ -258,6 +264,8 @@ async def update_product_in_catalog(
     status_code=status.HTTP_200_OK)
 async def find_product_in_catalog(
     query_text: str,
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
     user_service: CoachService | CustomerService = Depends(provide_user_service),
     product_service: ProductService = Depends(provide_product_service),
     uow: AsyncSession = Depends(provide_database_unit_of_work),
@@ -267,6 +275,8 @@ async def find_product_in_catalog(
 
     Args:
         query_text: word for looking up in db
+        limit: max number of found products in response
+        offset: number of found products to skip
         user_service: both user roles can access
         product_service: service responsible for nutrition product logic
         uow: db session injection
@@ -274,7 +284,7 @@ async def find_product_in_catalog(
         response: list of suitable products
     """
     user = user_service.user
-    products_dto = await product_service.search_products(query_text.lower())
+    products_dto = await product_service.search_products(uow, query_text, limit, offset)
     products_response = [
         ProductOut(
             barcode=p.barcode,
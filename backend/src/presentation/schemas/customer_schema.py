@@ -21,3 +21,23 @@ class CustomerOut(CustomerCreateIn, BaseModel):
     last_name: str
     phone_number: str | None
     last_plan_end_date: str | None
+
+
+class CustomerListItemOut(BaseModel):
+    """
+    Customer in the coach's customers list
+    """
+    id: str
+    first_name: str
+    last_name: str | None
+    phone_number: str | None
+    last_plan_end_date: str | None
+    archived: bool
+
+
+class CustomersPageOut(BaseModel):
+    """
+    Page of the coach's customers list, next_cursor is missing on the last page
+    """
+    customers: list[CustomerListItemOut]
+    next_cursor: str | None
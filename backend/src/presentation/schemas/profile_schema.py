@@ -7,6 +7,12 @@ from src.utils import validate_password
 from src.persistence.models import Gender
 
 
+class AvatarVariantOut(BaseModel):
+    size: int
+    format: str
+    link: str
+
+
 class UserProfileOut(BaseModel):
     """
     Full user data for profile
@@ -20,6 +26,7 @@ class UserProfileOut(BaseModel):
     email: str | None
     username: str
     photo_link: str | None
+    photo_variants: list[AvatarVariantOut] | None
 
 
 class CurrentUserOut(BaseModel):
@@ -29,14 +36,6 @@ class CurrentUserOut(BaseModel):
     first_name: str | None
 
 
-class TokenPayload(BaseModel):
-    """
-    Validates token payload
-    """
-    sub: str
-    exp: int
-
-
 class NewUserPassword(BaseModel):
     password: str
 
@@ -49,6 +49,21 @@ class CoachRepository:
 
         return CoachDtoSchema.from_coach_dto(coach)
 
+    async def clear_fcm_tokens(self, uow: AsyncSession, fcm_tokens: list[str]) -> list[str]:
+        """
+        Forgets dead device tokens, coach token isn't nullable so it becomes empty.
+        Returns usernames of the coaches with cleared tokens.
+        """
+        statement = (
+            update(Coach)
+            .where(Coach.fcm_token.in_(fcm_tokens))
+            .values(fcm_token="")
+            .returning(Coach.username)
+            .execution_options(synchronize_session=False)
+        )
+        result = await uow.execute(statement)
+        return list(result.scalars().all())
+
     async def delete_coach(self, uow: AsyncSession, pk: str) -> str | None:
         stmt = delete(Coach).where(Coach.id == pk)
         result = await uow.execute(stmt)
@@ -1,11 +1,14 @@
-from sqlalchemy import select, delete, update, func, nullsfirst, and_, literal_column
-from sqlalchemy.orm import selectinload
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import select, delete, update, func, and_, literal, literal_column, tuple_
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src import Customer, TrainingPlan
+from src import Customer
 from src.presentation.schemas.register_schema import CustomerRegistrationData
 from src.schemas.customer_dto import CustomerDtoSchema, CustomerShortDtoSchema
+from src.shared.exceptions import CustomerNotFound, CustomerBelongsToAnotherCoach
 
 
 class CustomerRepository:
@@ -30,7 +33,7 @@ class CustomerRepository:
             return None
 
         customer = await self.provide_by_pk(uow, str(customer_id))
-        return CustomerDtoSchema.from_orm(customer)
+        return customer
 
     async def update_customer(self, uow: AsyncSession, **kwargs) -> CustomerDtoSchema | None:
         statement = (
@@ -48,6 +51,21 @@ class CustomerRepository:
 
         return CustomerDtoSchema.from_orm(coach)
 
+    async def clear_fcm_tokens(self, uow: AsyncSession, fcm_tokens: list[str]) -> list[str]:
+        """
+        Forgets dead device tokens.
+        Returns usernames of the customers with cleared tokens.
+        """
+        statement = (
+            update(Customer)
+            .where(Customer.fcm_token.in_(fcm_tokens))
+            .values(fcm_token=None)
+            .returning(Customer.username)
+            .execution_options(synchronize_session=False)
+        )
+        result = await uow.execute(statement)
+        return list(result.scalars().all())
+
     async def delete_customer(self, uow: AsyncSession, pk: str) -> str | None:
         stmt = delete(Customer).where(Customer.id == pk)
         result = await uow.execute(stmt)
@@ -58,34 +76,60 @@ class CustomerRepository:
 
         return pk
 
-    async def provide_by_pk(self, uow: AsyncSession, pk: str) -> CustomerDtoSchema | None:
-        query = (
-            select(Customer).where(Customer.id == pk)
-            .options(
-                selectinload(Customer.training_plans).subqueryload(TrainingPlan.trainings),
-                selectinload(Customer.training_plans).subqueryload(TrainingPlan.diets)
-            )
+    @staticmethod
+    def _select_customer_row():
+        """
+        Customer columns only, without loading the ORM entity and its relationships
+        """
+        return select(
+            Customer.id,
+            Customer.username,
+            Customer.first_name,
+            Customer.coach_id,
+            Customer.fcm_token,
+            Customer.last_name,
+            Customer.password,
+            Customer.telegram_username,
+            Customer.gender,
+            Customer.birthday,
+            Customer.email,
+            Customer.photo_path.label("photo_link"),
+            Customer.last_plan_end_date,
         )
 
-        result = await uow.execute(query)
-        customer = result.scalar_one_or_none()
+    async def provide_by_pk(self, uow: AsyncSession, pk: str) -> CustomerDtoSchema | None:
+        """
+        Single row primary key lookup, customer's relationships aren't loaded
+        """
+        result = await uow.execute(self._select_customer_row().where(Customer.id == pk))
+        customer_row = result.fetchone()
 
-        if customer is None:
+        if customer_row is None:
             return None
 
-        return CustomerDtoSchema.from_orm(customer)
+        return CustomerDtoSchema.from_orm(customer_row)
 
-    async def provide_by_otp(self, uow: AsyncSession, password: str) -> CustomerDtoSchema | None:
-        query = (
-            select(Customer).where(Customer.password == password)
-            .options(
-                selectinload(Customer.training_plans).subqueryload(TrainingPlan.trainings),
-                selectinload(Customer.training_plans).subqueryload(TrainingPlan.diets)
-            )
+    async def get_customer_for_coach(self, uow: AsyncSession, coach_id: UUID, customer_id: UUID) -> CustomerDtoSchema:
+        """
+        Looks for the customer and checks it belongs to the coach within one query
+        """
+        result = await uow.execute(
+            self._select_customer_row()
+            .add_columns((Customer.coach_id == coach_id).label("is_coach_customer"))
+            .where(Customer.id == customer_id)
         )
+        customer = result.fetchone()
 
-        result = await uow.execute(query)
-        customer = result.scalar_one_or_none()
+        if customer is None:
+            raise CustomerNotFound(customer_id)
+        if not customer.is_coach_customer:
+            raise CustomerBelongsToAnotherCoach(customer_id)
+
+        return CustomerDtoSchema.from_orm(customer)
+
+    async def provide_by_otp(self, uow: AsyncSession, password: str) -> CustomerDtoSchema | None:
+        result = await uow.execute(self._select_customer_row().where(Customer.password == password))
+        customer = result.fetchone()
 
         if customer is None:
             return None
@@ -124,23 +168,58 @@ class CustomerRepository:
 
         return CustomerDtoSchema.from_orm(customer)
 
-    async def provide_customers_by_coach_id(self, uow: AsyncSession, coach_id: str) -> list[CustomerShortDtoSchema]:
-        query = (
-            select(
-                Customer.id,
-                Customer.first_name,
-                Customer.coach_id,
-                Customer.password,
-                Customer.last_name,
-                Customer.username,
-                func.max(TrainingPlan.end_date).label("last_plan_end_date")
-            )
-            .join(TrainingPlan, Customer.id == TrainingPlan.customer_id, isouter=True)
-            .where(Customer.coach_id == coach_id)
-            .group_by(Customer.id)
-            .order_by(nullsfirst(func.max(TrainingPlan.end_date).asc()))
+    async def provide_customers_by_coach_id(
+        self,
+        uow: AsyncSession,
+        coach_id: str,
+        archived_before: date,
+        limit: int | None = None,
+        after: tuple[bool, date, UUID] | None = None,
+    ) -> list[CustomerShortDtoSchema]:
+        """
+        Customers without plans go first, then active customers,
+        then customers whose last plan ended before archived_before, both by the last plan end date.
+        Every group is read by its own query on the stored columns,
+        so it's served by the (coach_id, last_plan_end_date, id) index.
+        Page starts after the passed sort key (archived, last plan end date or date.min, id) of the previous page
+        """
+        groups = (
+            (False, Customer.last_plan_end_date.is_(None)),
+            (False, Customer.last_plan_end_date >= archived_before),
+            (True, Customer.last_plan_end_date < archived_before),
         )
+        after_group = None
+        if after is not None:
+            after_archived, after_date, after_id = after
+            after_group = 2 if after_archived else 0 if after_date == date.min else 1
+
+        customers = []
+        for group, (archived, group_filter) in enumerate(groups):
+            remaining = None if limit is None else limit - len(customers)
+            if remaining == 0:
+                break
+            if after_group is not None and group < after_group:
+                continue
+
+            query = (
+                select(
+                    Customer.id,
+                    Customer.first_name,
+                    Customer.last_name,
+                    Customer.username,
+                    Customer.last_plan_end_date,
+                    literal(archived).label("archived"),
+                )
+                .where(and_(Customer.coach_id == coach_id, group_filter))
+                .order_by(Customer.last_plan_end_date, Customer.id)
+                .limit(remaining)
+            )
+            if group == after_group and group == 0:
+                query = query.where(Customer.id > after_id)
+            elif group == after_group:
+                query = query.where(tuple_(Customer.last_plan_end_date, Customer.id) > tuple_(after_date, after_id))
+
+            result = await uow.execute(query)
+            customers.extend(result.fetchall())
 
-        result = await uow.execute(query)
-        customers = result.fetchall()
         return [CustomerShortDtoSchema.from_orm(customer) for customer in customers]
@@ -1,9 +1,9 @@
 from uuid import UUID
 from datetime import date
 
-from sqlalchemy import select, update, and_
+from sqlalchemy import select, update, and_, func, cast, Float
+from sqlalchemy.dialects.postgresql import insert, JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, selectinload
 
 from src import Diet, DietDays, TrainingPlan
 from src.schemas.diet_dto import DailyDietDtoSchema
@@ -11,80 +11,98 @@ from src.schemas.diet_dto import DailyDietDtoSchema
 
 class DietRepository:
     async def insert_diet_templates(self, uow: AsyncSession, training_plan_id: UUID, diets: list) -> list[UUID]:
-        diet_orm = [
-            Diet(
-                total_proteins=diet.proteins,
-                total_fats=diet.fats,
-                total_carbs=diet.carbs,
-                total_calories=diet.calories,
-                training_plan_id=training_plan_id,
-            )
-            for diet in diets
-        ]
-
-        uow.add_all(diet_orm)
-        await uow.flush()
-
-        return diet_orm
+        if not diets:
+            return []
+
+        statement = (
+            insert(Diet)
+            .values([
+                {
+                    "total_proteins": diet.proteins,
+                    "total_fats": diet.fats,
+                    "total_carbs": diet.carbs,
+                    "total_calories": diet.calories,
+                    "training_plan_id": training_plan_id,
+                }
+                for diet in diets
+            ])
+            .returning(Diet.id)
+        )
+        result = await uow.execute(statement)
+        return result.scalars().all()
 
-    async def create_daily_diet(
+    async def get_or_create_daily_diet(
         self,
         uow: AsyncSession,
-        template_diet_id: UUID,
+        recommended_diet: DailyDietDtoSchema,
         specific_day: date,
-    ) -> DailyDietDtoSchema | None:
-        query = await uow.execute(
-            select(Diet).filter(Diet.id == template_diet_id)
-        )
-        template_diet = query.scalars().first()
-
-        daily_diet = DietDays(
+    ) -> DailyDietDtoSchema:
+        """
+        Creates the customer day of the recommended diet within one statement,
+        the day created concurrently by another request is returned as is
+        """
+        empty_meal = {
+            "total_calories": 0,
+            "total_proteins": 0,
+            "total_fats": 0,
+            "total_carbs": 0,
+            "products": [],
+        }
+        insert_stmt = insert(DietDays).values(
             date=specific_day,
-            diet=template_diet,
-            diet_id=template_diet.id,
-            breakfast={
-                "total_calories": 0,
-                "total_proteins": 0,
-                "total_fats": 0,
-                "total_carbs": 0,
-                "products": [],
-            },
-            lunch={
-                "total_calories": 0,
-                "total_proteins": 0,
-                "total_fats": 0,
-                "total_carbs": 0,
-                "products": [],
-            },
-            dinner={
-                "total_calories": 0,
-                "total_proteins": 0,
-                "total_fats": 0,
-                "total_carbs": 0,
-                "products": [],
-            },
-            snacks={
-                "total_calories": 0,
-                "total_proteins": 0,
-                "total_fats": 0,
-                "total_carbs": 0,
-                "products": [],
-            },
-
+            diet_id=recommended_diet.template_diet_id,
+            breakfast=empty_meal,
+            lunch=empty_meal,
+            dinner=empty_meal,
+            snacks=empty_meal,
+        )
+        stmt = (
+            insert_stmt
+            .on_conflict_do_update(
+                constraint="uq_dietday_diet_id_date",
+                # no-op update makes the existing row returned
+                set_={DietDays.date: insert_stmt.excluded.date},
+            )
+            .returning(
+                DietDays.id,
+                DietDays.breakfast,
+                DietDays.lunch,
+                DietDays.dinner,
+                DietDays.snacks,
+                DietDays.consumed_calories,
+                DietDays.consumed_proteins,
+                DietDays.consumed_fats,
+                DietDays.consumed_carbs,
+            )
         )
 
-        uow.add(daily_diet)
-        await uow.flush()
-
-        return DailyDietDtoSchema.from_daily_diet_fact(daily_diet)
+        result = await uow.execute(stmt)
+        daily_diet = result.one()
+
+        return recommended_diet.copy(
+            update={
+                "diet_day_id": daily_diet.id,
+                "breakfast": daily_diet.breakfast,
+                "lunch": daily_diet.lunch,
+                "dinner": daily_diet.dinner,
+                "snacks": daily_diet.snacks,
+                "consumed_calories": daily_diet.consumed_calories,
+                "consumed_proteins": daily_diet.consumed_proteins,
+                "consumed_fats": daily_diet.consumed_fats,
+                "consumed_carbs": daily_diet.consumed_carbs,
+            }
+        )
 
     async def get_daily_diet_by_training_plan_date_range(
         self, uow: AsyncSession, customer_id: UUID, specific_day: date
     ) -> DailyDietDtoSchema | None:
+        """
+        Finds the coach diet of the plan active for the day together with the customer fact of the day
+        """
         query = (
-            select(Diet)
+            select(Diet, DietDays)
             .join(TrainingPlan, Diet.training_plan_id == TrainingPlan.id)
-            .options(selectinload(Diet.diet_days))
+            .outerjoin(DietDays, and_(DietDays.diet_id == Diet.id, DietDays.date == specific_day))
             .where(
                 and_(
                     TrainingPlan.customer_id == customer_id,
@@ -94,61 +112,80 @@ class DietRepository:
             )
         )
         result = await uow.execute(query)
-        recommended_diet_by_coach = result.scalar_one_or_none()
-        return DailyDietDtoSchema.from_recommended_diet(recommended_diet_by_coach, specific_day)
+        row = result.one_or_none()
 
-    async def get_daily_diet_by_id(
-        self,
-        uow: AsyncSession,
-        daily_diet_id: UUID,
-    ) -> DailyDietDtoSchema | None:
-        query = (
-            select(DietDays)
-            .options(selectinload(DietDays.diet))
-            .where(DietDays.id == daily_diet_id)
-        )
+        if row is None:
+            return DailyDietDtoSchema.from_recommended_diet(None, None, specific_day)
 
-        result = await uow.execute(query)
-        diet_day = result.scalar_one_or_none()
-
-        if diet_day is None:
-            return None
-
-        return DailyDietDtoSchema.from_daily_diet_fact(diet_day)
+        recommended_diet_by_coach, specific_day_fact = row
+        return DailyDietDtoSchema.from_recommended_diet(recommended_diet_by_coach, specific_day_fact, specific_day)
 
     async def update_daily_diet_meal(
         self,
         uow: AsyncSession,
-        updated_daily_diet: DailyDietDtoSchema,
+        daily_diet_id: UUID,
         meal_type: str,
-        updated_meal: dict,
+        added_products: list[dict],
+        added_nutrients: dict,
     ) -> DailyDietDtoSchema | None:
-        column_to_update = getattr(DietDays, meal_type)
+        """
+        Appends products to the meal and adds their nutrients to the meal and day totals on the database side
+        within one statement, so concurrent updates of the day don't lose each other products
+        """
+        meal_column = getattr(DietDays, meal_type)
+        meal = func.coalesce(meal_column, cast({}, JSONB))
+
+        def meal_total(nutrient: str):
+            return func.coalesce(meal[f"total_{nutrient}"].astext.cast(Float), 0) + added_nutrients[nutrient]
+
+        updated_meal = meal.concat(
+            func.jsonb_build_object(
+                "total_calories", meal_total("calories"),
+                "total_proteins", meal_total("proteins"),
+                "total_fats", meal_total("fats"),
+                "total_carbs", meal_total("carbs"),
+                "products", func.coalesce(meal["products"], cast([], JSONB)).concat(cast(added_products, JSONB)),
+            )
+        )
 
         stmt = (
             update(DietDays)
-            .where(DietDays.id == updated_daily_diet.diet_day_id)
-            .values({column_to_update: updated_meal})
-            .returning(DietDays.id)
+            .where(and_(DietDays.id == daily_diet_id, DietDays.diet_id == Diet.id))
+            .values(
+                {
+                    meal_column: updated_meal,
+                    DietDays.consumed_calories: DietDays.consumed_calories + added_nutrients["calories"],
+                    DietDays.consumed_proteins: DietDays.consumed_proteins + added_nutrients["proteins"],
+                    DietDays.consumed_fats: DietDays.consumed_fats + added_nutrients["fats"],
+                    DietDays.consumed_carbs: DietDays.consumed_carbs + added_nutrients["carbs"],
+                }
+            )
+            .returning(
+                DietDays.id,
+                DietDays.date,
+                DietDays.diet_id,
+                DietDays.breakfast,
+                DietDays.lunch,
+                DietDays.dinner,
+                DietDays.snacks,
+                DietDays.consumed_calories,
+                DietDays.consumed_proteins,
+                DietDays.consumed_fats,
+                DietDays.consumed_carbs,
+                Diet.total_calories,
+                Diet.total_proteins,
+                Diet.total_fats,
+                Diet.total_carbs,
+            )
+            # the day is returned by the statement itself, loaded objects aren't used
+            .execution_options(synchronize_session=False)
         )
 
         result = await uow.execute(stmt)
-        updated_record_id = result.scalar_one_or_none()
-        await uow.commit()
-
-        if updated_record_id is None:
-            return None
-
-        query = (
-            select(DietDays)
-            .options(joinedload(DietDays.diet))
-            .where(DietDays.id == updated_record_id)
-        )
-
-        result = await uow.execute(query)
-        daily_diet_fact = result.scalar_one_or_none()
+        daily_diet_fact = result.one_or_none()
 
         if daily_diet_fact is None:
             return None
 
-        return DailyDietDtoSchema.from_daily_diet_fact(daily_diet_fact)
+        # the returned row carries the template diet totals too
+        return DailyDietDtoSchema.from_daily_diet_fact(daily_diet_fact, template_diet=daily_diet_fact)
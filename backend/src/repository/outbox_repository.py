@@ -0,0 +1,73 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import select, update, delete, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import OutboxMessage
+from src.schemas.outbox_dto import OutboxMessageDtoSchema
+
+
+class OutboxRepository:
+    async def add_message(self, uow: AsyncSession, message_type: str, payload: dict) -> None:
+        uow.add(OutboxMessage(message_type=message_type, payload=payload))
+
+    async def lease_due_messages(
+        self, uow: AsyncSession, limit: int, max_attempts: int, leased_until: datetime,
+    ) -> list[OutboxMessageDtoSchema]:
+        """
+        Moves next attempt of due messages to the lease end, so after the commit
+        messages are delivered outside of transaction and aren't picked by another dispatcher,
+        messages locked by another dispatcher are skipped
+        """
+        due_ids = (
+            select(OutboxMessage.id)
+            .where(
+                and_(
+                    OutboxMessage.next_attempt_at <= datetime.now(),
+                    OutboxMessage.attempts < max_attempts,
+                )
+            )
+            .order_by(OutboxMessage.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(due_ids))
+            .values(next_attempt_at=leased_until)
+            .returning(
+                OutboxMessage.id, OutboxMessage.message_type, OutboxMessage.payload, OutboxMessage.attempts,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await uow.execute(query)
+        return [OutboxMessageDtoSchema.from_orm(message) for message in result.all()]
+
+    async def delete_messages(self, uow: AsyncSession, ids: list[UUID]) -> None:
+        if ids:
+            await uow.execute(
+                delete(OutboxMessage)
+                .where(OutboxMessage.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+
+    async def discard_message(self, uow: AsyncSession, id_: UUID) -> None:
+        await uow.execute(
+            delete(OutboxMessage)
+            .where(OutboxMessage.id == id_)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def postpone_message(self, uow: AsyncSession, id_: UUID, next_attempt_at: datetime, error: str) -> None:
+        await uow.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == id_)
+            .values(
+                attempts=OutboxMessage.attempts + 1,
+                next_attempt_at=next_attempt_at,
+                last_error=error,
+                modified=datetime.now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
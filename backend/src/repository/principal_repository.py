@@ -0,0 +1,65 @@
+from sqlalchemy import select, union_all, literal, cast, null, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import Coach, Customer
+from src.schemas.principal_dto import PrincipalDtoSchema
+from src.shared.cache import principal_cache
+
+
+class PrincipalRepository:
+    async def provide_by_username(self, uow: AsyncSession, username: str) -> PrincipalDtoSchema | None:
+        """
+        Looks for the username among coaches and customers within one query,
+        coach wins in case if both have the same username.
+        Found principal is kept in the cache until it's invalidated by profile changes or expired.
+        Password hash isn't read, so it's never kept in the cache
+        """
+        cached_principal = principal_cache.get(username)
+        if cached_principal is not None:
+            return cached_principal
+
+        coach_query = (
+            select(
+                literal("coach").label("user_type"),
+                Coach.id,
+                Coach.username,
+                Coach.first_name,
+                Coach.last_name,
+                Coach.fcm_token,
+                Coach.gender,
+                Coach.birthday,
+                Coach.email,
+                Coach.photo_path.label("photo_link"),
+                cast(null(), UUID(as_uuid=True)).label("coach_id"),
+                cast(null(), String).label("telegram_username"),
+            )
+            .where(Coach.username == username)
+        )
+        customer_query = (
+            select(
+                literal("customer").label("user_type"),
+                Customer.id,
+                Customer.username,
+                Customer.first_name,
+                Customer.last_name,
+                Customer.fcm_token,
+                Customer.gender,
+                Customer.birthday,
+                Customer.email,
+                Customer.photo_path.label("photo_link"),
+                Customer.coach_id,
+                Customer.telegram_username,
+            )
+            .where(Customer.username == username)
+        )
+
+        result = await uow.execute(union_all(coach_query, customer_query))
+        principals = sorted(result.fetchall(), key=lambda row: row.user_type != "coach")
+
+        if not principals:
+            return None
+
+        principal = PrincipalDtoSchema.from_orm(principals[0])
+        principal_cache.set(username, principal)
+        return principal
@@ -1,28 +1,82 @@
+import asyncio
 from uuid import UUID
 
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, or_, case
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src import CustomerHistoryProducts
+from src import CustomerHistoryProducts, ProductSearch
 from src.persistence.dynamo_db_models import Product
 from src.presentation.schemas.product_schema import ProductCreateIn
 from src.schemas.product_dto import ProductDtoSchema, HistoryProductDtoSchema
+from src.shared.cache import product_cache
+from src.shared.config import PRODUCT_CACHE_NEGATIVE_TTL_SECONDS, DYNAMO_DB_WORKERS
+from src.shared.executors import BoundedExecutor
+from src.shared.metrics import metrics
+
+_NOT_CACHED = object()
+
+# DynamoDB BatchGetItem limit
+DYNAMO_DB_BATCH_GET_SIZE = 100
+
+# PynamoDB is blocking, so its calls are offloaded from the event loop
+dynamo_db_executor = BoundedExecutor("dynamo_db", DYNAMO_DB_WORKERS)
 
 
 class ProductRepository:
     async def get_product_by_barcode(self, barcode: str) -> ProductDtoSchema | None:
+        """
+        Reads through the product cache, unknown barcode is cached as well
+        """
+        cached_product = product_cache.get(barcode, _NOT_CACHED)
+        if cached_product is not _NOT_CACHED:
+            return cached_product
+
+        metrics.increment("dynamodb.products.get")
         try:
-            product = Product.get(barcode)
+            product = ProductDtoSchema.from_product(await dynamo_db_executor.run(Product.get, barcode))
         except Product.DoesNotExist:
+            product_cache.set(barcode, None, ttl=PRODUCT_CACHE_NEGATIVE_TTL_SECONDS)
             return None
-        return ProductDtoSchema.from_product(product)
 
-    async def get_products_by_barcodes(self, barcodes: list[str]) -> list[ProductDtoSchema]:
-        products = []
-        for product in Product.batch_get(barcodes):
-            if product:
-                products.append(ProductDtoSchema.from_product(product))
-        return products
+        product_cache.set(barcode, product)
+        return product
+
+    async def get_products_by_barcodes(self, barcodes: list[str]) -> dict[str, ProductDtoSchema]:
+        """
+        Reads through the product cache, only not cached barcodes are requested from DynamoDB
+        in concurrent batches. Returns found products by barcode, unknown barcodes are left out
+        """
+        products_by_barcode = {}
+        missed_barcodes = []
+        for barcode in dict.fromkeys(barcodes):
+            cached_product = product_cache.get(barcode, _NOT_CACHED)
+            if cached_product is _NOT_CACHED:
+                missed_barcodes.append(barcode)
+            elif cached_product is not None:
+                products_by_barcode[barcode] = cached_product
+
+        batches = [
+            missed_barcodes[start:start + DYNAMO_DB_BATCH_GET_SIZE]
+            for start in range(0, len(missed_barcodes), DYNAMO_DB_BATCH_GET_SIZE)
+        ]
+        found_batches = await asyncio.gather(*(self._batch_get_products(batch) for batch in batches))
+        for found_products in found_batches:
+            for product in found_products:
+                products_by_barcode[product.barcode] = ProductDtoSchema.from_product(product)
+
+        for barcode in missed_barcodes:
+            product = products_by_barcode.get(barcode)
+            if product is None:
+                product_cache.set(barcode, None, ttl=PRODUCT_CACHE_NEGATIVE_TTL_SECONDS)
+            else:
+                product_cache.set(barcode, product)
+
+        return products_by_barcode
+
+    async def _batch_get_products(self, barcodes: list[str]) -> list[Product]:
+        metrics.increment("dynamodb.products.batch_get")
+        return await dynamo_db_executor.run(lambda: list(Product.batch_get(barcodes)))
 
     async def insert_product(
         self,
@@ -41,8 +95,17 @@ class ProductRepository:
             vendor_name=product_data.vendor_name,
             user_id=str(user_id),
         )
-        new_product.save()
-        return ProductDtoSchema.from_product(new_product)
+        metrics.increment("dynamodb.products.put")
+        await dynamo_db_executor.run(new_product.save)
+
+        product = ProductDtoSchema.from_product(new_product)
+        product_cache.set(product.barcode, product)
+        return product
+
+    async def delete_product_by_barcode(self, barcode: str) -> None:
+        metrics.increment("dynamodb.products.delete")
+        await dynamo_db_executor.run(Product(barcode).delete)
+        product_cache.invalidate(barcode)
 
     async def insert_products_to_history(
         self,
@@ -95,14 +158,44 @@ class ProductRepository:
         ]
         return product_history_dto
 
-    async def lookup_products(self, query_text: str) -> list[ProductDtoSchema]:
-        condition = (Product.name.contains(query_text)) | (Product.vendor_name.contains(query_text))
-        scan_results = Product.scan(condition)
-        products = [
-            ProductDtoSchema.from_product(product)
-            for product in scan_results
-        ]
-        return products
+    async def insert_product_to_search(self, uow: AsyncSession, product: ProductDtoSchema) -> None:
+        """
+        Mirrors the product to the search table, repeated barcode refreshes the mirrored product
+        """
+        stmt = insert(ProductSearch).values(**product.dict())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProductSearch.barcode],
+            set_={column: stmt.excluded[column] for column in product.dict() if column != "barcode"},
+        )
+        await uow.execute(stmt)
+
+    async def lookup_products(
+        self, uow: AsyncSession, query_text: str, limit: int, offset: int,
+    ) -> list[ProductDtoSchema]:
+        """
+        Looks for the text within product or vendor names, products with names starting by the text go first
+        """
+        escaped_text = query_text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        contains_text = f"%{escaped_text}%"
+
+        query = (
+            select(ProductSearch)
+            .where(
+                or_(
+                    ProductSearch.name.ilike(contains_text, escape="\\"),
+                    ProductSearch.vendor_name.ilike(contains_text, escape="\\"),
+                )
+            )
+            .order_by(
+                case((ProductSearch.name.ilike(f"{escaped_text}%", escape="\\"), 0), else_=1),
+                ProductSearch.name,
+                ProductSearch.barcode,
+            )
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await uow.execute(query)
+        return [ProductDtoSchema.from_orm(product) for product in result.scalars().all()]
 
     async def delete_product(self, _id: str) -> str | None:
         ...
@@ -1,16 +1,20 @@
 from datetime import date
 from uuid import UUID
 
-from sqlalchemy import select, desc, literal_column
+from sqlalchemy import select, desc, func, cast, String, true, update, delete
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import insert, aggregate_order_by
 
-from src import TrainingPlan, Training
+from src import TrainingPlan, Training, Diet, ExercisesOnTraining, Exercise, Customer
 from src.schemas.diet_dto import DietDtoSchema
-from src.schemas.exercise_dto import ExerciseShortDtoSchema
+from src.schemas.exercise_dto import ExerciseShortDtoSchema, ScheduledExerciseDto
 from src.schemas.training_dto import TrainingDtoSchema
-from src.schemas.training_plan_dto import TrainingPlanDtoShortSchema, TrainingPlanDtoSchema
+from src.schemas.training_plan_dto import (
+    TrainingPlanDtoShortSchema,
+    TrainingPlanDtoSchema,
+    TrainingPlanDetailDtoSchema,
+)
 
 
 class TrainingPlanRepository:
@@ -23,7 +27,7 @@ class TrainingPlanRepository:
         set_rest: int,
         exercise_rest: int,
         notes: str,
-    ) -> TrainingPlanDtoSchema | None:
+    ) -> UUID | None:
         statement = (
             insert(TrainingPlan)
             .values(
@@ -35,17 +39,47 @@ class TrainingPlanRepository:
                 notes=notes
             )
             .on_conflict_do_nothing()
-            .returning(literal_column("*"))
+            .returning(TrainingPlan.id)
         )
 
         result = await uow.execute(statement)
         training_plan_id = result.scalar_one_or_none()
 
-        if training_plan_id is None:
+        if training_plan_id is not None:
+            await uow.execute(
+                update(Customer)
+                .where(Customer.id == customer_id)
+                .values(last_plan_end_date=func.greatest(Customer.last_plan_end_date, end_date))
+                .execution_options(synchronize_session="fetch")
+            )
+        return training_plan_id
+
+    async def delete_training_plan(self, uow: AsyncSession, customer_id: UUID, id_: UUID) -> UUID | None:
+        """
+        Deletes the customer's plan and recalculates the customer's last plan end date within the same transaction
+        """
+        result = await uow.execute(
+            delete(TrainingPlan)
+            .where(TrainingPlan.id == id_, TrainingPlan.customer_id == customer_id)
+            .returning(TrainingPlan.id)
+        )
+        deleted_id = result.scalar_one_or_none()
+
+        if deleted_id is None:
             return None
 
-        training_plan = await self.provide_training_plan_by_id(uow, training_plan_id)
-        return TrainingPlanDtoSchema.from_orm(training_plan)
+        last_plan_end_date = (
+            select(func.max(TrainingPlan.end_date))
+            .where(TrainingPlan.customer_id == Customer.id)
+            .scalar_subquery()
+        )
+        await uow.execute(
+            update(Customer)
+            .where(Customer.id == customer_id)
+            .values(last_plan_end_date=last_plan_end_date)
+            .execution_options(synchronize_session="fetch")
+        )
+        return deleted_id
 
     async def provide_training_plan_by_id(self, uow: AsyncSession, id_: UUID) -> TrainingPlanDtoSchema | None:
         query = (
@@ -100,6 +134,110 @@ class TrainingPlanRepository:
 
         return training_plan_dto
 
+    async def provide_training_plan_detail_by_id(
+        self,
+        uow: AsyncSession,
+        id_: UUID,
+        customer_id: UUID | None = None,
+    ) -> TrainingPlanDetailDtoSchema | None:
+        """
+        Reads the whole plan tree within one query: a row per scheduled exercise of every training,
+        diets totals are aggregated into "/" separated strings alongside.
+        Exercise is identified by the training it's scheduled on, so the same exercise may be in several trainings.
+        Plan of another customer isn't found when customer_id is passed
+        """
+        def join_diet_totals(column):
+            return func.coalesce(
+                func.string_agg(cast(column, String), aggregate_order_by("/", Diet.created)), ""
+            )
+
+        diet_totals = (
+            select(
+                join_diet_totals(Diet.total_proteins).label("proteins"),
+                join_diet_totals(Diet.total_fats).label("fats"),
+                join_diet_totals(Diet.total_carbs).label("carbs"),
+                join_diet_totals(Diet.total_calories).label("calories"),
+            )
+            .where(Diet.training_plan_id == TrainingPlan.id)
+            .lateral("diet_totals")
+        )
+        query = (
+            select(
+                TrainingPlan.id,
+                TrainingPlan.start_date,
+                TrainingPlan.end_date,
+                TrainingPlan.set_rest,
+                TrainingPlan.exercise_rest,
+                TrainingPlan.notes,
+                diet_totals.c.proteins,
+                diet_totals.c.fats,
+                diet_totals.c.carbs,
+                diet_totals.c.calories,
+                Training.id.label("training_id"),
+                Training.name.label("training_name"),
+                ExercisesOnTraining.exercise_id,
+                ExercisesOnTraining.sets,
+                ExercisesOnTraining.superset_id,
+                ExercisesOnTraining.ordering,
+                Exercise.name.label("exercise_name"),
+            )
+            .select_from(TrainingPlan)
+            .join(diet_totals, true())
+            .outerjoin(Training, Training.training_plan_id == TrainingPlan.id)
+            .outerjoin(ExercisesOnTraining, ExercisesOnTraining.training_id == Training.id)
+            .outerjoin(Exercise, Exercise.id == ExercisesOnTraining.exercise_id)
+            .where(TrainingPlan.id == id_)
+            .order_by(Training.created, Training.id, ExercisesOnTraining.ordering)
+        )
+        if customer_id is not None:
+            query = query.where(TrainingPlan.customer_id == customer_id)
+        result = await uow.execute(query)
+        rows = result.fetchall()
+
+        if not rows:
+            return None
+
+        trainings: dict[UUID, TrainingDtoSchema] = {}
+        for row in rows:
+            if row.training_id is None:
+                continue
+
+            training = trainings.get(row.training_id)
+            if training is None:
+                training = trainings[row.training_id] = TrainingDtoSchema(
+                    id=str(row.training_id),
+                    name=row.training_name,
+                    exercises=[],
+                    number_of_exercises=0,
+                )
+
+            if row.exercise_id is not None:
+                training.exercises.append(ScheduledExerciseDto(
+                    id=row.exercise_id,
+                    name=row.exercise_name,
+                    sets=row.sets,
+                    exercise_id=row.exercise_id,
+                    training_id=row.training_id,
+                    superset_id=row.superset_id,
+                    ordering=row.ordering,
+                ))
+                training.number_of_exercises += 1
+
+        training_plan = rows[0]
+        return TrainingPlanDetailDtoSchema(
+            id=str(training_plan.id),
+            start_date=training_plan.start_date.strftime("%Y-%m-%d"),
+            end_date=training_plan.end_date.strftime("%Y-%m-%d"),
+            proteins=training_plan.proteins,
+            fats=training_plan.fats,
+            carbs=training_plan.carbs,
+            calories=training_plan.calories,
+            trainings=list(trainings.values()),
+            set_rest=training_plan.set_rest,
+            exercise_rest=training_plan.exercise_rest,
+            notes=training_plan.notes,
+        )
+
     async def provide_customer_plans_by_customer_id(
         self,
         uow: AsyncSession,
@@ -1,80 +1,55 @@
 from uuid import UUID, uuid4
 
-from sqlalchemy import select, asc
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src import Training, ExercisesOnTraining, Exercise
-from src.schemas.exercise_dto import ScheduledExerciseDto
+from src import Training, ExercisesOnTraining
 
 
 class TrainingRepository:
-    def __init__(self) -> None:
-        self.superset_dict = {}
-        self.ordering = 0
-
-    async def provide_schedule_exercises_by_training_id(
-        self,
-        uow: AsyncSession,
-        training_ids: list[str],
-        exercise_ids: list[str]
-    ) -> list[ScheduledExerciseDto]:
-        query = select(
-            ExercisesOnTraining.id,
-            ExercisesOnTraining.exercise_id,
-            ExercisesOnTraining.training_id,
-            ExercisesOnTraining.sets,
-            ExercisesOnTraining.superset_id,
-            ExercisesOnTraining.ordering,
-            Exercise.name,
-        ).join(
-            Exercise, ExercisesOnTraining.exercise_id == Exercise.id
-        ).where(
-            ExercisesOnTraining.training_id.in_(training_ids),
-            ExercisesOnTraining.exercise_id.in_(exercise_ids),
-        ).order_by(
-            asc(ExercisesOnTraining.ordering)
-        )
-
-        result = await uow.execute(query)
-        schedule_exercises = result.fetchall()
-        res = [ScheduledExerciseDto.from_orm(st) for st in schedule_exercises]
-        return res
-
-    async def _update_superset_dict(self, exercise_item):
-        if (
-            exercise_item.supersets
-            and isinstance(exercise_item.supersets, list)
-            and str(exercise_item.id) not in self.superset_dict
-        ):
-            superset_id = str(uuid4())
-            self.superset_dict[str(exercise_item.id)] = superset_id
-            for e in exercise_item.supersets:
-                self.superset_dict[str(e)] = superset_id
-
-    async def create_personal_trainings(self, uow: AsyncSession, training_plan_id: UUID, customer_trainings: list):
-        trainings_orm = [
-            Training(name=training_item.name, training_plan_id=training_plan_id)
-            for training_item in customer_trainings
-        ]
-
-        uow.add_all(trainings_orm)
-        await uow.flush()
-
-        exercises_on_training = []
-        for customer_training, training_item in zip(trainings_orm, customer_trainings):
-            self.superset_dict = {}
-            self.ordering = 0
-            for exercise_item in training_item.exercises:
-                await self._update_superset_dict(exercise_item)
-                exercises_on_training.append(ExercisesOnTraining(
-                    training_id=str(customer_training.id),
-                    exercise_id=str(exercise_item.id),
-                    sets=exercise_item.sets,
-                    superset_id=self.superset_dict.get(str(exercise_item.id)),
-                    ordering=self.ordering,
-                ))
-                self.ordering += 1
-
-        uow.add_all(exercises_on_training)
-        await uow.flush()
-        return len(trainings_orm)
+    @staticmethod
+    def _provide_superset_ids(exercise_items: list) -> dict[str, UUID]:
+        """
+        Exercises linked to each other within the training share one superset id
+        """
+        superset_ids = {}
+        for exercise_item in exercise_items:
+            if (
+                exercise_item.supersets
+                and isinstance(exercise_item.supersets, list)
+                and str(exercise_item.id) not in superset_ids
+            ):
+                superset_id = uuid4()
+                superset_ids[str(exercise_item.id)] = superset_id
+                for e in exercise_item.supersets:
+                    superset_ids[str(e)] = superset_id
+        return superset_ids
+
+    async def create_personal_trainings(
+        self, uow: AsyncSession, training_plan_id: UUID, customer_trainings: list
+    ) -> int:
+        """
+        Inserts all trainings and their exercises within two statements whatever the plan size is.
+        Training ids are generated here to link exercises without reading the trainings back
+        """
+        trainings, exercises_on_training = [], []
+        for training_item in customer_trainings:
+            training_id = uuid4()
+            trainings.append({"id": training_id, "name": training_item.name, "training_plan_id": training_plan_id})
+
+            superset_ids = self._provide_superset_ids(training_item.exercises)
+            for ordering, exercise_item in enumerate(training_item.exercises):
+                exercises_on_training.append({
+                    "training_id": training_id,
+                    "exercise_id": exercise_item.id,
+                    "sets": exercise_item.sets,
+                    "superset_id": superset_ids.get(str(exercise_item.id)),
+                    "ordering": ordering,
+                })
+
+        if trainings:
+            await uow.execute(insert(Training).values(trainings))
+        if exercises_on_training:
+            await uow.execute(insert(ExercisesOnTraining).values(exercises_on_training))
+
+        return len(trainings)
@@ -12,7 +12,7 @@ class CoachDtoSchema(BaseModel):
     first_name: str
     fcm_token: str
     last_name: str | None
-    password: str
+    password: str | None
     gender: Gender | None
     birthday: date | None
     email: str | None
@@ -13,12 +13,13 @@ class CustomerDtoSchema(BaseModel):
     coach_id: UUID
     fcm_token: str | None
     last_name: str | None
-    password: str
+    password: str | None
     telegram_username: str | None
     gender: str | None | Gender
     birthday: date | None
     email: str | None
     photo_link: str | None
+    last_plan_end_date: date | None = None
 
     class Config:
         orm_mode = True
@@ -37,6 +38,7 @@ class CustomerShortDtoSchema(BaseModel):
     last_name: str | None
     username: str | None
     last_plan_end_date: date | None
+    archived: bool
 
     class Config:
         orm_mode = True
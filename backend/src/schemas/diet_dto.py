@@ -67,27 +67,29 @@ class DailyDietDtoSchema(BaseModel):
     snacks: dict
 
     @classmethod
-    def from_daily_diet_fact(cls, daily_diet_fact: DietDays) -> "DailyDietDtoSchema":
-        meals = [
-            daily_diet_fact.breakfast, daily_diet_fact.lunch, daily_diet_fact.dinner, daily_diet_fact.snacks,
-        ]
+    def from_daily_diet_fact(cls, daily_diet_fact: DietDays, template_diet: Diet | None = None) -> "DailyDietDtoSchema":
+        """
+        Template diet is the day's diet unless it's passed, e.g. as the same row read by one statement
+        """
+        if template_diet is None:
+            template_diet = daily_diet_fact.diet
 
         return DailyDietDtoSchema(
             # recommend amount by coach
             template_diet_id=daily_diet_fact.diet_id,
-            total_calories=daily_diet_fact.diet.total_calories,
-            total_proteins=daily_diet_fact.diet.total_proteins,
-            total_fats=daily_diet_fact.diet.total_fats,
-            total_carbs=daily_diet_fact.diet.total_carbs,
+            total_calories=template_diet.total_calories,
+            total_proteins=template_diet.total_proteins,
+            total_fats=template_diet.total_fats,
+            total_carbs=template_diet.total_carbs,
 
             # fact amount
             diet_day_id=daily_diet_fact.id,
             date=daily_diet_fact.date,
 
-            consumed_calories=sum(meal["total_calories"] for meal in meals),
-            consumed_proteins=sum(meal["total_proteins"] for meal in meals),
-            consumed_fats=sum(meal["total_fats"] for meal in meals),
-            consumed_carbs=sum(meal["total_carbs"] for meal in meals),
+            consumed_calories=daily_diet_fact.consumed_calories,
+            consumed_proteins=daily_diet_fact.consumed_proteins,
+            consumed_fats=daily_diet_fact.consumed_fats,
+            consumed_carbs=daily_diet_fact.consumed_carbs,
 
             breakfast=daily_diet_fact.breakfast,
             lunch=daily_diet_fact.lunch,
@@ -121,7 +123,9 @@ class DailyDietDtoSchema(BaseModel):
         )
 
     @classmethod
-    def from_recommended_diet(cls, template_diet: Diet | None, specific_day: date) -> "DailyDietDtoSchema":
+    def from_recommended_diet(
+        cls, template_diet: Diet | None, specific_day_fact: DietDays | None, specific_day: date,
+    ) -> "DailyDietDtoSchema":
         if template_diet is None:
             # the customer doesn't have any diet from coach for the date
             logger.info(
@@ -129,16 +133,6 @@ class DailyDietDtoSchema(BaseModel):
             )
             return cls.create_empty_diet(None, specific_day)
 
-        customer_fact_days = template_diet.diet_days
-        if not customer_fact_days:
-            # the customer hasn't logged any days from the diet
-            logger.info(
-                f"customer.hasn't.logged.any.diet.days, details=template_diet: {template_diet}, specific_day: {date}"
-            )
-            return cls.create_empty_diet(template_diet, specific_day)
-
-        specific_day_fact = next((day for day in customer_fact_days if day.date == specific_day), None)
-
         if specific_day_fact is None:
             # the customer hasn't logged the requested day
             logger.info(
@@ -146,10 +140,6 @@ class DailyDietDtoSchema(BaseModel):
             )
             return cls.create_empty_diet(template_diet, specific_day)
 
-        meals = [
-            specific_day_fact.breakfast, specific_day_fact.lunch, specific_day_fact.dinner, specific_day_fact.snacks
-        ]
-
         return DailyDietDtoSchema(
             # recommend amount by coach
             template_diet_id=template_diet.id,
@@ -162,10 +152,10 @@ class DailyDietDtoSchema(BaseModel):
             diet_day_id=specific_day_fact.id,
             date=specific_day_fact.date,
 
-            consumed_calories=sum(meal["total_calories"] for meal in meals),
-            consumed_proteins=sum(meal["total_proteins"] for meal in meals),
-            consumed_fats=sum(meal["total_fats"] for meal in meals),
-            consumed_carbs=sum(meal["total_carbs"] for meal in meals),
+            consumed_calories=specific_day_fact.consumed_calories,
+            consumed_proteins=specific_day_fact.consumed_proteins,
+            consumed_fats=specific_day_fact.consumed_fats,
+            consumed_carbs=specific_day_fact.consumed_carbs,
 
             breakfast=specific_day_fact.breakfast,
             lunch=specific_day_fact.lunch,
@@ -0,0 +1,13 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class OutboxMessageDtoSchema(BaseModel):
+    id: UUID
+    message_type: str
+    payload: dict
+    attempts: int
+
+    class Config:
+        orm_mode = True
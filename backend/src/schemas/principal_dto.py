@@ -0,0 +1,58 @@
+from datetime import date
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from src import Gender
+from src.schemas.coach_dto import CoachDtoSchema
+from src.schemas.customer_dto import CustomerDtoSchema
+
+
+class PrincipalDtoSchema(BaseModel):
+    """
+    Authenticated user, either coach or customer,
+    resolved by username from the token. It doesn't carry the password hash
+    """
+    user_type: str
+    id: UUID
+    username: str
+    first_name: str
+    last_name: str | None
+    fcm_token: str | None
+    gender: Gender | None
+    birthday: date | None
+    email: str | None
+    photo_link: str | None
+    coach_id: UUID | None
+    telegram_username: str | None
+
+    class Config:
+        orm_mode = True
+
+    def to_coach_dto(self) -> CoachDtoSchema:
+        return CoachDtoSchema(
+            id=self.id,
+            username=self.username,
+            first_name=self.first_name,
+            last_name=self.last_name,
+            fcm_token=self.fcm_token,
+            gender=self.gender,
+            birthday=self.birthday,
+            email=self.email,
+            photo_link=self.photo_link,
+        )
+
+    def to_customer_dto(self) -> CustomerDtoSchema:
+        return CustomerDtoSchema(
+            id=self.id,
+            username=self.username,
+            first_name=self.first_name,
+            coach_id=self.coach_id,
+            fcm_token=self.fcm_token,
+            last_name=self.last_name,
+            telegram_username=self.telegram_username,
+            gender=self.gender,
+            birthday=self.birthday,
+            email=self.email,
+            photo_link=self.photo_link,
+        )
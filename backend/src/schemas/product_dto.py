@@ -14,6 +14,9 @@ class ProductDtoSchema(BaseModel):
     vendor_name: str
     user_id: str
 
+    class Config:
+        orm_mode = True
+
     @classmethod
     def from_product(cls, product_db_row: Product) -> "ProductDtoSchema":
         return cls(
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class TokenPayload(BaseModel):
+    """
+    Validates token payload
+    """
+    sub: str
+    exp: int
@@ -7,6 +7,7 @@ from src import Coach
 from src.schemas.coach_dto import CoachDtoSchema
 from src.utils import get_hashed_password, verify_password
 from src.repository.coach_repository import CoachRepository
+from src.shared.cache import principal_cache
 from src.shared.exceptions import UsernameIsTaken, NotValidCredentials
 from src.service.user_service import UserService, UserType
 from src.presentation.schemas.login_schema import UserLoginData
@@ -97,6 +98,7 @@ class CoachService:
         if await self.profile_service.authorize_user(uow, existed_coach, data) is True:
             logger.info(f"Coach with username {existed_coach.username} successfully login")
             await uow.commit()
+            principal_cache.invalidate(existed_coach.username)
             return existed_coach
 
         raise NotValidCredentials("Not correct coach password")
@@ -109,6 +111,7 @@ class CoachService:
     async def update_profile(self, uow: AsyncSession, user: Coach, **params) -> CoachDtoSchema | None:
         updated_coach = await self.profile_service.update_user_profile(uow, user, **params)
         await uow.commit()
+        principal_cache.invalidate(user.username, params.get("username"))
         return updated_coach
 
     async def delete(self, uow: AsyncSession, user: Coach) -> str | None:
@@ -117,6 +120,7 @@ class CoachService:
             logger.info(f"Couldn't delete coach {user.username}")
             return
         await uow.commit()
+        principal_cache.invalidate(user.username)
         logger.info(f"Coach {user.username} successfully deleted")
 
     async def get_coach_by_username(self, uow: AsyncSession, username: str) -> CoachDtoSchema | None:
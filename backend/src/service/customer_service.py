@@ -1,5 +1,6 @@
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from uuid import UUID
 
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,9 +9,11 @@ from src import Customer
 from src.shared.config import OTP_LENGTH
 from src.presentation.schemas.login_schema import UserLoginData
 from src.presentation.schemas.register_schema import CustomerRegistrationData
-from src.schemas.customer_dto import CustomerDtoSchema
+from src.schemas.customer_dto import CustomerDtoSchema, CustomerShortDtoSchema
 from src.service.notification_service import NotificationService
-from src.shared.exceptions import NotValidCredentials
+from src.shared.cache import principal_cache
+from src.shared.exceptions import NotValidCredentials, InvalidCursor
+from src.shared.pagination import encode_cursor, decode_cursor
 from src.utils import verify_password
 from src.repository.customer_repository import CustomerRepository
 from src.service.user_service import UserService, UserType
@@ -18,6 +21,9 @@ from src.service.user_service import UserService, UserType
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# customer goes to the archive when the last training plan ended earlier
+CUSTOMER_ARCHIVE_AFTER_DAYS = 30
+
 
 class CustomerSelectorService:
     """Responsible for getting customer data from storage"""
@@ -29,37 +35,71 @@ class CustomerSelectorService:
         customer = await self.customer_repository.provide_by_pk(uow, pk=pk)
         return customer
 
+    async def select_customer_for_coach(self, uow: AsyncSession, coach_id: UUID, customer_id: UUID) -> CustomerDtoSchema:
+        customer = await self.customer_repository.get_customer_for_coach(
+            uow, coach_id=coach_id, customer_id=customer_id,
+        )
+        return customer
+
     async def select_customer_by_otp(self, uow: AsyncSession, password) -> CustomerDtoSchema | None:
         customer = await self.customer_repository.provide_by_otp(uow, password=password)
         return customer
 
     async def select_customers_by_coach_id(self, uow: AsyncSession, coach_id: str) -> list[dict[str, str]]:
-        customers_aggregates = await self.customer_repository.provide_customers_by_coach_id(uow, coach_id)
-
-        customers = []
-        archive_customers = []
-        for customer in customers_aggregates:
-            last_plan_end_date = customer.last_plan_end_date
-
-            if last_plan_end_date and datetime.now().date() - last_plan_end_date > timedelta(days=30):
-                archive_customers.append({
-                    "id": str(customer.id),
-                    "first_name": customer.first_name,
-                    "last_name": customer.last_name,
-                    "phone_number": customer.username,
-                    "last_plan_end_date": last_plan_end_date.strftime("%Y-%m-%d")
-                })
-            else:
-                customers.append({
-                    "id": str(customer.id),
-                    "first_name": customer.first_name,
-                    "last_name": customer.last_name,
-                    "phone_number": customer.username,
-                    "last_plan_end_date": last_plan_end_date.strftime("%Y-%m-%d") if last_plan_end_date else None
-                })
-
-        customers.extend(archive_customers)
-        return customers
+        customers = await self.customer_repository.provide_customers_by_coach_id(
+            uow=uow,
+            coach_id=coach_id,
+            archived_before=datetime.now().date() - timedelta(days=CUSTOMER_ARCHIVE_AFTER_DAYS),
+        )
+        return [
+            {
+                "id": str(customer.id),
+                "first_name": customer.first_name,
+                "last_name": customer.last_name,
+                "phone_number": customer.username,
+                "last_plan_end_date": (
+                    customer.last_plan_end_date.strftime("%Y-%m-%d") if customer.last_plan_end_date else None
+                ),
+            }
+            for customer in customers
+        ]
+
+    async def select_customers_page_by_coach_id(
+        self, uow: AsyncSession, coach_id: str, limit: int, cursor: str | None = None,
+    ) -> tuple[list[CustomerShortDtoSchema], str | None]:
+        """
+        Returns page of customers in the same order as the full list and cursor of the next page if there is one
+        """
+        # archived customers are split by the date of the first page, so the pages don't skip or repeat them
+        archived_before = datetime.now().date() - timedelta(days=CUSTOMER_ARCHIVE_AFTER_DAYS)
+        after = None
+        if cursor is not None:
+            first_page_archived_before, archived, sort_date, customer_id = decode_cursor(cursor, str, bool, str, str)
+            try:
+                archived_before = date.fromisoformat(first_page_archived_before)
+                after = (archived, date.fromisoformat(sort_date), UUID(customer_id))
+            except ValueError as exc:
+                raise InvalidCursor(cursor) from exc
+
+        customers = await self.customer_repository.provide_customers_by_coach_id(
+            uow=uow,
+            coach_id=coach_id,
+            archived_before=archived_before,
+            limit=limit + 1,
+            after=after,
+        )
+
+        next_cursor = None
+        if len(customers) > limit:
+            customers = customers[:limit]
+            last_customer = customers[-1]
+            next_cursor = encode_cursor(
+                archived_before,
+                last_customer.archived,
+                last_customer.last_plan_end_date or date.min,
+                last_customer.id,
+            )
+        return customers, next_cursor
 
     async def select_customer_by_username(self, uow: AsyncSession, username: str) -> CustomerDtoSchema | None:
         customer = await self.customer_repository.provide_by_username(uow, username)
@@ -142,13 +182,13 @@ class CustomerService:
 
         if customer.telegram_username is not None:
             logger.info(f"Will be invited in application new customer: {customer.telegram_username}")
-            # TODO: pass write_uow to use outbox service
             await self.notification_service.send_telegram_customer_invite(
+                uow=uow,
                 coach_name=data.coach_name,
                 customer_username=customer.telegram_username,
                 customer_password=customer.password,
             )
-            logger.info(f"Customer {customer.telegram_username} successfully invited through Telegram account")
+            logger.info(f"Customer {customer.telegram_username} invite is put to outbox")
 
         await uow.commit()
         return customer
@@ -182,6 +222,7 @@ class CustomerService:
             if self.user.username is None:
                 await self.update_profile(uow, self.user, username=form_data.username)
                 await uow.commit()
+            principal_cache.invalidate(self.user.username, form_data.username)
             logger.info(f"Customer successfully {self.user.last_name} {self.user.first_name} login")
             return self.user
         raise NotValidCredentials("Not correct customer password")
@@ -194,6 +235,7 @@ class CustomerService:
     async def update_profile(self, uow: AsyncSession, user: CustomerDtoSchema, **params) -> None:
         updated_customer = await self.profile_service.update_user_profile(uow, user, **params)
         await uow.commit()
+        principal_cache.invalidate(user.username, params.get("username"))
         return updated_customer
 
     async def delete(self, uow: AsyncSession, user: Customer) -> None:
@@ -203,8 +245,16 @@ class CustomerService:
             return
 
         await uow.commit()
+        principal_cache.invalidate(user.username)
         logger.info(f"Customer {user.username} successfully deleted")
 
+    async def get_customer_for_coach(self, uow: AsyncSession, coach_id: UUID, customer_id: UUID) -> CustomerDtoSchema:
+        """
+        Raises CustomerNotFound or CustomerBelongsToAnotherCoach instead of returning another coach's customer
+        """
+        customer = await self.selector_service.select_customer_for_coach(uow, coach_id=coach_id, customer_id=customer_id)
+        return customer
+
     async def get_customer_by_pk(self, uow: AsyncSession, pk: str) -> CustomerDtoSchema | None:
         customer = await self.selector_service.select_customer_by_pk(uow, pk=pk)
         if customer is not None:
@@ -223,6 +273,12 @@ class CustomerService:
         customers = await self.selector_service.select_customers_by_coach_id(uow, coach_id)
         return customers
 
+    async def get_customers_page_by_coach_id(
+        self, uow: AsyncSession, coach_id: str, limit: int, cursor: str | None = None,
+    ) -> tuple[list[CustomerShortDtoSchema], str | None]:
+        customers_page = await self.selector_service.select_customers_page_by_coach_id(uow, coach_id, limit, cursor)
+        return customers_page
+
     async def get_customer_by_username(self, uow: AsyncSession, username: str) -> CustomerDtoSchema | None:
         customer = await self.selector_service.select_customer_by_username(uow, username)
         if customer is not None:
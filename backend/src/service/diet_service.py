@@ -10,6 +10,7 @@ from src.repository.diet_repository import DietRepository
 from src.schemas.diet_dto import DailyDietDtoSchema
 from src.service.calories_calculator_service import CaloriesCalculatorService
 from src.service.product_service import ProductService
+from src.shared.exceptions import ProductNotFound
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -26,32 +27,23 @@ class DietService:
         self.calories_calculator_service = calories_calculator_service
         self.product_service = product_service
 
-    async def _actualize_daily_diet_fact(
-        self,
-        updating_daily_diet: DailyDietDtoSchema,
-        meal_type: MealType,
-        product_list: list[dict],
-    ) -> tuple[DailyDietDtoSchema, dict]:
-        updating_meal = getattr(updating_daily_diet, meal_type.value)
+    async def _calculate_meal_products(self, product_list: list[dict]) -> tuple[list[dict], dict]:
+        """
+        Scales products nutrients to the eaten amount and sums nutrients added to the meal
+        """
+        added_nutrients = {"calories": 0, "proteins": 0, "fats": 0, "carbs": 0}
         for item in product_list:
             item["calories"] *= item["amount"] / 100
             item["proteins"] *= item["amount"] / 100
             item["fats"] *= item["amount"] / 100
             item["carbs"] *= item["amount"] / 100
 
-            updating_daily_diet.consumed_calories += item["calories"]
-            updating_daily_diet.consumed_proteins += item["proteins"]
-            updating_daily_diet.consumed_fats += item["fats"]
-            updating_daily_diet.consumed_carbs += item["carbs"]
-
-            updating_meal["total_calories"] += item["calories"]
-            updating_meal["total_proteins"] += item["proteins"]
-            updating_meal["total_fats"] += item["fats"]
-            updating_meal["total_carbs"] += item["carbs"]
+            added_nutrients["calories"] += item["calories"]
+            added_nutrients["proteins"] += item["proteins"]
+            added_nutrients["fats"] += item["fats"]
+            added_nutrients["carbs"] += item["carbs"]
 
-            updating_meal["products"].append(item)
-
-        return updating_daily_diet, updating_meal
+        return product_list, added_nutrients
 
     async def put_product_to_diet_meal(
         self,
@@ -60,28 +52,28 @@ class DietService:
         meal_type: MealType,
         adding_products_data: list[ProductAddInDiet],
     ) -> DailyDietDtoSchema | None:
-        products_full_info = await self.product_service.get_products_by_barcodes(
+        products_by_barcode = await self.product_service.get_products_by_barcodes(
             barcodes=[item.barcode for item in adding_products_data],
         )
-        updating_daily_diet = await self.diet_repository.get_daily_diet_by_id(
-            uow=uow,
-            daily_diet_id=daily_diet_id,
-        )
+        unknown_barcodes = [item.barcode for item in adding_products_data if item.barcode not in products_by_barcode]
+        if unknown_barcodes:
+            raise ProductNotFound(unknown_barcodes)
+
         merged_product_list = [
-            {**product.dict(), **amount.dict()}
-            for product, amount in zip(products_full_info, adding_products_data)
+            {**products_by_barcode[amount.barcode].dict(), **amount.dict()}
+            for amount in adding_products_data
         ]
-        updated_daily_diet, updated_meal = await self._actualize_daily_diet_fact(
-            updating_daily_diet=updating_daily_diet,
-            meal_type=meal_type,
-            product_list=merged_product_list,
-        )
+        added_products, added_nutrients = await self._calculate_meal_products(merged_product_list)
         result = await self.diet_repository.update_daily_diet_meal(
             uow=uow,
-            updated_daily_diet=updated_daily_diet,
-            meal_type=meal_type,
-            updated_meal=updated_meal,
+            daily_diet_id=daily_diet_id,
+            meal_type=meal_type.value,
+            added_products=added_products,
+            added_nutrients=added_nutrients,
         )
+        if result is None:
+            return None
+
         await self.product_service.save_product_to_history(uow, merged_product_list)
         await uow.commit()
         return result
@@ -99,7 +91,6 @@ class DietService:
             training_plan_id=training_plan_id,
             diets=diets,
         )
-        await uow.commit()
         return len(diet_ids)
 
     async def get_daily_customer_diet(
@@ -113,11 +104,11 @@ class DietService:
             specific_day=specific_day,
         )
 
-        if diet.diet_day_id is None:
+        if diet.diet_day_id is None and diet.template_diet_id is not None:
             logger.info(f"creating.customer.daily.diet, details=customer_id: {customer_id}, specific_day: {date}")
-            diet = await self.diet_repository.create_daily_diet(
+            diet = await self.diet_repository.get_or_create_daily_diet(
                 uow=uow,
-                template_diet_id=diet.template_diet_id,
+                recommended_diet=diet,
                 specific_day=specific_day,
             )
             await uow.commit()
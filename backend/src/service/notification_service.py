@@ -1,32 +1,51 @@
 import json
 import logging
 
-from src.supplier.firebase_supplier import PushFirebaseNotificator
-from src.supplier.kafka_supplier import KafkaSupplier
+from sqlalchemy.ext.asyncio import AsyncSession
 
-logger = logging.getLogger(__name__)
+from src.repository.outbox_repository import OutboxRepository
 
+logger = logging.getLogger(__name__)
 
-class NotificationService:
+PUSH_NOTIFICATION_MESSAGE = "push_notification"
+TELEGRAM_CUSTOMER_INVITE_MESSAGE = "telegram_customer_invite"
 
-    def __init__(self, notificator: PushFirebaseNotificator, kafka_supplier: KafkaSupplier) -> None:
-        self.push_notificator = notificator
-        self.kafka_supplier = kafka_supplier
 
-    async def send_push_notification(self, recipient_id: str, recipient_data: dict[str, str]):
-        if recipient_id is None:
+class NotificationService:
+    """
+    Puts notifications to the outbox within the caller transaction,
+    they are delivered by the outbox dispatcher after commit
+    """
+
+    def __init__(self, outbox_repository: OutboxRepository) -> None:
+        self.outbox_repository = outbox_repository
+
+    async def send_push_notification(self, recipient_id: str, recipient_data: dict[str, str], uow: AsyncSession):
+        """
+        Notification is committed by the caller together with the changes it notifies about
+        """
+        if not recipient_id:
             logger.warning(f"Failed to send notification recipient id is not specified")
             return
 
-        result = await self.push_notificator.send_notification(recipient_id, recipient_data)
-        is_sent = isinstance(result, str) and "ascoach" in result
-        if is_sent:
-            # TODO: make logging practice like Whoosh
-            logger.info(f"Push notifications sent on customer device: {recipient_id}")
+        await self.outbox_repository.add_message(
+            uow,
+            message_type=PUSH_NOTIFICATION_MESSAGE,
+            payload={"recipient_id": recipient_id, "recipient_data": recipient_data},
+        )
 
-    async def send_telegram_customer_invite(self, coach_name: str, customer_username: str, customer_password: str):
+    async def send_telegram_customer_invite(
+        self, uow: AsyncSession, coach_name: str, customer_username: str, customer_password: str,
+    ):
+        """
+        Invite is committed by the caller together with the new customer
+        """
         message = json.dumps(
             {"username": customer_username, "customer_password": customer_password, "coach_name": coach_name},
             ensure_ascii=False,
         )
-        self.kafka_supplier.send_message(message)
+        await self.outbox_repository.add_message(
+            uow,
+            message_type=TELEGRAM_CUSTOMER_INVITE_MESSAGE,
+            payload={"message": message},
+        )
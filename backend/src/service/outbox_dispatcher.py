@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.repository.coach_repository import CoachRepository
+from src.repository.customer_repository import CustomerRepository
+from src.repository.outbox_repository import OutboxRepository
+from src.schemas.outbox_dto import OutboxMessageDtoSchema
+from src.service.notification_service import PUSH_NOTIFICATION_MESSAGE, TELEGRAM_CUSTOMER_INVITE_MESSAGE
+from src.shared.cache import principal_cache
+from src.supplier.firebase_supplier import PushFirebaseNotificator
+from src.supplier.kafka_supplier import KafkaSupplier, kafka_executor
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxDispatcher:
+    """
+    Delivers outbox messages to Firebase and Kafka in batches.
+    Messages are leased in one short transaction and finished in another one,
+    so no transaction and row locks are held while waiting for the brokers.
+    Failed message is retried with exponential backoff until it runs out of attempts,
+    then it's logged as error and discarded, so payload with customer credentials isn't kept forever.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        outbox_repository: OutboxRepository,
+        coach_repository: CoachRepository,
+        customer_repository: CustomerRepository,
+        push_notificator: PushFirebaseNotificator,
+        kafka_supplier: KafkaSupplier,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+        max_retry_delay: int,
+        lease_duration: int,
+    ) -> None:
+        self.session_factory = session_factory
+        self.outbox_repository = outbox_repository
+        self.coach_repository = coach_repository
+        self.customer_repository = customer_repository
+        self.push_notificator = push_notificator
+        self.kafka_supplier = kafka_supplier
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.max_retry_delay = max_retry_delay
+        self.lease_duration = lease_duration
+
+    async def run(self) -> None:
+        while True:
+            try:
+                async with self.session_factory() as uow:
+                    dispatched = await self.dispatch_batch(uow)
+            except Exception as exc:
+                logger.exception(f"outbox.dispatching.failed, details={exc}")
+                dispatched = 0
+
+            # full batch means more messages are probably waiting
+            if dispatched < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def dispatch_batch(self, uow: AsyncSession) -> int:
+        messages = await self.outbox_repository.lease_due_messages(
+            uow,
+            limit=self.batch_size,
+            max_attempts=self.max_attempts,
+            leased_until=datetime.now() + timedelta(seconds=self.lease_duration),
+        )
+        await uow.commit()
+        if not messages:
+            return 0
+
+        invite_messages = []
+        push_messages = []
+        errors = {}
+        for message in messages:
+            if message.message_type == TELEGRAM_CUSTOMER_INVITE_MESSAGE:
+                invite_messages.append(message)
+            elif message.message_type == PUSH_NOTIFICATION_MESSAGE:
+                push_messages.append(message)
+            else:
+                errors[message.id] = f"Unexpected outbox message type {message.message_type}"
+
+        dead_tokens = []
+        if invite_messages:
+            errors.update(await self._deliver_invites(invite_messages))
+        if push_messages:
+            push_errors, dead_tokens = await self._deliver_pushes(push_messages)
+            errors.update(push_errors)
+
+        delivered_ids = []
+        for message in messages:
+            if errors.get(message.id) is None:
+                delivered_ids.append(message.id)
+            else:
+                await self._postpone(uow, message, errors[message.id])
+
+        cleared_usernames = []
+        if dead_tokens:
+            logger.info(f"outbox.pruning.dead.fcm.tokens, details=amount: {len(dead_tokens)}")
+            cleared_usernames.extend(await self.coach_repository.clear_fcm_tokens(uow, dead_tokens))
+            cleared_usernames.extend(await self.customer_repository.clear_fcm_tokens(uow, dead_tokens))
+
+        await self.outbox_repository.delete_messages(uow, delivered_ids)
+        await uow.commit()
+        principal_cache.invalidate(*cleared_usernames)
+        return len(messages)
+
+    async def _deliver_invites(self, messages: list[OutboxMessageDtoSchema]) -> dict[UUID, str | None]:
+        """
+        Returns delivery error of every message, None for the delivered one
+        """
+        try:
+            errors = await kafka_executor.run(
+                self.kafka_supplier.send_messages, [message.payload["message"] for message in messages]
+            )
+        except Exception as exc:
+            errors = [str(exc)] * len(messages)
+
+        return {message.id: error for message, error in zip(messages, errors)}
+
+    async def _deliver_pushes(
+        self, messages: list[OutboxMessageDtoSchema],
+    ) -> tuple[dict[UUID, str | None], list[str]]:
+        """
+        Returns delivery error of every message and dead device tokens,
+        message to dead device and invalid message are finished as they will never be delivered
+        """
+        try:
+            results = await self.push_notificator.send_notifications(
+                [(message.payload["recipient_id"], message.payload["recipient_data"]) for message in messages]
+            )
+        except Exception as exc:
+            return {message.id: str(exc) for message in messages}, []
+
+        errors = {}
+        dead_tokens = []
+        for message, result in zip(messages, results):
+            if result.message_id is not None:
+                errors[message.id] = None
+            elif result.is_token_dead:
+                errors[message.id] = None
+                dead_tokens.append(result.recipient_id)
+            elif result.is_invalid:
+                logger.warning(f"outbox.push.rejected, details=id: {message.id}, {result.error}")
+                errors[message.id] = None
+            else:
+                errors[message.id] = result.error
+
+        return errors, dead_tokens
+
+    async def _postpone(self, uow: AsyncSession, message: OutboxMessageDtoSchema, error: str) -> None:
+        if message.attempts + 1 >= self.max_attempts:
+            logger.error(
+                f"outbox.message.discarded, details=id: {message.id}, type: {message.message_type}, "
+                f"attempts: {message.attempts + 1}, {error}"
+            )
+            await self.outbox_repository.discard_message(uow, id_=message.id)
+            return
+
+        retry_delay = min(2 ** message.attempts, self.max_retry_delay)
+        logger.warning(
+            f"outbox.message.delivery.failed, details=id: {message.id}, attempt: {message.attempts + 1}, {error}"
+        )
+        await self.outbox_repository.postpone_message(
+            uow,
+            id_=message.id,
+            next_attempt_at=datetime.now() + timedelta(seconds=retry_delay),
+            error=error,
+        )
@@ -1,3 +1,4 @@
+import logging
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,6 +9,8 @@ from src.shared.exceptions import BarcodeAlreadyExistExc
 from src.schemas.product_dto import ProductDtoSchema, HistoryProductDtoSchema
 from src.service.calories_calculator_service import CaloriesCalculatorService
 
+logger = logging.getLogger(__name__)
+
 
 class ProductService:
     def __init__(
@@ -22,11 +25,15 @@ class ProductService:
         product = await self.product_repository.get_product_by_barcode(barcode)
         return product
 
-    async def get_products_by_barcodes(self, barcodes: list[str]) -> list[ProductDtoSchema]:
+    async def get_products_by_barcodes(self, barcodes: list[str]) -> dict[str, ProductDtoSchema]:
         products = await self.product_repository.get_products_by_barcodes(barcodes)
         return products
 
     async def create_product(self, uow: AsyncSession, user_id: UUID, product_data: ProductCreateIn) -> ProductDtoSchema:
+        """
+        Saves product to DynamoDB and mirrors it to the search table,
+        product is removed from DynamoDB if the mirror isn't committed, so it's never left unsearchable
+        """
         existed_product = await self.get_product_by_barcode(product_data.barcode)
         if existed_product is not None:
             raise BarcodeAlreadyExistExc("The product with the same barcode already exist")
@@ -41,7 +48,17 @@ class ProductService:
             product_data,
             product_calories,
         )
-        await uow.commit()
+        try:
+            await self.product_repository.insert_product_to_search(uow, new_product)
+            await uow.commit()
+        except Exception:
+            await uow.rollback()
+            try:
+                await self.product_repository.delete_product_by_barcode(new_product.barcode)
+            except Exception as exc:
+                logger.error(f"product.mirroring.compensation.failed, barcode={new_product.barcode}, details={exc}")
+            raise
+
         return new_product
 
     async def save_product_to_history(self, uow: AsyncSession, product_list: list[dict]) -> None:
@@ -50,6 +67,8 @@ class ProductService:
     async def get_product_history(self, uow: AsyncSession, customer_id: UUID) -> list[HistoryProductDtoSchema]:
         return await self.product_repository.fetch_product_history(uow, customer_id)
 
-    async def search_products(self, query_string: str) -> list[ProductDtoSchema]:
-        expected_products = await self.product_repository.lookup_products(query_string)
+    async def search_products(
+        self, uow: AsyncSession, query_string: str, limit: int, offset: int,
+    ) -> list[ProductDtoSchema]:
+        expected_products = await self.product_repository.lookup_products(uow, query_string, limit, offset)
         return expected_products
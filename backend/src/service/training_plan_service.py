@@ -4,12 +4,10 @@ from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.schemas.exercise_dto import ScheduledExerciseDto
 from src.service.training_service import TrainingService
 from src.service.diet_service import DietService
 from src.repository.training_plan_repository import TrainingPlanRepository
 from src.schemas.training_plan_dto import (
-    TrainingDtoSchema,
     TrainingPlanDtoSchema,
     TrainingPlanDtoShortSchema,
     TrainingPlanDetailDtoSchema,
@@ -41,8 +39,13 @@ class TrainingPlanService:
         customer_id: str,
         data: TrainingPlanIn
     ) -> TrainingPlanDtoSchema:
+        """
+        Plan, its diets, trainings and exercises are written within one transaction,
+        the number of statements doesn't depend on the plan size.
+        Transaction is committed by the caller, so the customer notification is committed together with the plan
+        """
         try:
-            training_plan = await self.training_plan_repository.create_training_plan(
+            training_plan_id = await self.training_plan_repository.create_training_plan(
                 uow=uow,
                 customer_id=customer_id,
                 start_date=datetime.strptime(data.start_date, "%Y-%m-%d").date(),
@@ -53,83 +56,45 @@ class TrainingPlanService:
             )
             await self.diet_service.create_diet_templates(
                 uow=uow,
-                training_plan_id=training_plan.id,
+                training_plan_id=training_plan_id,
                 diets=data.diets,
             )
             await self.training_service.create_trainings(
                 uow=uow,
-                training_plan_id=training_plan.id,
+                training_plan_id=training_plan_id,
                 trainings=data.trainings,
             )
         except Exception as exc:
-            logger.warning("error.occurred.during.execution.training.plan.transaction", str(exc))
+            logger.warning(f"error.occurred.during.execution.training.plan.transaction: {exc}")
             await uow.rollback()
             raise TrainingPlanCreationException from exc
         else:
             training_plan_in_db = await self.training_plan_repository.provide_training_plan_by_id(
-                uow=uow, id_=training_plan.id,
+                uow=uow, id_=training_plan_id,
             )
-            await uow.commit()
             return training_plan_in_db
 
-    async def get_training_plan_by_id(self, uow: AsyncSession, id_: UUID) -> TrainingPlanDetailDtoSchema | None:
-        training_plan = await self.training_plan_repository.provide_training_plan_by_id(uow, id_=id_)
-
-        training_ids = [str(training.id) for training in training_plan.trainings]
-        exercise_ids = [str(exercise.id) for training in training_plan.trainings for exercise in training.exercises]
-
-        scheduled_trainings = await self.training_service.provide_scheduled_trainings(
-            uow=uow,
-            training_ids=training_ids,
-            exercise_ids=exercise_ids,
+    async def get_training_plan_by_id(
+        self, uow: AsyncSession, id_: UUID, customer_id: UUID | None = None
+    ) -> TrainingPlanDetailDtoSchema | None:
+        training_plan = await self.training_plan_repository.provide_training_plan_detail_by_id(
+            uow, id_=id_, customer_id=customer_id
         )
 
         if training_plan is None:
             logger.info(f"training.plan.not.found: id={id_}")
             return None
 
-        trainings = []
-        for training in training_plan.trainings:
-            training_dto = TrainingDtoSchema(
-                id=str(training.id),
-                name=training.name,
-                number_of_exercises=len(training_plan.trainings),
-                exercises=[],
-            )
-
-            for exercise in training.exercises:
-                scheduled_exercise = scheduled_trainings[str(exercise.id)]
-                superset_id = str(scheduled_exercise.superset_id) if scheduled_exercise.superset_id else None
-
-                exercise_dto = ScheduledExerciseDto(
-                    id=str(exercise.id),
-                    name=exercise.name,
-                    sets=scheduled_exercise.sets,
-                    exercise_id=exercise.id,
-                    training_id=training.id,
-                    superset_id=superset_id,
-                    ordering=scheduled_exercise.ordering,
-                )
+        return training_plan
 
-                training_dto.exercises.append(exercise_dto)
-
-            trainings.append(training_dto)
-
-        training_plan_dto = TrainingPlanDetailDtoSchema(
-            id=str(training_plan.id),
-            start_date=training_plan.start_date.strftime("%Y-%m-%d"),
-            end_date=training_plan.end_date.strftime("%Y-%m-%d"),
-            proteins="/".join([str(diet.total_proteins) for diet in training_plan.diets]),
-            fats="/".join([str(diet.total_fats) for diet in training_plan.diets]),
-            carbs="/".join([str(diet.total_carbs) for diet in training_plan.diets]),
-            calories="/".join([str(diet.total_calories) for diet in training_plan.diets]),
-            trainings=trainings,
-            set_rest=training_plan.set_rest,
-            exercise_rest=training_plan.exercise_rest,
-            notes=training_plan.notes,
-        )
+    async def delete_training_plan(self, uow: AsyncSession, customer_id: UUID, id_: UUID) -> UUID | None:
+        deleted_id = await self.training_plan_repository.delete_training_plan(uow, customer_id=customer_id, id_=id_)
+        if deleted_id is None:
+            logger.info(f"training.plan.not.found: id={id_}")
+            return None
 
-        return training_plan_dto
+        await uow.commit()
+        return deleted_id
 
     async def get_customer_training_plans(
         self, uow: AsyncSession, customer_id: str
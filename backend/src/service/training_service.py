@@ -3,7 +3,6 @@ from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repository.training_repository import TrainingRepository
-from src.schemas.exercise_dto import ScheduledExerciseDto
 
 
 class TrainingService:
@@ -16,23 +15,4 @@ class TrainingService:
             training_plan_id=training_plan_id,
             customer_trainings=trainings,
         )
-        await uow.commit()
         return inserted_rows
-
-    async def provide_scheduled_trainings(
-        self,
-        uow: AsyncSession,
-        training_ids: list[str],
-        exercise_ids: list[str]
-    ) -> dict[str, ScheduledExerciseDto]:
-        scheduled_trainings = await self.training_repository.provide_schedule_exercises_by_training_id(
-            uow=uow,
-            training_ids=training_ids,
-            exercise_ids=exercise_ids,
-        )
-
-        result = dict()
-        for exercise in scheduled_trainings:
-            result[str(exercise.exercise_id)] = exercise
-
-        return result
@@ -1,9 +1,10 @@
 import logging
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from enum import Enum
 
-from PIL import Image
+from fastapi import UploadFile
 from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.attributes import set_attribute
@@ -15,7 +16,14 @@ from src.shared.config import (
     ALGORITHM, JWT_SECRET_KEY,
     JWT_REFRESH_SECRET_KEY,
     STATIC_DIR,
+    AVATAR_PROCESSING_WORKERS,
+    AVATAR_MAX_UPLOAD_BYTES,
+    AVATAR_UPLOAD_CHUNK_BYTES,
+    AVATAR_SIZES,
 )
+from src.shared.exceptions import PhotoTooLarge
+from src.shared.executors import BoundedExecutor
+from src.shared.images import avatar_digest, avatar_file_name, make_avatar_variants
 from src.utils import verify_password
 from src.presentation.schemas.login_schema import UserLoginData
 from src.presentation.schemas.register_schema import UserRegistrationData
@@ -25,6 +33,9 @@ logger = logging.getLogger(__name__)
 
 USER_MODEL = Coach | Customer
 
+# decoding is CPU bound, worker processes bypass the GIL and limit how many photos are processed at once
+avatar_executor = BoundedExecutor("avatar_processing", AVATAR_PROCESSING_WORKERS, executor_class=ProcessPoolExecutor)
+
 
 class UserType(Enum):
     COACH = "coach"
@@ -64,18 +75,26 @@ class UserService(ABC):
         return encoded_jwt
 
     @staticmethod
-    async def handle_profile_photo(user: USER_MODEL, photo) -> str | None:
+    async def read_profile_photo(photo: UploadFile) -> bytes:
+        """
+        Reads the upload by chunks and stops as soon as it exceeds the allowed size
+        """
+        chunks, size = [], 0
+        while chunk := await photo.read(AVATAR_UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > AVATAR_MAX_UPLOAD_BYTES:
+                raise PhotoTooLarge(f"photo exceeds {AVATAR_MAX_UPLOAD_BYTES} bytes")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def handle_profile_photo(self, user: USER_MODEL, photo: UploadFile | None) -> str | None:
         logger.info(f"creating.coach.avatar.photo.link")
 
         if photo is not None:
-            saving_time = datetime.now().strftime("%d_%m_%Y_%H_%M_%S")
-            file_name = f"{user.username}_{saving_time}.jpeg"
-            photo_path = f"{STATIC_DIR}/{file_name}"
-
-            width, height = 140, 140
-            with Image.open(photo.file) as img:
-                img.thumbnail((width, height))
-                img.save(photo_path, "PNG")
+            image_bytes = await self.read_profile_photo(photo)
+            digest = avatar_digest(image_bytes)
+            await avatar_executor.run(make_avatar_variants, image_bytes, STATIC_DIR, digest, AVATAR_SIZES)
+            photo_path = f"{STATIC_DIR}/{avatar_file_name(digest, AVATAR_SIZES[0])}"
 
             logger.info(f"created.coach.avatar.photo.link: {photo_path}")
 
@@ -0,0 +1,88 @@
+"""
+In-process caches
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from src.shared.config import (
+    PRINCIPAL_CACHE_MAX_SIZE,
+    PRINCIPAL_CACHE_TTL_SECONDS,
+    PRODUCT_CACHE_MAX_SIZE,
+    PRODUCT_CACHE_TTL_SECONDS,
+    TOKEN_CACHE_MAX_SIZE,
+    TOKEN_CACHE_TTL_SECONDS,
+)
+from src.shared.metrics import metrics
+
+
+class TTLCache:
+    """
+    Bounded cache of the worker process.
+    Entry expires after ttl seconds, the least recently used entry is evicted when cache is full.
+    Cache with zero size or zero ttl keeps nothing.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float) -> None:
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        metrics.register_gauge(f"{name}.size", self.__len__)
+        metrics.register_gauge(f"{name}.hit_ratio", lambda: self.hit_ratio)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            metrics.increment(f"{self.name}.misses")
+            return default
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        metrics.increment(f"{self.name}.hits")
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """
+        Saves value, passed ttl can shorten the cache ttl for the entry
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.max_size <= 0 or ttl <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *keys: Hashable) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# authenticated coaches and customers by username (JWT subject), without password hash.
+# Invalidation reaches the current worker only, so ttl limits how long other workers see stale profile
+principal_cache = TTLCache("principal_cache", PRINCIPAL_CACHE_MAX_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+
+# verified access tokens payload, entry never outlives the token expiration
+token_cache = TTLCache("token_cache", TOKEN_CACHE_MAX_SIZE, TOKEN_CACHE_TTL_SECONDS)
+
+# DynamoDB products by barcode, None is kept for unknown barcodes
+product_cache = TTLCache("product_cache", PRODUCT_CACHE_MAX_SIZE, PRODUCT_CACHE_TTL_SECONDS)
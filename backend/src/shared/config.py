@@ -14,9 +14,31 @@ load_dotenv()
 
 # infrastructure
 DATABASE_URL = os.environ.get("DATABASE_URL")
+DATABASE_POOL_SIZE = int(os.environ.get("DATABASE_POOL_SIZE", 10))
+DATABASE_MAX_OVERFLOW = int(os.environ.get("DATABASE_MAX_OVERFLOW", 10))
+DATABASE_POOL_TIMEOUT = int(os.environ.get("DATABASE_POOL_TIMEOUT", 30))
+DATABASE_POOL_RECYCLE = int(os.environ.get("DATABASE_POOL_RECYCLE", 1800))
+DATABASE_POOL_PRE_PING = os.environ.get("DATABASE_POOL_PRE_PING", "true").lower() == "true"
+DATABASE_POOL_WARM_UP_CONNECTIONS = int(os.environ.get("DATABASE_POOL_WARM_UP_CONNECTIONS", 2))
 STATIC_DIR = os.path.join(os.getcwd(), "static")
 DYNAMO_DB_PRODUCTS_TABLE_NAME = os.getenv("DYNAMO_DB_PRODUCTS_TABLE_NAME")
 DYNAMO_DB_PRODUCTS_TABLE_REGION = os.getenv("DYNAMO_DB_PRODUCTS_TABLE_REGION")
+# local DynamoDB endpoint, AWS endpoint of the region is used if not set
+DYNAMO_DB_HOST = os.getenv("DYNAMO_DB_HOST")
+DYNAMO_DB_WORKERS = int(os.environ.get("DYNAMO_DB_WORKERS", 16))
+PRODUCT_CACHE_MAX_SIZE = int(os.environ.get("PRODUCT_CACHE_MAX_SIZE", 50000))
+PRODUCT_CACHE_TTL_SECONDS = int(os.environ.get("PRODUCT_CACHE_TTL_SECONDS", 3600))
+# unknown barcode may be created by another worker meanwhile, so it's remembered for a shorter time
+PRODUCT_CACHE_NEGATIVE_TTL_SECONDS = int(os.environ.get("PRODUCT_CACHE_NEGATIVE_TTL_SECONDS", 60))
+
+# profile photos
+AVATAR_PROCESSING_WORKERS = int(os.environ.get("AVATAR_PROCESSING_WORKERS", 2))
+# nginx client_max_body_size
+AVATAR_MAX_UPLOAD_BYTES = int(os.environ.get("AVATAR_MAX_UPLOAD_BYTES", 5 * 1024 * 1024))
+AVATAR_UPLOAD_CHUNK_BYTES = int(os.environ.get("AVATAR_UPLOAD_CHUNK_BYTES", 64 * 1024))
+# side lengths of the generated avatar variants, the first one is returned as the profile photo link
+AVATAR_SIZES = tuple(int(size) for size in os.environ.get("AVATAR_SIZES", "140,280,560").split(","))
+AVATAR_GARBAGE_GRACE_SECONDS = int(os.environ.get("AVATAR_GARBAGE_GRACE_SECONDS", 3600))
 
 # testing
 TEST_ENV = os.environ.get("TEST_ENV", 0)
@@ -40,6 +62,21 @@ reuseable_oauth = OAuth2PasswordBearer(
     scheme_name="JWT"
 )
 OTP_LENGTH = 4
+PASSWORD_HASHING_WORKERS = int(os.environ.get("PASSWORD_HASHING_WORKERS", 2))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.environ.get("PRINCIPAL_CACHE_MAX_SIZE", 10000))
+# cache is invalidated in the worker which changed the profile only,
+# other workers may keep deleted or changed user until the entry expires
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.environ.get("PRINCIPAL_CACHE_TTL_SECONDS", 15))
+TOKEN_CACHE_MAX_SIZE = int(os.environ.get("TOKEN_CACHE_MAX_SIZE", 10000))
+TOKEN_CACHE_TTL_SECONDS = int(os.environ.get("TOKEN_CACHE_TTL_SECONDS", 3600))
+
+# outbox
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.environ.get("OUTBOX_POLL_INTERVAL_SECONDS", 1))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 10))
+OUTBOX_MAX_RETRY_DELAY_SECONDS = int(os.environ.get("OUTBOX_MAX_RETRY_DELAY_SECONDS", 300))
+# leased message isn't picked again until delivery of the batch is finished, so it must exceed delivery timeouts
+OUTBOX_LEASE_SECONDS = int(os.environ.get("OUTBOX_LEASE_SECONDS", 120))
 
 # firebase push notifications
 FIREBASE_TYPE = os.environ.get("FIREBASE_TYPE", "")
@@ -53,3 +90,4 @@ FIREBASE_TOKEN_URI = os.environ.get("FIREBASE_TOKEN_URI", "")
 FIREBASE_AUTH_PROVIDER_CERT_URL = os.environ.get("FIREBASE_AUTH_PROVIDER_CERT_URL", "")
 FIREBASE_CLIENT_CERT_URL = os.environ.get("FIREBASE_CLIENT_CERT_URL", "")
 FIREBASE_UNIVERSE_DOMAIN = os.environ.get("FIREBASE_UNIVERSE_DOMAIN", "")
+FIREBASE_WORKERS = int(os.environ.get("FIREBASE_WORKERS", 4))
@@ -1,6 +1,9 @@
 # TODO: пора бы уже этот файл побить по доменам
 
 
+from functools import cached_property
+from uuid import UUID
+
 from fastapi import Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
@@ -11,22 +14,24 @@ from src.service.library_service import LibraryService
 from src.service.product_service import ProductService
 from src.service.calories_calculator_service import CaloriesCalculatorService
 from src.shared.config import reuseable_oauth
-from src.utils import decode_jwt_token
+from src.utils import decode_jwt_token, validate_uuid
 from src.repository.library_repository import ExerciseRepository, MuscleGroupRepository
 from src.repository.diet_repository import DietRepository
 from src.repository.training_repository import TrainingRepository
 from src.repository.training_plan_repository import TrainingPlanRepository
 from src.repository.coach_repository import CoachRepository
 from src.repository.customer_repository import CustomerRepository
+from src.repository.principal_repository import PrincipalRepository
+from src.repository.outbox_repository import OutboxRepository
 from src.service.coach_service import CoachService, CoachProfileService, CoachSelectorService
+from src.service.user_service import UserType
 from src.service.customer_service import CustomerService, CustomerSelectorService, CustomerProfileService
-from src.supplier.kafka_supplier import KafkaSupplier, kafka_settings
-from src.shared.exceptions import TokenExpired, NotValidCredentials
+from src.schemas.customer_dto import CustomerDtoSchema
+from src.shared.exceptions import TokenExpired, NotValidCredentials, CustomerNotFound, CustomerBelongsToAnotherCoach
 from src.service.training_plan_service import TrainingPlanService
 from src.service.training_service import TrainingService
 from src.service.diet_service import DietService
 from src.service.notification_service import NotificationService
-from src.supplier.firebase_supplier import PushFirebaseNotificator
 
 
 async def provide_database_unit_of_work() -> AsyncSession:
@@ -37,59 +42,165 @@ async def provide_database_unit_of_work() -> AsyncSession:
             await unit_of_work.close()
 
 
+class ServiceContainer:
+    """
+    Application scoped repositories and services.
+    Every one is built on the first use and shared by all requests afterwards,
+    so they mustn't keep request state: uow and user are passed per call
+    """
+
+    @cached_property
+    def principal_repository(self) -> PrincipalRepository:
+        return PrincipalRepository()
+
+    @cached_property
+    def coach_repository(self) -> CoachRepository:
+        return CoachRepository()
+
+    @cached_property
+    def customer_repository(self) -> CustomerRepository:
+        return CustomerRepository()
+
+    @cached_property
+    def outbox_repository(self) -> OutboxRepository:
+        return OutboxRepository()
+
+    @cached_property
+    def exercise_repository(self) -> ExerciseRepository:
+        return ExerciseRepository()
+
+    @cached_property
+    def muscle_group_repository(self) -> MuscleGroupRepository:
+        return MuscleGroupRepository()
+
+    @cached_property
+    def product_repository(self) -> ProductRepository:
+        return ProductRepository()
+
+    @cached_property
+    def diet_repository(self) -> DietRepository:
+        return DietRepository()
+
+    @cached_property
+    def training_repository(self) -> TrainingRepository:
+        return TrainingRepository()
+
+    @cached_property
+    def training_plan_repository(self) -> TrainingPlanRepository:
+        return TrainingPlanRepository()
+
+    @cached_property
+    def coach_selector_service(self) -> CoachSelectorService:
+        return CoachSelectorService(self.coach_repository)
+
+    @cached_property
+    def coach_profile_service(self) -> CoachProfileService:
+        return CoachProfileService(self.coach_repository)
+
+    @cached_property
+    def customer_selector_service(self) -> CustomerSelectorService:
+        return CustomerSelectorService(self.customer_repository)
+
+    @cached_property
+    def customer_profile_service(self) -> CustomerProfileService:
+        return CustomerProfileService(self.customer_repository)
+
+    @cached_property
+    def notification_service(self) -> NotificationService:
+        return NotificationService(self.outbox_repository)
+
+    @cached_property
+    def library_service(self) -> LibraryService:
+        return LibraryService(
+            exercise_repository=self.exercise_repository, muscle_group_repository=self.muscle_group_repository
+        )
+
+    @cached_property
+    def calories_calculator_service(self) -> CaloriesCalculatorService:
+        return CaloriesCalculatorService()
+
+    @cached_property
+    def product_service(self) -> ProductService:
+        return ProductService(
+            product_repository=self.product_repository,
+            calories_calculator_service=self.calories_calculator_service,
+        )
+
+    @cached_property
+    def diet_service(self) -> DietService:
+        return DietService(
+            diet_repository=self.diet_repository,
+            calories_calculator_service=self.calories_calculator_service,
+            product_service=self.product_service,
+        )
+
+    @cached_property
+    def training_service(self) -> TrainingService:
+        return TrainingService(self.training_repository)
+
+    @cached_property
+    def training_plan_service(self) -> TrainingPlanService:
+        return TrainingPlanService(
+            training_plan_repository=self.training_plan_repository,
+            training_service=self.training_service,
+            diet_service=self.diet_service,
+        )
+
+    def build(self) -> None:
+        """
+        Builds the whole graph at once, so the first requests don't pay for it
+        """
+        for name, attribute in vars(type(self)).items():
+            if isinstance(attribute, cached_property):
+                getattr(self, name)
+
+
+container = ServiceContainer()
+
+
 async def provide_coach_service() -> CoachService:
-    coach_repository = CoachRepository()
-    profile_service = CoachProfileService(coach_repository)
-    selector_service = CoachSelectorService(coach_repository)
-    return CoachService(profile_service=profile_service, selector_service=selector_service)
+    # keeps the authenticated user, so it's the only coach service created per request
+    return CoachService(
+        selector_service=container.coach_selector_service, profile_service=container.coach_profile_service
+    )
 
 
 async def provide_library_service() -> LibraryService:
-    return LibraryService(
-        exercise_repository=ExerciseRepository(), muscle_group_repository=MuscleGroupRepository()
-    )
+    return container.library_service
 
 
 async def provide_push_notification_service() -> NotificationService:
-    kafka_supplier = KafkaSupplier(
-        topic=kafka_settings.customer_invite_topic, config={"bootstrap.servers": kafka_settings.bootstrap_servers}
-    )
-    firebase_supplier = PushFirebaseNotificator()
-    return NotificationService(firebase_supplier, kafka_supplier)
+    return container.notification_service
 
 
-async def provide_customer_service(
-    notification_service: NotificationService = Depends(provide_push_notification_service)
-) -> CustomerService:
-    customer_repository = CustomerRepository()
+async def provide_customer_service() -> CustomerService:
+    # keeps the authenticated user, so it's the only customer service created per request
     return CustomerService(
-        selector_service=CustomerSelectorService(customer_repository),
-        profile_service=CustomerProfileService(customer_repository),
-        notification_service=notification_service,
+        selector_service=container.customer_selector_service,
+        profile_service=container.customer_profile_service,
+        notification_service=container.notification_service,
     )
 
 
 async def provide_user_service(
     uow: AsyncSession = Depends(provide_database_unit_of_work),
     token: str = Depends(reuseable_oauth),
-    coach_service: CoachService = Depends(provide_coach_service),
-    customer_service: CustomerService = Depends(provide_customer_service),
 ) -> CoachService | CustomerService:
     """
     Checks that token from client request is valid
+    and resolves the token owner with the single principal query
 
     Args:
         uow: db session injection
         token: token from client request
-        coach_service: service for interacting with coach profile
-        customer_service: service for interacting with customer profile
 
     Raises:
         401: HTTPException: in case if token is expired
         400: HTTPException: in case if credentials are not valid
+        404: HTTPException: in case if token owner doesn't exist
 
     Return:
-        username: username from token in case if it valid
+        service of the token owner with the user set
     """
     try:
         token_data = await decode_jwt_token(token)
@@ -100,54 +211,89 @@ async def provide_user_service(
     except NotValidCredentials:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Not valid credentials")
     else:
-        username = token_data.sub
-
-        coach = await coach_service.get_coach_by_username(uow, username=username)
-        customer = await customer_service.get_customer_by_username(uow, username=username)
+        principal = await container.principal_repository.provide_by_username(uow, username=token_data.sub)
 
-        if coach:
+        if principal is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        elif principal.user_type == UserType.COACH.value:
+            coach_service = await provide_coach_service()
+            coach_service.user = principal.to_coach_dto()
             return coach_service
-        elif customer:
-            return customer_service
         else:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+            customer_service = await provide_customer_service()
+            customer_service.user = principal.to_customer_dto()
+            return customer_service
 
 
-async def provide_product_service() -> ProductService:
-    product_repository = ProductRepository()
-    calories_calculator_service = CaloriesCalculatorService()
-    return ProductService(
-        product_repository=product_repository,
-        calories_calculator_service=calories_calculator_service,
-    )
+async def provide_customer_for_coach(
+    customer_id: str,
+    uow: AsyncSession = Depends(provide_database_unit_of_work),
+    user_service: CoachService | CustomerService = Depends(provide_user_service),
+    customer_service: CustomerService = Depends(provide_customer_service),
+) -> CustomerDtoSchema:
+    """
+    Resolves customer_id from the path to the customer of the current coach.
+    Customer is allowed to access own data only
 
+    Args:
+        customer_id: str(UUID) of the customer from the path
+        uow: db session injection
+        user_service: service of the token owner
+        customer_service: service for interacting with customer
 
-async def provide_diet_service(
-    product_service: ProductService = Depends(provide_product_service)
-) -> DietService:
-    diet_repository = DietRepository()
-    calories_calculator_service = CaloriesCalculatorService()
-    return DietService(
-        diet_repository=diet_repository,
-        calories_calculator_service=calories_calculator_service,
-        product_service=product_service,
-    )
+    Raises:
+        400: HTTPException: in case if customer_id is not valid UUID
+        404: HTTPException: in case if customer doesn't exist
+        403: HTTPException: in case if customer belongs to another coach or another customer asks for it
 
+    Return:
+        customer with fresh data from the database
+    """
+    if not await validate_uuid(customer_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Passed customer_id is not correct UUID value")
 
-async def provide_training_plan_service(
-    product_service: ProductService = Depends(provide_product_service)
-) -> TrainingPlanService:
-    diet_service = DietService(
-        diet_repository=DietRepository(),
-        calories_calculator_service=CaloriesCalculatorService(),
-        product_service=product_service,
-    )
+    user = user_service.user
+    if user_service.user_type == UserType.CUSTOMER.value:
+        if str(user.id) != customer_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access to another customer is forbidden")
+        coach_id = user.coach_id
+    else:
+        coach_id = user.id
 
-    training_plan_repository = TrainingPlanRepository()
-    training_service = TrainingService(TrainingRepository())
+    try:
+        return await customer_service.get_customer_for_coach(uow, coach_id=coach_id, customer_id=UUID(customer_id))
+    except CustomerNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Customer with id {customer_id} not found")
+    except CustomerBelongsToAnotherCoach:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="The customer belongs to another coach")
 
-    return TrainingPlanService(
-        training_plan_repository=training_plan_repository,
-        training_service=training_service,
-        diet_service=diet_service,
-    )
+
+async def provide_customer_for_coach_only(
+    customer_id: str,
+    uow: AsyncSession = Depends(provide_database_unit_of_work),
+    user_service: CoachService | CustomerService = Depends(provide_user_service),
+    customer_service: CustomerService = Depends(provide_customer_service),
+) -> CustomerDtoSchema:
+    """
+    Same as provide_customer_for_coach, but customer isn't allowed even to own data,
+    it guards endpoints changing customer's data on behalf of the coach
+
+    Raises:
+        403: HTTPException: in case if token owner isn't a coach
+    """
+    if user_service.user_type != UserType.COACH.value:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Available for coach only")
+
+    return await provide_customer_for_coach(customer_id, uow, user_service, customer_service)
+
+
+async def provide_product_service() -> ProductService:
+    return container.product_service
+
+
+async def provide_diet_service() -> DietService:
+    return container.diet_service
+
+
+async def provide_training_plan_service() -> TrainingPlanService:
+    return container.training_plan_service
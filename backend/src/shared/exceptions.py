@@ -14,5 +14,27 @@ class TokenExpired(Exception):
     pass
 
 
+class PhotoTooLarge(Exception):
+    pass
+
+
+class CustomerNotFound(Exception):
+    pass
+
+
+class CustomerBelongsToAnotherCoach(Exception):
+    pass
+
+
+class InvalidCursor(Exception):
+    pass
+
+
 class BarcodeAlreadyExistExc(Exception):
     ...
+
+
+class ProductNotFound(Exception):
+    def __init__(self, barcodes: list[str]) -> None:
+        super().__init__(f"products not found: {', '.join(barcodes)}")
+        self.barcodes = barcodes
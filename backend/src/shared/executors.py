@@ -0,0 +1,50 @@
+"""
+Executors for blocking work which mustn't run on the event loop
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from src.shared.metrics import metrics
+
+
+class BoundedExecutor:
+    """
+    Runs blocking calls in a pool with limited number of workers.
+    Calls waiting for a free worker are reported as queue depth.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        executor_class: type[Executor] = ThreadPoolExecutor,
+    ) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self._executor_class = executor_class
+        self._executor: Executor | None = None
+        self._in_flight = 0
+        metrics.register_gauge(f"{name}.queue_depth", lambda: self.queue_depth)
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.max_workers)
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self._executor is None:
+            self._executor = self._executor_class(max_workers=self.max_workers)
+
+        loop = asyncio.get_running_loop()
+        self._in_flight += 1
+        try:
+            return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+        finally:
+            self._in_flight -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
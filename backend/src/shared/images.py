@@ -0,0 +1,87 @@
+"""
+Image processing, functions run in worker processes, so they are kept free of application imports
+"""
+
+import hashlib
+import io
+import os
+import re
+import time
+from typing import Iterable
+
+from PIL import Image
+
+AVATAR_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+AVATAR_DEFAULT_FORMAT = "jpeg"
+AVATAR_FILE_NAME_PATTERN = re.compile(r"^avatar_(?P<digest>[0-9a-f]{32})_(?P<size>\d+)\.(?P<extension>webp|jpeg)$")
+# avatar files, including the ones named by username and upload time before content addressing
+AVATAR_FILE_EXTENSIONS = (".jpeg", ".webp", ".tmp")
+
+
+def avatar_digest(image_bytes: bytes) -> str:
+    return hashlib.sha256(image_bytes).hexdigest()[:32]
+
+
+def avatar_file_name(digest: str, size: int, extension: str = AVATAR_DEFAULT_FORMAT) -> str:
+    return f"avatar_{digest}_{size}.{extension}"
+
+
+def make_avatar_variants(image_bytes: bytes, directory: str, digest: str, sizes: Iterable[int]) -> None:
+    """
+    Saves the image downscaled to fit into every size x size square, in every avatar format.
+    File names are derived from the content digest, so variants of already uploaded image are reused.
+    JPEG is decoded straight at reduced scale, so a full resolution photo is never kept in memory
+    """
+    sizes = sorted(sizes, reverse=True)
+    missing = []
+    for size in sizes:
+        for extension in AVATAR_FORMATS:
+            try:
+                # reused variant is renewed, so garbage collection keeps it until the new reference is committed
+                os.utime(os.path.join(directory, avatar_file_name(digest, size, extension)))
+            except FileNotFoundError:
+                missing.append((size, extension))
+    if not missing:
+        return
+
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        img.draft("RGB", (sizes[0], sizes[0]))
+        img = img.convert("RGB")
+
+        for size, extension in missing:
+            # every variant is downscaled from the biggest one, it's faster than from the original
+            img.thumbnail((size, size))
+            photo_path = os.path.join(directory, avatar_file_name(digest, size, extension))
+            # variant becomes visible only when it's completely written
+            temporary_path = f"{photo_path}.{os.getpid()}.tmp"
+            img.save(temporary_path, AVATAR_FORMATS[extension], quality=85)
+            os.replace(temporary_path, photo_path)
+
+
+def collect_avatar_garbage(directory: str, referenced_files: set[str], grace_seconds: float) -> list[str]:
+    """
+    Removes avatar files which aren't referenced by any user anymore.
+    Variants of referenced avatar are kept together with it.
+    Recent files are kept for grace period, since upload may be still in progress
+    """
+    referenced_digests = set()
+    for file_name in referenced_files:
+        match = AVATAR_FILE_NAME_PATTERN.match(file_name)
+        if match is not None:
+            referenced_digests.add(match["digest"])
+
+    removed = []
+    deadline = time.time() - grace_seconds
+    for entry in os.scandir(directory):
+        if not entry.is_file() or not entry.name.endswith(AVATAR_FILE_EXTENSIONS) or entry.name in referenced_files:
+            continue
+
+        match = AVATAR_FILE_NAME_PATTERN.match(entry.name)
+        if match is not None and match["digest"] in referenced_digests:
+            continue
+
+        if entry.stat().st_mtime < deadline:
+            os.remove(entry.path)
+            removed.append(entry.name)
+
+    return removed
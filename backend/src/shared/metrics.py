@@ -0,0 +1,51 @@
+"""
+In-process application metrics
+"""
+
+import threading
+from collections import defaultdict
+from typing import Callable
+
+
+class MetricsRegistry:
+    """
+    Keeps counters, timings and gauges of the current worker process.
+    The snapshot is exposed through GET /metrics
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._timings: dict[str, dict[str, float]] = {}
+        self._gauges: dict[str, Callable[[], float]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Saves one more measurement, e.g. duration in seconds
+        """
+        with self._lock:
+            timing = self._timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            timing["count"] += 1
+            timing["total"] += value
+            timing["max"] = max(timing["max"], value)
+
+    def register_gauge(self, name: str, callback: Callable[[], float]) -> None:
+        """
+        Gauge value is calculated by callback at the moment of snapshot
+        """
+        self._gauges[name] = callback
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: dict(timing) for name, timing in self._timings.items()}
+
+        gauges = {name: callback() for name, callback in self._gauges.items()}
+        return {"counters": counters, "timings": timings, "gauges": gauges}
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,32 @@
+"""
+Keyset pagination cursors
+"""
+
+import base64
+import json
+from typing import Any
+
+from src.shared.exceptions import InvalidCursor
+
+
+def encode_cursor(*key: Any) -> str:
+    """
+    Packs sort key of the last row on the page into an opaque url safe string
+    """
+    return base64.urlsafe_b64encode(json.dumps(key, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str, *key_types: type) -> list[Any]:
+    """
+    Unpacks sort key, cursor comes from client, so every key part is checked to have the expected JSON type
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError as exc:
+        raise InvalidCursor(cursor) from exc
+
+    if not isinstance(key, list) or len(key) != len(key_types):
+        raise InvalidCursor(cursor)
+    if not all(isinstance(part, key_type) for part, key_type in zip(key, key_types)):
+        raise InvalidCursor(cursor)
+    return key
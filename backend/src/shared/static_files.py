@@ -0,0 +1,42 @@
+"""
+Static files serving
+"""
+
+import os
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from src.shared.images import AVATAR_FILE_NAME_PATTERN
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """
+    Lets clients and proxies keep content addressed avatars forever, as they're never changed after written.
+    Other files are served as usual. ETag is still sent to revalidate evicted copies
+    """
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        if AVATAR_FILE_NAME_PATTERN.match(os.path.basename(full_path)) is None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            method=scope["method"],
+            headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
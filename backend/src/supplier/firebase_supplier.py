@@ -15,13 +15,34 @@ from src.shared.config import (
     FIREBASE_AUTH_PROVIDER_CERT_URL,
     FIREBASE_CLIENT_CERT_URL,
     FIREBASE_UNIVERSE_DOMAIN,
+    FIREBASE_WORKERS,
 )
+from src.shared.executors import BoundedExecutor
+
+
+# firebase allows up to 500 messages in one send_each request
+FIREBASE_SEND_EACH_LIMIT = 500
+# the device token won't ever work again
+DEAD_TOKEN_ERRORS = (messaging.UnregisteredError, messaging.SenderIdMismatchError)
+
+# firebase messaging is blocking, so its calls are offloaded from the event loop
+firebase_executor = BoundedExecutor("firebase", FIREBASE_WORKERS)
 
 
 class PushNotificationEmptyDataMessage(Exception):
     pass
 
 
+@dataclass
+class PushDeliveryResult:
+    recipient_id: str
+    message_id: str | None = None
+    error: str | None = None
+    is_token_dead: bool = False
+    # the message itself is malformed, so it won't ever be delivered
+    is_invalid: bool = False
+
+
 @dataclass
 class FirebaseConfig:
     """
@@ -76,6 +97,63 @@ class PushFirebaseNotificator:
         if not firebase_admin._apps:
             await self.establish_conn_to_firebase()
 
+        result = await firebase_executor.run(messaging.send, self._build_message(recipient_id, recipient_data))
+        return result
+
+    async def send_notifications(self, notifications: list[tuple[str, dict[str, str]]]) -> list[PushDeliveryResult]:
+        """
+        Sends many notifications with as few Firebase requests as possible.
+
+        Args:
+            notifications: pairs of fcm token and message data
+
+        Returns:
+            results: delivery result for every notification in the same order
+        """
+        if not firebase_admin._apps:
+            await self.establish_conn_to_firebase()
+
+        results: list[PushDeliveryResult | None] = [None] * len(notifications)
+        sending_positions = []
+        sending_messages = []
+        for position, (recipient_id, recipient_data) in enumerate(notifications):
+            try:
+                if not await self._valid_recipient_data(recipient_data):
+                    raise PushNotificationEmptyDataMessage("Recipient data must have either title and body")
+                message = self._build_message(recipient_id, recipient_data)
+            except (PushNotificationEmptyDataMessage, ValueError) as exc:
+                results[position] = PushDeliveryResult(recipient_id=recipient_id, error=str(exc), is_invalid=True)
+            else:
+                sending_positions.append(position)
+                sending_messages.append(message)
+
+        for start in range(0, len(sending_messages), FIREBASE_SEND_EACH_LIMIT):
+            chunk_positions = sending_positions[start:start + FIREBASE_SEND_EACH_LIMIT]
+            try:
+                batch_response = await firebase_executor.run(
+                    messaging.send_each, sending_messages[start:start + FIREBASE_SEND_EACH_LIMIT],
+                )
+            except Exception as exc:
+                # other chunks may be already delivered, so only this one is failed
+                for position in chunk_positions:
+                    results[position] = PushDeliveryResult(recipient_id=notifications[position][0], error=str(exc))
+                continue
+
+            for position, response in zip(chunk_positions, batch_response.responses):
+                recipient_id = notifications[position][0]
+                if response.success:
+                    results[position] = PushDeliveryResult(recipient_id=recipient_id, message_id=response.message_id)
+                else:
+                    results[position] = PushDeliveryResult(
+                        recipient_id=recipient_id,
+                        error=str(response.exception),
+                        is_token_dead=isinstance(response.exception, DEAD_TOKEN_ERRORS),
+                    )
+
+        return results
+
+    @staticmethod
+    def _build_message(recipient_id: str, recipient_data: dict[str, str]) -> messaging.Message:
         aps_data = messaging.Aps(
             alert=messaging.ApsAlert(title=recipient_data["title"], body=recipient_data["body"]),
             sound="default",
@@ -85,10 +163,9 @@ class PushFirebaseNotificator:
             token=recipient_id,
             apns=messaging.APNSConfig(payload=messaging.APNSPayload(aps_data)),
         )
-
-        # TODO: make it async
-        result = messaging.send(message)
-        return result
+        # send_each validates the whole chunk before sending, so one invalid message is rejected here alone
+        messaging._MessagingService.encode_message(message)
+        return message
 
     @staticmethod
     async def _valid_recipient_data(recipient_data: dict) -> bool:
@@ -96,3 +173,6 @@ class PushFirebaseNotificator:
         Static until more complex logic
         """
         return "title" in recipient_data and "body" in recipient_data
+
+
+push_firebase_notificator = PushFirebaseNotificator()
@@ -2,7 +2,9 @@ import os
 import logging
 from dataclasses import dataclass
 
-from confluent_kafka import Producer
+from confluent_kafka import KafkaException, Producer
+
+from src.shared.executors import BoundedExecutor
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -12,27 +14,70 @@ logger = logging.getLogger(__name__)
 class KafkaSettings:
     customer_invite_topic: str = os.getenv("KAFKA_CUSTOMER_INVITE_TOPIC", "")
     bootstrap_servers: str = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "")
+    delivery_timeout_seconds: float = float(os.getenv("KAFKA_DELIVERY_TIMEOUT_SECONDS", 10))
+
+
+# sending blocks until the broker acknowledges the messages
+kafka_executor = BoundedExecutor("kafka", 1)
 
 
 class KafkaSupplier:
+    """
+    Producer opens broker connections and threads,
+    so it's created on the first message and shared for the application lifetime
+    """
 
-    def __init__(self, config, topic):
-        self.producer = Producer(**config)
+    def __init__(self, config, topic, delivery_timeout: float = 10):
+        self.config = config
         self.topic = topic
+        self.delivery_timeout = delivery_timeout
+        self._producer: Producer | None = None
+
+    @property
+    def producer(self) -> Producer:
+        if self._producer is None:
+            self._producer = Producer(**self.config)
+        return self._producer
 
     def acked(self, err, msg):
         if err is not None:
             logger.warning(f"Failed to deliver message: {msg.value()}: {err}")
         else:
-            logger.info(f"Message successfully sent in {msg.customer_invite_topic()} [{msg.partition()}]")
+            logger.info(f"Message successfully sent in {msg.topic()} [{msg.partition()}]")
+
+    def send_messages(self, messages: list[str]) -> list[str | None]:
+        """
+        Produces all messages and waits for the broker acknowledgements once,
+        so message is reported as sent only when it's really written to the topic.
+        Returns delivery error of every message, None for the delivered one
+        """
+        errors = [f"Message in {self.topic} isn't acknowledged in {self.delivery_timeout}s"] * len(messages)
+
+        def make_on_delivery(index):
+            def on_delivery(err, msg):
+                self.acked(err, msg)
+                errors[index] = None if err is None else f"Failed to deliver message in {self.topic}: {err}"
+            return on_delivery
+
+        for index, message in enumerate(messages):
+            try:
+                self.producer.produce(self.topic, message.encode('utf-8'), on_delivery=make_on_delivery(index))
+            except (BufferError, KafkaException) as exc:
+                errors[index] = f"Failed to produce message in {self.topic}: {exc}"
 
-    def send_message(self, message):
-        self.producer.produce(self.topic, message.encode('utf-8'), callback=self.acked)
-        self.producer.poll(0)
-        logger.info(f"Message successfully sent in {self.topic}: {message}")
+        self.producer.flush(self.delivery_timeout)
+        return errors
 
-    def close(self):
-        self.producer.flush()
+    def close(self, timeout: float = 10):
+        if self._producer is not None:
+            not_delivered = self._producer.flush(timeout)
+            if not_delivered:
+                logger.warning(f"Failed to deliver {not_delivered} messages in {self.topic} before shutdown")
 
 
 kafka_settings = KafkaSettings()
+kafka_customer_invite_supplier = KafkaSupplier(
+    topic=kafka_settings.customer_invite_topic,
+    config={"bootstrap.servers": kafka_settings.bootstrap_servers},
+    delivery_timeout=kafka_settings.delivery_timeout_seconds,
+)
@@ -4,6 +4,7 @@ Move it to the UserService/CoachService/CustomerService
 
 import random
 import string
+import time
 
 import uuid
 from datetime import timedelta, datetime
@@ -16,11 +17,17 @@ from src.shared.config import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     REFRESH_TOKEN_EXPIRE_MINUTES,
     ALGORITHM, JWT_SECRET_KEY,
-    JWT_REFRESH_SECRET_KEY
+    JWT_REFRESH_SECRET_KEY,
+    PASSWORD_HASHING_WORKERS,
 )
+from src.schemas.token_dto import TokenPayload
+from src.shared.cache import token_cache
 from src.shared.exceptions import TokenExpired, NotValidCredentials
+from src.shared.executors import BoundedExecutor
 
 password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt takes hundreds of milliseconds, so it's done outside of the event loop
+password_hashing_executor = BoundedExecutor("password_hashing", PASSWORD_HASHING_WORKERS)
 
 
 def validate_phone_number(phone_number: str):
@@ -55,7 +62,7 @@ async def get_hashed_password(password: str) -> str:
     Returns:
         hashed password
     """
-    return password_context.hash(password)
+    return await password_hashing_executor.run(password_context.hash, password)
 
 
 async def verify_password(password: str, hashed_password: str) -> bool:
@@ -73,7 +80,7 @@ async def verify_password(password: str, hashed_password: str) -> bool:
     if not is_identified:
         return False
 
-    is_verified = password_context.verify(password, hashed_password)
+    is_verified = await password_hashing_executor.run(password_context.verify, password, hashed_password)
     if is_verified:
         return True
     return False
@@ -113,12 +120,14 @@ async def create_refresh_token(subject: str) -> str:
     return encoded_jwt
 
 
-async def decode_jwt_token(token: str):
+async def decode_jwt_token(token: str) -> TokenPayload:
     """
-    Decodes given token
+    Decodes given token,
+    verified token payload is cached until the token expires
     """
-    # TODO: fix it
-    from src.presentation.schemas.profile_schema import TokenPayload
+    token_data = token_cache.get(token)
+    if token_data is not None:
+        return token_data
 
     try:
         payload = jwt.decode(
@@ -130,6 +139,7 @@ async def decode_jwt_token(token: str):
         if expiration_time < datetime.now():
             raise TokenExpired
 
+        token_cache.set(token, token_data, ttl=token_data.exp - time.time())
         return token_data
 
     except (jwt.JWTError, ValidationError):  # type: ignore
@@ -31,3 +31,34 @@ async def test_customer_get_me(create_customer):
     assert response_json.get("user_type") == "customer"
     assert response_json.get("username") == create_customer.username
     assert response_json.get("first_name") == create_customer.first_name
+
+
+@pytest.mark.asyncio
+async def test_get_me_resolves_user_with_single_query(create_customer, query_counter):
+    """Tests that authenticated user is resolved by one database query"""
+
+    query_counter.clear()
+    response = await make_test_http_request("/api/me", "get", create_customer.username)
+    assert response.status_code == 200
+    assert len(query_counter) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_me_unknown_user(db):
+    """Tests that token of not existing user is rejected"""
+
+    response = await make_test_http_request("/api/me", "get", "+79990000000")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_me_uses_cached_user(create_coach, query_counter):
+    """Tests that repeated requests with the same token don't query the user again"""
+
+    response = await make_test_http_request("/api/me", "get", create_coach.username)
+    assert response.status_code == 200
+
+    query_counter.clear()
+    response = await make_test_http_request("/api/me", "get", create_coach.username)
+    assert response.status_code == 200
+    assert len(query_counter) == 0
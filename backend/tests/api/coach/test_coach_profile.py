@@ -1,4 +1,13 @@
+import io
+import os
+
 import pytest
+from httpx import AsyncClient
+from PIL import Image
+
+from src.main import app
+from src.shared.cache import principal_cache
+from src.shared.config import STATIC_DIR
 
 from tests.conftest import make_test_http_request
 
@@ -41,3 +50,99 @@ async def test_update_coach_profile(create_coach):
     assert response_data["email"] == update_user_data["email"]
     assert response_data["user_type"] == "coach"
     assert response_data["gender"] == "female"
+
+
+@pytest.mark.asyncio
+async def test_get_coach_profile_after_update(create_coach):
+    """
+    Updated profile is returned instead of the cached one
+    """
+    response = await make_test_http_request("/api/profiles", "get", create_coach.username)
+    assert response.json()["email"] is None
+
+    update_user_data = {
+        "first_name": create_coach.first_name,
+        "username": create_coach.username,
+        "email": "example@yandex.ru",
+    }
+    response = await make_test_http_request("/api/profiles", "post", create_coach.username, data=update_user_data)
+    assert response.status_code == 200
+
+    response = await make_test_http_request("/api/profiles", "get", create_coach.username)
+    assert response.json()["email"] == update_user_data["email"]
+
+
+@pytest.mark.asyncio
+async def test_confirm_password_after_profile_update(create_coach):
+    """
+    Cached user doesn't keep the password hash, profile update doesn't touch the password
+    """
+    update_user_data = {"first_name": create_coach.first_name, "username": create_coach.username}
+    response = await make_test_http_request("/api/profiles", "post", create_coach.username, data=update_user_data)
+    assert response.status_code == 200
+
+    response = await make_test_http_request("/api/profiles", "get", create_coach.username)
+    assert not hasattr(principal_cache.get(create_coach.username), "password")
+
+    response = await make_test_http_request(
+        "/api/confirm_password", "post", create_coach.username, data={"current_password": "qwerty123456"}
+    )
+    assert response.json()["confirmed_password"] is True
+
+
+def make_jpeg(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color=(200, 120, 40)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_update_coach_profile_photo(create_coach):
+    """
+    Uploaded photo is downscaled to content addressed variants served as immutable files
+    """
+    update_user_data = {"first_name": create_coach.first_name, "username": create_coach.username}
+    files = {"photo": ("avatar.jpeg", make_jpeg(1600, 1200), "image/jpeg")}
+
+    response = await make_test_http_request(
+        "/api/profiles", "post", create_coach.username, data=update_user_data, files=files
+    )
+    assert response.status_code == 200
+
+    response_data = response.json()
+    variants = response_data["photo_variants"]
+    try:
+        assert {(variant["size"], variant["format"]) for variant in variants} == {
+            (size, extension) for size in (140, 280, 560) for extension in ("webp", "jpeg")
+        }
+        assert response_data["photo_link"].endswith("_140.jpeg")
+        for variant in variants:
+            with Image.open(os.path.join(STATIC_DIR, os.path.basename(variant["link"]))) as img:
+                assert img.size == (variant["size"], variant["size"] * 3 // 4)
+                assert img.format == variant["format"].upper()
+
+        async with AsyncClient(app=app, base_url="http://as-coach") as ac:
+            response = await ac.get(response_data["photo_link"])
+            assert response.status_code == 200
+            assert "immutable" in response.headers["cache-control"]
+
+            response = await ac.get(response_data["photo_link"], headers={"If-None-Match": response.headers["etag"]})
+            assert response.status_code == 304
+    finally:
+        for variant in variants:
+            os.remove(os.path.join(STATIC_DIR, os.path.basename(variant["link"])))
+
+
+@pytest.mark.asyncio
+async def test_update_coach_profile_photo_too_large(create_coach, monkeypatch):
+    """
+    Upload exceeding the size limit is rejected before decoding
+    """
+    monkeypatch.setattr("src.service.user_service.AVATAR_MAX_UPLOAD_BYTES", 1024)
+    update_user_data = {"first_name": create_coach.first_name, "username": create_coach.username}
+    files = {"photo": ("avatar.jpeg", make_jpeg(800, 600), "image/jpeg")}
+
+    response = await make_test_http_request(
+        "/api/profiles", "post", create_coach.username, data=update_user_data, files=files
+    )
+    assert response.status_code == 413
@@ -1,11 +1,13 @@
 import pytest
+from sqlalchemy import select
 
+from src import OutboxMessage
 from src.shared.config import TEST_CUSTOMER_FIRST_NAME, TEST_CUSTOMER_LAST_NAME
 from tests.conftest import make_test_http_request
 
 
 @pytest.mark.asyncio
-async def test_create_customer_successfully_with_telegram_username(create_coach, mock_send_kafka_message):
+async def test_create_customer_successfully_with_telegram_username(create_coach, db, mock_send_kafka_message):
     customer_data = {
         "first_name": TEST_CUSTOMER_FIRST_NAME,
         "last_name": TEST_CUSTOMER_LAST_NAME,
@@ -15,12 +17,16 @@ async def test_create_customer_successfully_with_telegram_username(create_coach,
     response = await make_test_http_request("/api/customers", "post", create_coach.username, json=customer_data)
     assert response.status_code == 201
 
-    # check that we sent event to Kafka to invite new customer in the application
-    mock_send_kafka_message.assert_called_once()
+    # check that event to invite new customer in the application is put to outbox to be sent to Kafka
+    result = await db.execute(select(OutboxMessage))
+    outbox_messages = result.scalars().all()
+    assert [message.message_type for message in outbox_messages] == ["telegram_customer_invite"]
+    assert "@test_telegram_user" in outbox_messages[0].payload["message"]
+    mock_send_kafka_message.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_create_customer_successfully_without_telegram_username(create_coach, mock_send_kafka_message):
+async def test_create_customer_successfully_without_telegram_username(create_coach, db, mock_send_kafka_message):
     customer_data = {
         "first_name": TEST_CUSTOMER_FIRST_NAME,
         "last_name": TEST_CUSTOMER_LAST_NAME,
@@ -30,7 +36,9 @@ async def test_create_customer_successfully_without_telegram_username(create_coa
     response = await make_test_http_request("/api/customers", "post", create_coach.username, json=customer_data)
     assert response.status_code == 201
 
-    # check that we didn't send event to Kafka to invite new customer in the application
+    # check that we didn't put event to invite new customer in the application
+    result = await db.execute(select(OutboxMessage))
+    assert result.scalars().all() == []
     mock_send_kafka_message.assert_not_called()
 
 
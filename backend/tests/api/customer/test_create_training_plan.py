@@ -4,7 +4,9 @@ import pytest
 from sqlalchemy import select, delete
 from sqlalchemy.orm import selectinload
 
-from src import TrainingPlan, MuscleGroup, ExercisesOnTraining
+from src import TrainingPlan, MuscleGroup, ExercisesOnTraining, Diet, DietDays
+from src.presentation.schemas.training_plan_schema import TrainingPlanIn
+from src.shared.dependencies import provide_training_plan_service
 from tests.conftest import make_test_http_request
 
 
@@ -190,3 +192,143 @@ async def test_create_training_plan_with_supersets_successfully(
             delete(TrainingPlan).where(TrainingPlan.id == response.json()["id"])
         )
         await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_create_training_plan_statements_do_not_depend_on_plan_size(
+    create_customer,
+    create_exercises,
+    db,
+    query_counter,
+):
+    """
+    Plan is written by the same statements whether it has one exercise or all of them
+    """
+    training_plan_service = await provide_training_plan_service()
+
+    def make_training_plan_data(number_of_trainings: int, exercises: list) -> TrainingPlanIn:
+        return TrainingPlanIn(
+            start_date=date.today().strftime('%Y-%m-%d'),
+            end_date=(date.today() + timedelta(days=7)).strftime('%Y-%m-%d'),
+            diets=[{"proteins": 200, "fats": 100, "carbs": 400}] * number_of_trainings,
+            trainings=[
+                {
+                    "name": f"Тренировка {number}",
+                    "exercises": [
+                        dict(id=str(exercise.id), sets=[12, 12, 12], supersets=[]) for exercise in exercises
+                    ],
+                }
+                for number in range(number_of_trainings)
+            ],
+            set_rest=60,
+            exercise_rest=120,
+        )
+
+    executed_statements = []
+    for training_plan_data in (
+        make_training_plan_data(1, create_exercises[:1]),
+        make_training_plan_data(5, create_exercises),
+    ):
+        query_counter.clear()
+        training_plan = await training_plan_service.create_training_plan(db, str(create_customer.id), training_plan_data)
+        executed_statements.append(list(query_counter))
+
+        assert len(training_plan.trainings) == len(training_plan_data.trainings)
+        assert {
+            training.number_of_exercises for training in training_plan.trainings
+        } == {len(training_plan_data.trainings[0].exercises)}
+
+    # multi-values INSERT and IN clause grow with the plan, but stay single statements
+    assert len(executed_statements[0]) == len(executed_statements[1])
+    assert len([statement for statement in executed_statements[0] if statement.startswith("INSERT")]) == 4
+
+
+@pytest.mark.asyncio
+async def test_training_plan_writes_maintain_customer_last_plan_end_date(create_customer, db):
+    """
+    Customer keeps the end date of the latest plan when plans are created and deleted
+    """
+    customer_url = f"/api/customers/{create_customer.id}"
+    coach_username = create_customer.coach.username
+
+    training_plan_ids = []
+    for end_date in (date.today() + timedelta(days=14), date.today() + timedelta(days=7)):
+        training_plan_data = {
+            "start_date": date.today().strftime('%Y-%m-%d'),
+            "end_date": end_date.strftime('%Y-%m-%d'),
+            "diets": [{"proteins": 200, "fats": 100, "carbs": 400}],
+            "trainings": [],
+            "set_rest": 60,
+            "exercise_rest": 120,
+        }
+        response = await make_test_http_request(
+            f"{customer_url}/training_plans", "post", coach_username, json=training_plan_data
+        )
+        assert response.status_code == 201
+        training_plan_ids.append(response.json()["id"])
+
+    response = await make_test_http_request(customer_url, "get", coach_username)
+    assert response.json()["last_plan_end_date"] == (date.today() + timedelta(days=14)).strftime('%Y-%m-%d')
+
+    response = await make_test_http_request(f"{customer_url}/training_plans/{training_plan_ids[0]}", "delete", coach_username)
+    assert response.status_code == 204
+
+    response = await make_test_http_request(customer_url, "get", coach_username)
+    assert response.json()["last_plan_end_date"] == (date.today() + timedelta(days=7)).strftime('%Y-%m-%d')
+
+    response = await make_test_http_request(f"{customer_url}/training_plans/{training_plan_ids[1]}", "delete", coach_username)
+    assert response.status_code == 204
+
+    response = await make_test_http_request(customer_url, "get", coach_username)
+    assert response.json()["last_plan_end_date"] is None
+
+    response = await make_test_http_request(f"{customer_url}/training_plans/{training_plan_ids[1]}", "delete", coach_username)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_delete_training_plan_with_logged_diet_day(create_customer, db):
+    """
+    Days logged by customer are deleted together with the plan diets
+    """
+    customer_url = f"/api/customers/{create_customer.id}"
+    coach_username = create_customer.coach.username
+    training_plan_data = {
+        "start_date": date.today().strftime('%Y-%m-%d'),
+        "end_date": (date.today() + timedelta(days=7)).strftime('%Y-%m-%d'),
+        "diets": [{"proteins": 200, "fats": 100, "carbs": 400}],
+        "trainings": [],
+        "set_rest": 60,
+        "exercise_rest": 120,
+    }
+    response = await make_test_http_request(
+        f"{customer_url}/training_plans", "post", coach_username, json=training_plan_data
+    )
+    training_plan_id = response.json()["id"]
+
+    diet_id = await db.scalar(select(Diet.id).where(Diet.training_plan_id == training_plan_id))
+    db.add(DietDays(date=date.today(), diet_id=diet_id))
+    await db.commit()
+
+    response = await make_test_http_request(f"{customer_url}/training_plans/{training_plan_id}", "delete", coach_username)
+    assert response.status_code == 204
+
+    response = await make_test_http_request(customer_url, "get", coach_username)
+    assert response.json()["last_plan_end_date"] is None
+    assert await db.scalar(select(DietDays.id).where(DietDays.diet_id == diet_id)) is None
+
+
+@pytest.mark.asyncio
+async def test_create_training_plan_failed_by_customer(create_customer, db):
+    training_plan_data = {
+        "start_date": date.today().strftime('%Y-%m-%d'),
+        "end_date": (date.today() + timedelta(days=7)).strftime('%Y-%m-%d'),
+        "diets": [],
+        "trainings": [],
+        "set_rest": 60,
+        "exercise_rest": 120,
+    }
+    response = await make_test_http_request(
+        f"/api/customers/{create_customer.id}/training_plans", "post", create_customer.username, json=training_plan_data
+    )
+    assert response.status_code == 403
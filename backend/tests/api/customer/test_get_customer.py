@@ -1,8 +1,12 @@
-import pytest
+from datetime import date, timedelta
+from uuid import uuid4
 
+import pytest
 from sqlalchemy import delete
 
-from src import Customer
+from src import Coach, Customer
+from src.repository.customer_repository import CustomerRepository
+from src.shared.pagination import encode_cursor
 from tests.conftest import make_test_http_request
 
 
@@ -68,3 +72,142 @@ async def test_get_specific_customer_failed_not_valid_uuid(create_coach, db):
     """
     response = await make_test_http_request(f"/api/customers/7a8sdgajksd8asdb", "get", create_coach.username)
     assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_specific_customer_failed_not_found(create_coach, db):
+    response = await make_test_http_request(
+        "/api/customers/7a3b5e1c-3f0a-4d2b-9c1e-6f8a2d4b0c11", "get", create_coach.username
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_specific_customer_failed_another_coach(create_customer, db):
+    """
+    Customer of another coach is forbidden for the customer itself and his plans
+    """
+    another_coach = Coach(
+        username="+79051112233", first_name="Petr", last_name="Ivanov", password="qwerty123456", fcm_token="token"
+    )
+    db.add(another_coach)
+    await db.commit()
+
+    for url in (f"/api/customers/{create_customer.id}", f"/api/customers/{create_customer.id}/training_plans"):
+        response = await make_test_http_request(url, "get", another_coach.username)
+        assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_get_customer_for_coach_single_query(create_customer, db, query_counter):
+    customer_repository = CustomerRepository()
+
+    query_counter.clear()
+    customer = await customer_repository.get_customer_for_coach(
+        db, coach_id=create_customer.coach_id, customer_id=create_customer.id
+    )
+    assert len(query_counter) == 1
+    assert customer.id == create_customer.id
+
+
+@pytest.mark.asyncio
+async def test_get_customers_page_by_page(create_coach, db):
+    """
+    Pages go in the same order as the full list, archived customers are in the end
+    """
+    plan_end_dates = {
+        "Без плана": None,
+        "Архивный": date.today() - timedelta(days=60),
+        "Недавний": date.today() - timedelta(days=10),
+        "Текущий": date.today() + timedelta(days=5),
+        "Давний": date.today() - timedelta(days=90),
+    }
+    for number, (first_name, end_date) in enumerate(plan_end_dates.items()):
+        customer = Customer(
+            first_name=first_name,
+            last_name="Клиентов",
+            username=f"+7999000000{number}",
+            password="1234",
+            coach_id=create_coach.id,
+            last_plan_end_date=end_date,
+        )
+        db.add(customer)
+    await db.commit()
+
+    customers, cursor = [], None
+    while True:
+        url = "/api/customers/paginated?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        response = await make_test_http_request(url, "get", create_coach.username)
+        assert response.status_code == 200
+
+        page = response.json()
+        assert len(page["customers"]) <= 2
+        customers.extend(page["customers"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [customer["first_name"] for customer in customers] == [
+        "Без плана", "Недавний", "Текущий", "Давний", "Архивный",
+    ]
+    assert [customer["archived"] for customer in customers] == [False, False, False, True, True]
+
+    response = await make_test_http_request("/api/customers", "get", create_coach.username)
+    assert [customer["id"] for customer in response.json()] == [customer["id"] for customer in customers]
+
+
+@pytest.mark.asyncio
+async def test_get_customers_next_page_keeps_archive_date(create_coach, db):
+    """
+    Next pages split archived customers by the date of the first page, e.g. when they're read after midnight
+    """
+    for number, end_date in enumerate((date.today() - timedelta(days=60), date.today() - timedelta(days=90))):
+        db.add(
+            Customer(
+                first_name=f"Клиент {number}",
+                last_name="Клиентов",
+                username=f"+7999000000{number}",
+                password="1234",
+                coach_id=create_coach.id,
+                last_plan_end_date=end_date,
+            )
+        )
+    await db.commit()
+
+    cursor = encode_cursor(date.today() - timedelta(days=100), False, date.min, uuid4())
+    response = await make_test_http_request(
+        f"/api/customers/paginated?cursor={cursor}", "get", create_coach.username
+    )
+    assert response.status_code == 200
+    assert [customer["archived"] for customer in response.json()["customers"]] == [False, False]
+
+
+@pytest.mark.asyncio
+async def test_get_customers_page_failed_not_valid_cursor(create_coach, db):
+    response = await make_test_http_request("/api/customers/paginated?cursor=not-a-cursor", "get", create_coach.username)
+    assert response.status_code == 400
+
+    # well formed cursor with tampered key types
+    for key in (
+        ("2026-10-17", False, "2026-10-17", 42),
+        ("2026-10-17", 1, "2026-10-17", str(uuid4())),
+        ("2026-10-17", False, None, str(uuid4())),
+        ("yesterday", False, "2026-10-17", str(uuid4())),
+    ):
+        response = await make_test_http_request(
+            f"/api/customers/paginated?cursor={encode_cursor(*key)}", "get", create_coach.username
+        )
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_customer_by_pk_single_query(create_customer, create_trainings, create_diets, db, query_counter):
+    """
+    Customer is read without the plans
+    """
+    customer_repository = CustomerRepository()
+
+    query_counter.clear()
+    customer = await customer_repository.provide_by_pk(db, str(create_customer.id))
+    assert len(query_counter) == 1
+    assert customer.coach_id == create_customer.coach_id
@@ -3,7 +3,8 @@ from datetime import datetime
 
 from sqlalchemy import delete
 
-from src import TrainingPlan
+from src import TrainingPlan, ExercisesOnTraining
+from src.repository.training_plan_repository import TrainingPlanRepository
 from tests.conftest import make_test_http_request
 
 
@@ -84,3 +85,40 @@ async def test_get_training_plan_with_supersets(
 
     # exercises have the same superset_id
     assert len(superset_ids_set) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_training_plan_reads_plan_tree_with_single_query(
+    create_customer,
+    create_training_plans,
+    create_diets,
+    create_trainings,
+    create_exercises,
+    db,
+    query_counter,
+):
+    """
+    The same exercise scheduled on two trainings keeps own sets on each of them,
+    whole plan is read within one query
+    """
+    chest_training, biceps_training = create_trainings[0], create_trainings[1]
+    exercise = create_exercises[0]
+    db.add_all([
+        ExercisesOnTraining(training_id=chest_training.id, exercise_id=exercise.id, sets=[12, 10], ordering=0),
+        ExercisesOnTraining(training_id=biceps_training.id, exercise_id=exercise.id, sets=[8, 8, 8], ordering=0),
+    ])
+    await db.flush()
+
+    query_counter.clear()
+
+    training_plan = await TrainingPlanRepository().provide_training_plan_detail_by_id(db, create_training_plans[0].id)
+
+    assert len(query_counter) == 1
+    assert training_plan.proteins == "200"
+    assert training_plan.calories == "2900"
+
+    trainings = {training.id: training for training in training_plan.trainings}
+    assert len(trainings) == len(create_trainings)
+    assert [exercise.sets for exercise in trainings[str(chest_training.id)].exercises] == [[12, 10]]
+    assert [exercise.sets for exercise in trainings[str(biceps_training.id)].exercises] == [[8, 8, 8]]
+    assert trainings[str(biceps_training.id)].number_of_exercises == 1
@@ -1,8 +1,12 @@
-from datetime import timedelta
+import asyncio
+from datetime import date, timedelta
 
 import pytest
 from unittest.mock import patch
+from sqlalchemy import func, select
 
+from src import DietDays
+from src.database import SessionLocal
 from src.schemas.product_dto import ProductDtoSchema
 from tests.conftest import make_test_http_request
 
@@ -32,6 +36,100 @@ async def test_get_customer_daily_diet(create_diets):
     assert "snacks" in meals
 
 
+@pytest.mark.asyncio
+async def test_get_customer_daily_diet_returns_requested_day(create_diets):
+    customer_username = create_diets[0].training_plans.customer.username
+
+    for logged_day in create_diets[0].diet_days:
+        response = await make_test_http_request(
+            url=f"api/nutrition/diets/{logged_day.date}",
+            method="get",
+            username=customer_username,
+        )
+
+        assert response.status_code == 200
+        meals = response.json()["actual_nutrition"]
+        assert meals["breakfast"] == logged_day.breakfast
+        assert meals["daily_total"]["consumed_calories"] == int(logged_day.consumed_calories)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_opening_of_daily_diet_creates_one_day(committed_diet):
+    responses = await asyncio.gather(
+        *[
+            make_test_http_request(
+                url=f"api/nutrition/diets/{date.today()}",
+                method="get",
+                username=committed_diet.training_plans.customer.username,
+            )
+            for _ in range(5)
+        ]
+    )
+
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.json()["id"] for response in responses}) == 1
+
+    async with SessionLocal() as session:
+        days_count = await session.scalar(
+            select(func.count()).select_from(DietDays).where(DietDays.diet_id == committed_diet.id)
+        )
+    assert days_count == 1
+
+
+@pytest.mark.asyncio
+@patch("src.repository.product_repository.ProductRepository.get_products_by_barcodes")
+async def test_concurrent_adding_products_to_meal_keeps_all_products(mock_get_products, committed_diet):
+    customer = committed_diet.training_plans.customer
+    response = await make_test_http_request(
+        url=f"api/nutrition/diets/{date.today()}",
+        method="get",
+        username=customer.username,
+    )
+    daily_diet_id = response.json()["id"]
+
+    mock_get_products.return_value = {
+        "123456789": ProductDtoSchema(
+            name="Продукт",
+            barcode="123456789",
+            type="gram",
+            proteins=10,
+            fats=10,
+            carbs=10,
+            calories=170,
+            vendor_name="Простаквашино",
+            user_id=str(customer.id),
+        ),
+    }
+    product_data = {
+        "daily_diet_id": daily_diet_id,
+        "meal_type": "lunch",
+        "product_data": [{"barcode": "123456789", "amount": 100}],
+    }
+
+    responses = await asyncio.gather(
+        *[
+            make_test_http_request(
+                url="api/nutrition/diets",
+                method="post",
+                json=product_data,
+                username=customer.username,
+            )
+            for _ in range(5)
+        ]
+    )
+    assert all(response.status_code == 201 for response in responses)
+
+    response = await make_test_http_request(
+        url=f"api/nutrition/diets/{date.today()}",
+        method="get",
+        username=customer.username,
+    )
+    meals = response.json()["actual_nutrition"]
+    assert len(meals["lunch"]["products"]) == 5
+    assert meals["lunch"]["total_calories"] == 170 * 5
+    assert meals["daily_total"]["consumed_calories"] == 170 * 5
+
+
 @pytest.mark.asyncio
 @patch("src.repository.product_repository.ProductRepository.get_products_by_barcodes")
 async def test_add_product_to_diet(mock_insert_product, create_diets):
@@ -40,6 +138,8 @@ async def test_add_product_to_diet(mock_insert_product, create_diets):
     prev_consumed_proteins = updating_daily_diet.breakfast["total_proteins"]
     prev_consumed_fats = updating_daily_diet.breakfast["total_fats"]
     prev_consumed_carbs = updating_daily_diet.breakfast["total_carbs"]
+    prev_daily_consumed_calories = updating_daily_diet.consumed_calories
+    prev_daily_consumed_proteins = updating_daily_diet.consumed_proteins
 
     daily_diet_id = str(create_diets[0].diet_days[0].id)
     customer_username = create_diets[0].training_plans.customer.username
@@ -76,7 +176,11 @@ async def test_add_product_to_diet(mock_insert_product, create_diets):
         vendor_name="Простаквашино",
         user_id=str(create_diets[0].training_plans.customer.id),
     )
-    mock_insert_product.return_value = [full_product_info_1, full_product_info_2]
+    # keyed by barcode in reverse order, products must be matched by barcode
+    mock_insert_product.return_value = {
+        full_product_info_2.barcode: full_product_info_2,
+        full_product_info_1.barcode: full_product_info_1,
+    }
 
     response = await make_test_http_request(
         url=f"api/nutrition/diets",
@@ -102,3 +206,28 @@ async def test_add_product_to_diet(mock_insert_product, create_diets):
     assert prev_consumed_proteins + added_proteins == response_json["actual_nutrition"][updating_meal]["total_proteins"]
     assert prev_consumed_fats + added_fats == response_json["actual_nutrition"][updating_meal]["total_fats"]
     assert prev_consumed_carbs + added_carbs == response_json["actual_nutrition"][updating_meal]["total_carbs"]
+
+    daily_total = response_json["actual_nutrition"]["daily_total"]
+    assert int(prev_daily_consumed_calories + added_calories) == daily_total["consumed_calories"]
+    assert int(prev_daily_consumed_proteins + added_proteins) == daily_total["consumed_proteins"]
+
+
+@pytest.mark.asyncio
+@patch("src.repository.product_repository.ProductRepository.get_products_by_barcodes")
+async def test_add_unknown_product_to_diet(mock_get_products, create_diets):
+    mock_get_products.return_value = {}
+    product_data = {
+        "daily_diet_id": str(create_diets[0].diet_days[0].id),
+        "meal_type": "breakfast",
+        "product_data": [{"barcode": "000000000", "amount": 100}],
+    }
+
+    response = await make_test_http_request(
+        url="api/nutrition/diets",
+        method="post",
+        json=product_data,
+        username=create_diets[0].training_plans.customer.username,
+    )
+
+    assert response.status_code == 404
+    assert "000000000" in response.json()["detail"]
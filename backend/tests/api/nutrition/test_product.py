@@ -1,7 +1,13 @@
 import pytest
 from unittest.mock import patch
+from uuid import uuid4
 
+from src import ProductSearch
+from src.persistence.dynamo_db_models import Product
+from src.repository.product_repository import ProductRepository
+from src.presentation.schemas.product_schema import ProductCreateIn
 from src.schemas.product_dto import ProductDtoSchema
+from src.service.product_service import ProductService
 from src.service.calories_calculator_service import CaloriesCalculatorService
 from tests.conftest import make_test_http_request
 
@@ -31,6 +37,79 @@ async def test_get_product(mock_get_product_by_barcode, create_customer):
     assert response.status_code == 200
 
 
+@pytest.mark.asyncio
+@patch("src.repository.product_repository.Product.get")
+async def test_get_product_is_cached(mock_product_get, create_customer):
+    mock_product_get.return_value = Product(
+        barcode="123456789",
+        name="Test Product",
+        type="food",
+        proteins=10,
+        fats=5,
+        carbs=20,
+        calories=200,
+        vendor_name="Test Vendor",
+        user_id=str(create_customer.id),
+    )
+
+    for _ in range(2):
+        response = await make_test_http_request(
+            url="api/nutrition/products/123456789",
+            method="get",
+            username=create_customer.username,
+        )
+        assert response.status_code == 200
+        assert response.json()["name"] == "Test Product"
+
+    mock_product_get.assert_called_once_with("123456789")
+
+
+@pytest.mark.asyncio
+@patch("src.repository.product_repository.Product.get", side_effect=Product.DoesNotExist)
+async def test_get_unknown_product_is_cached(mock_product_get, create_customer):
+    for _ in range(2):
+        response = await make_test_http_request(
+            url="api/nutrition/products/000000000",
+            method="get",
+            username=create_customer.username,
+        )
+        assert response.status_code == 404
+
+    mock_product_get.assert_called_once_with("000000000")
+
+
+@pytest.mark.asyncio
+@patch("src.repository.product_repository.Product.batch_get")
+async def test_get_products_by_barcodes_in_batches(mock_batch_get, db):
+    def batch_get(barcodes):
+        # DynamoDB returns found items in arbitrary order
+        return [
+            Product(
+                barcode=barcode,
+                name=f"Product {barcode}",
+                type="gram",
+                proteins=1,
+                fats=1,
+                carbs=1,
+                calories=17,
+                vendor_name="Vendor",
+                user_id="user",
+            )
+            for barcode in reversed(barcodes)
+            if barcode != "unknown"
+        ]
+
+    mock_batch_get.side_effect = batch_get
+    barcodes = [str(number) for number in range(250)] + ["1", "unknown"]
+
+    products = await ProductRepository().get_products_by_barcodes(barcodes)
+
+    assert mock_batch_get.call_count == 3
+    assert all(len(call.args[0]) <= 100 for call in mock_batch_get.call_args_list)
+    assert set(products) == {str(number) for number in range(250)}
+    assert all(barcode == product.barcode for barcode, product in products.items())
+
+
 @pytest.mark.asyncio
 @patch("src.repository.product_repository.ProductRepository.insert_product")
 @patch("src.repository.product_repository.ProductRepository.get_product_by_barcode")
@@ -78,6 +157,31 @@ async def test_create_product(mock_get_product_by_barcode, mock_insert_product,
     assert response_json.get("name") is not None
 
 
+@pytest.mark.asyncio
+@patch("src.repository.product_repository.ProductRepository.delete_product_by_barcode")
+@patch("src.repository.product_repository.ProductRepository.insert_product_to_search", side_effect=RuntimeError)
+@patch("src.repository.product_repository.ProductRepository.insert_product")
+@patch("src.repository.product_repository.ProductRepository.get_product_by_barcode", return_value=None)
+async def test_create_product_is_removed_when_mirror_fails(
+    mock_get_product_by_barcode, mock_insert_product, mock_insert_product_to_search, mock_delete_product, db,
+):
+    """
+    Product saved to DynamoDB is removed, if it can't be mirrored to the search table
+    """
+    product_data = ProductCreateIn(
+        name="творог", barcode="123456789", type="gram", proteins=20, fats=5, carbs=0, vendor_name="простаквашино",
+    )
+    mock_insert_product.return_value = ProductDtoSchema(
+        **product_data.dict(exclude={"portion_size"}), calories=125, user_id="user id",
+    )
+    product_service = ProductService(ProductRepository(), CaloriesCalculatorService())
+
+    with pytest.raises(RuntimeError):
+        await product_service.create_product(db, uuid4(), product_data)
+
+    mock_delete_product.assert_awaited_once_with("123456789")
+
+
 @pytest.mark.asyncio
 @patch("src.repository.product_repository.ProductRepository.lookup_products")
 async def test_search_product(mock_lookup_products, create_customer):
@@ -125,3 +229,45 @@ async def test_search_product(mock_lookup_products, create_customer):
     for item in response_json:
         for field in fields:
             assert field in item
+
+
+@pytest.mark.asyncio
+async def test_search_product_in_search_index(create_customer, db):
+    db.add_all(
+        [
+            ProductSearch(
+                barcode=str(barcode),
+                name=name,
+                type="gram",
+                proteins=10,
+                fats=10,
+                carbs=10,
+                calories=170,
+                vendor_name=vendor_name,
+                user_id=str(create_customer.id),
+            )
+            for barcode, name, vendor_name in [
+                (1, "Greek yogurt", "Milk Farm"),
+                (2, "Yogurt drink", "Milk Farm"),
+                (3, "Oatmeal", "Yogurt Factory"),
+                (4, "Rice", "Milk Farm"),
+            ]
+        ]
+    )
+    await db.flush()
+
+    response = await make_test_http_request(
+        url="api/nutrition/products/lookup/yogurt",
+        method="get",
+        username=create_customer.username,
+    )
+    assert response.status_code == 200
+    # names starting with the text go first
+    assert [product["barcode"] for product in response.json()] == ["2", "1", "3"]
+
+    response = await make_test_http_request(
+        url="api/nutrition/products/lookup/yogurt?limit=1&offset=1",
+        method="get",
+        username=create_customer.username,
+    )
+    assert [product["barcode"] for product in response.json()] == ["1"]
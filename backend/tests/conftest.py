@@ -18,6 +18,7 @@ async def make_test_http_request(
     username: str | None = None,
     data: dict | None = None,
     json: dict | None = None,
+    files: dict | None = None,
 ) -> Response:
     """
     Make tests http request to server,
@@ -29,6 +30,7 @@ async def make_test_http_request(
         username: authed user who makes http request
         data: data sent to server
         json: data to signup
+        files: files uploaded to server
     """
     headers = None
     if username:
@@ -41,8 +43,10 @@ async def make_test_http_request(
             case "get":
                 response = await ac.get(url, headers=headers)
             case "post":
-                kwargs = {"headers": headers, "data": data, "json": json}
+                kwargs = {"headers": headers, "data": data, "json": json, "files": files}
                 response = await ac.post(url, **{key: val for key, val in kwargs.items() if val})
+            case "delete":
+                response = await ac.delete(url, headers=headers)
             case _:
                 raise ValueError("Unexpected method")
 
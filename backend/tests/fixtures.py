@@ -3,12 +3,14 @@ import uuid
 from datetime import date, timedelta
 
 import pytest_asyncio
-from sqlalchemy import select
+from sqlalchemy import select, event, delete
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import create_async_engine
 
 from src.main import app
+from src.database import SessionLocal
 from src.shared.dependencies import provide_database_unit_of_work
+from src.shared.cache import principal_cache, product_cache
 from src import (
     ExercisesOnTraining,
     Training,
@@ -395,6 +397,13 @@ async def create_diets(create_training_plans, db):
         )
     ]
 
+    for diet_day in diet_days_list:
+        meals = [diet_day.breakfast, diet_day.lunch, diet_day.dinner, diet_day.snacks]
+        diet_day.consumed_calories = sum(meal.get("total_calories", 0) for meal in meals)
+        diet_day.consumed_proteins = sum(meal.get("total_proteins", 0) for meal in meals)
+        diet_day.consumed_fats = sum(meal.get("total_fats", 0) for meal in meals)
+        diet_day.consumed_carbs = sum(meal.get("total_carbs", 0) for meal in meals)
+
     db.add_all(diet_days_list)
 
     await db.commit()
@@ -538,6 +547,21 @@ async def db_engine():
     yield engine
 
 
+@pytest_asyncio.fixture()
+async def query_counter(db_engine):
+    """
+    Collects SQL statements executed by the test database engine
+    """
+    statements = []
+
+    def collect_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", collect_statement)
+    yield statements
+    event.remove(db_engine.sync_engine, "before_cursor_execute", collect_statement)
+
+
 @pytest_asyncio.fixture(scope="function")
 async def db(db_engine):
     connection = await db_engine.connect()
@@ -545,6 +569,8 @@ async def db(db_engine):
 
     db = TestingSessionLocal(bind=connection)
     app.dependency_overrides[provide_database_unit_of_work] = lambda: db
+    principal_cache.clear()
+    product_cache.clear()
 
     yield db
 
@@ -555,3 +581,32 @@ async def db(db_engine):
 @pytest_asyncio.fixture(scope="function")
 async def client(db):
     app.dependency_overrides[provide_database_unit_of_work] = lambda: db
+
+
+@pytest_asyncio.fixture()
+async def committed_diet() -> Diet:
+    """
+    Customer diet committed outside of the test transaction,
+    for tests running requests in their own sessions as it goes in production
+    """
+    app.dependency_overrides.pop(provide_database_unit_of_work, None)
+    principal_cache.clear()
+
+    async with SessionLocal() as session:
+        coach = Coach(username="+79990001122", first_name="Concurrent", password="password", fcm_token="token")
+        customer = Customer(
+            username="+79990001133", first_name="Concurrent", last_name="Customer", password="1234", coach=coach,
+        )
+        training_plan = TrainingPlan(start_date=date.today(), end_date=date.today(), customer=customer)
+        diet = Diet(
+            total_proteins=100, total_fats=50, total_carbs=200, total_calories=1650, training_plans=training_plan,
+        )
+        session.add_all([coach, customer, training_plan, diet])
+        await session.commit()
+
+    yield diet
+
+    async with SessionLocal() as session:
+        await session.execute(delete(Coach).where(Coach.id == coach.id))
+        await session.commit()
+    principal_cache.clear()
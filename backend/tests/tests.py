@@ -1,7 +1,30 @@
+import io
+import os
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch
+
 import pytest
 from httpx import AsyncClient
+from firebase_admin import exceptions, messaging
+from PIL import Image
+from sqlalchemy import select, text, update
 
+from src import Coach, OutboxMessage
 from src.main import app
+from src.repository.coach_repository import CoachRepository
+from src.repository.customer_repository import CustomerRepository
+from src.repository.outbox_repository import OutboxRepository
+from src.service.notification_service import NotificationService
+from src.service.outbox_dispatcher import OutboxDispatcher
+from src.supplier.firebase_supplier import PushDeliveryResult, PushFirebaseNotificator
+from src.supplier.kafka_supplier import KafkaSupplier
+from src.database import create_database_engine, warm_up_engine
+from src.shared.cache import token_cache
+from src.shared.dependencies import ServiceContainer
+from src.shared.static_files import ImmutableStaticFiles
+from src.shared.images import avatar_file_name, collect_avatar_garbage, make_avatar_variants
+from src.shared.metrics import metrics
+from src.utils import create_access_token, decode_jwt_token
 
 
 @pytest.mark.asyncio
@@ -10,3 +33,335 @@ async def test_root():
         response = await ac.get("/health")
 
     assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_metrics():
+    async with AsyncClient(app=app, base_url="http://as-coach") as ac:
+        response = await ac.get("/metrics")
+
+    assert response.status_code == 200
+    assert {"counters", "timings", "gauges"} <= set(response.json())
+
+
+@pytest.mark.asyncio
+async def test_pooled_engine_reuses_warmed_up_connections():
+    pooled_engine = create_database_engine(os.environ.get("TEST_DATABASE_URL"), name="test_database")
+    try:
+        await warm_up_engine(pooled_engine, connections=2)
+        assert pooled_engine.pool.checkedin() == 2
+
+        async with pooled_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            assert pooled_engine.pool.checkedin() == 1
+
+        snapshot = metrics.snapshot()
+        assert snapshot["timings"]["database.pool.checkout_wait_seconds"]["count"] > 0
+        assert snapshot["gauges"]["test_database.pool.saturation"] == 0
+    finally:
+        await pooled_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_decoded_token_is_cached():
+    token_cache.clear()
+    token = await create_access_token("+79054445566")
+
+    first_payload = await decode_jwt_token(token)
+    second_payload = await decode_jwt_token(token)
+
+    assert first_payload is second_payload
+    assert first_payload.sub == "+79054445566"
+    assert len(token_cache) == 1
+
+
+def make_outbox_dispatcher(push_notificator, kafka_supplier) -> OutboxDispatcher:
+    return OutboxDispatcher(
+        session_factory=None,
+        outbox_repository=OutboxRepository(),
+        coach_repository=CoachRepository(),
+        customer_repository=CustomerRepository(),
+        push_notificator=push_notificator,
+        kafka_supplier=kafka_supplier,
+        batch_size=10,
+        poll_interval=1,
+        max_attempts=3,
+        max_retry_delay=60,
+        lease_duration=60,
+    )
+
+
+@pytest.mark.asyncio
+async def test_outbox_dispatcher_delivers_messages(db):
+    notification_service = NotificationService(OutboxRepository())
+    await notification_service.send_telegram_customer_invite(db, "Ivan", "@customer", "1234")
+    await notification_service.send_push_notification("fcm token", {"title": "title", "body": "body"}, uow=db)
+    await db.commit()
+
+    push_notificator = Mock(
+        send_notifications=AsyncMock(return_value=[PushDeliveryResult("fcm token", message_id="message id")])
+    )
+    kafka_supplier = Mock(send_messages=Mock(return_value=[None]))
+    dispatched = await make_outbox_dispatcher(push_notificator, kafka_supplier).dispatch_batch(db)
+
+    assert dispatched == 2
+    push_notificator.send_notifications.assert_awaited_once_with([("fcm token", {"title": "title", "body": "body"})])
+    kafka_supplier.send_messages.assert_called_once()
+    assert "@customer" in kafka_supplier.send_messages.call_args.args[0][0]
+
+    result = await db.execute(select(OutboxMessage))
+    assert result.scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_outbox_dispatcher_postpones_failed_message(db):
+    notification_service = NotificationService(OutboxRepository())
+    await notification_service.send_push_notification("fcm token", {"title": "title", "body": "body"}, uow=db)
+    await db.commit()
+
+    push_notificator = Mock(
+        send_notifications=AsyncMock(return_value=[PushDeliveryResult("fcm token", error="firebase is down")])
+    )
+    dispatcher = make_outbox_dispatcher(push_notificator, Mock())
+
+    assert await dispatcher.dispatch_batch(db) == 1
+    # the message waits for the next attempt
+    assert await dispatcher.dispatch_batch(db) == 0
+
+    result = await db.execute(select(OutboxMessage).execution_options(populate_existing=True))
+    failed_message = result.scalar_one()
+    assert failed_message.attempts == 1
+    assert failed_message.last_error == "firebase is down"
+    assert failed_message.next_attempt_at > datetime.now()
+
+
+@pytest.mark.asyncio
+async def test_outbox_dispatcher_discards_message_out_of_attempts(db):
+    notification_service = NotificationService(OutboxRepository())
+    await notification_service.send_telegram_customer_invite(db, "Ivan", "@customer", "1234")
+    await db.commit()
+    await db.execute(update(OutboxMessage).values(attempts=2))
+
+    kafka_supplier = Mock(send_messages=Mock(return_value=["kafka is down"]))
+    with patch("src.service.outbox_dispatcher.logger.error") as mock_log_error:
+        assert await make_outbox_dispatcher(Mock(), kafka_supplier).dispatch_batch(db) == 1
+
+    mock_log_error.assert_called_once()
+    result = await db.execute(select(OutboxMessage))
+    assert result.scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_outbox_dispatcher_keeps_not_acknowledged_kafka_message(db):
+    notification_service = NotificationService(OutboxRepository())
+    await notification_service.send_telegram_customer_invite(db, "Ivan", "@customer", "1234")
+    await db.commit()
+
+    # nobody listens there, so the broker never acknowledges the message
+    kafka_supplier = KafkaSupplier(
+        config={"bootstrap.servers": "localhost:1", "log_level": 0}, topic="test.topic", delivery_timeout=0.1
+    )
+    assert await make_outbox_dispatcher(Mock(), kafka_supplier).dispatch_batch(db) == 1
+    kafka_supplier.close(timeout=0)
+
+    result = await db.execute(select(OutboxMessage).execution_options(populate_existing=True))
+    failed_message = result.scalar_one()
+    assert failed_message.attempts == 1
+    assert "isn't acknowledged" in failed_message.last_error
+
+
+@pytest.mark.asyncio
+async def test_outbox_dispatcher_leases_messages_before_delivery(db):
+    notification_service = NotificationService(OutboxRepository())
+    await notification_service.send_telegram_customer_invite(db, "Ivan", "@customer", "1234")
+    await db.commit()
+
+    leased_messages = []
+
+    def send_messages(messages):
+        # the lease is committed, so another dispatcher doesn't see the message during delivery
+        leased_messages.extend(messages)
+        assert not db.in_transaction()
+        return [None]
+
+    kafka_supplier = Mock(send_messages=Mock(side_effect=send_messages))
+    assert await make_outbox_dispatcher(Mock(), kafka_supplier).dispatch_batch(db) == 1
+    assert len(leased_messages) == 1
+
+
+def test_kafka_supplier_flushes_batch_once():
+    producer = Mock()
+
+    def flush(timeout):
+        # the broker acknowledges all messages except the rejected one
+        for call in producer.produce.call_args_list:
+            message = call.args[1]
+            error = "rejected" if message == b"second" else None
+            call.kwargs["on_delivery"](error, Mock(value=Mock(return_value=message)))
+        return 0
+
+    producer.flush.side_effect = flush
+    kafka_supplier = KafkaSupplier(config={}, topic="test.topic")
+    kafka_supplier._producer = producer
+
+    errors = kafka_supplier.send_messages(["first", "second", "third"])
+
+    assert producer.produce.call_count == 3
+    producer.flush.assert_called_once_with(10)
+    assert errors[0] is None
+    assert "rejected" in errors[1]
+    assert errors[2] is None
+
+
+@pytest.mark.asyncio
+async def test_outbox_dispatcher_prunes_dead_fcm_tokens(create_coach, db):
+    notification_service = NotificationService(OutboxRepository())
+    await notification_service.send_push_notification(
+        create_coach.fcm_token, {"title": "title", "body": "body"}, uow=db,
+    )
+    await db.commit()
+
+    push_notificator = Mock(
+        send_notifications=AsyncMock(
+            return_value=[PushDeliveryResult(create_coach.fcm_token, error="unregistered", is_token_dead=True)]
+        )
+    )
+    assert await make_outbox_dispatcher(push_notificator, Mock()).dispatch_batch(db) == 1
+
+    result = await db.execute(select(Coach.fcm_token).where(Coach.id == create_coach.id))
+    assert result.scalar_one() == ""
+    result = await db.execute(select(OutboxMessage))
+    assert result.scalars().all() == []
+
+
+@pytest.mark.asyncio
+@patch("src.supplier.firebase_supplier.firebase_admin._apps", {"[DEFAULT]": "app"})
+@patch("src.supplier.firebase_supplier.messaging.send_each")
+async def test_firebase_notifications_are_sent_in_batches(mock_send_each):
+    def send_each(messages):
+        return Mock(
+            responses=[
+                Mock(success=False, exception=messaging.UnregisteredError("unregistered"))
+                if message.token == "dead token"
+                else Mock(success=True, message_id=f"message {message.token}")
+                for message in messages
+            ]
+        )
+
+    mock_send_each.side_effect = send_each
+    data = {"title": "title", "body": "body"}
+    notifications = [(f"token {number}", data) for number in range(600)] + [("dead token", data), ("token", {})]
+
+    results = await PushFirebaseNotificator().send_notifications(notifications)
+
+    assert mock_send_each.call_count == 2
+    assert [result.message_id for result in results[:600]] == [f"message token {number}" for number in range(600)]
+    assert results[600].is_token_dead
+    assert results[601].is_invalid and not results[601].is_token_dead
+
+
+@pytest.mark.asyncio
+@patch("src.supplier.firebase_supplier.firebase_admin._apps", {"[DEFAULT]": "app"})
+@patch("src.supplier.firebase_supplier.messaging.send_each")
+async def test_firebase_failed_batch_does_not_fail_sent_batches(mock_send_each):
+    mock_send_each.side_effect = [
+        Mock(responses=[Mock(success=True, message_id="message id")] * 500),
+        exceptions.UnavailableError("firebase is down"),
+    ]
+    data = {"title": "title", "body": "body"}
+    notifications = [("", data)] + [(f"token {number}", data) for number in range(600)]
+
+    results = await PushFirebaseNotificator().send_notifications(notifications)
+
+    assert results[0].is_invalid and "Message.token" in results[0].error
+    assert all(result.message_id == "message id" for result in results[1:501])
+    assert all(result.error == "firebase is down" and not result.is_invalid for result in results[501:])
+
+
+@pytest.mark.asyncio
+async def test_outbox_dispatcher_finishes_invalid_push(db):
+    notification_service = NotificationService(OutboxRepository())
+    await notification_service.send_push_notification("fcm token", {}, uow=db)
+    await db.commit()
+
+    push_notificator = Mock(
+        send_notifications=AsyncMock(
+            return_value=[PushDeliveryResult("fcm token", error="no title", is_invalid=True)]
+        )
+    )
+    assert await make_outbox_dispatcher(push_notificator, Mock()).dispatch_batch(db) == 1
+
+    result = await db.execute(select(OutboxMessage))
+    assert result.scalars().all() == []
+
+
+def test_kafka_producer_is_created_on_first_message():
+    kafka_supplier = KafkaSupplier(config={"bootstrap.servers": "localhost:29092"}, topic="test.topic")
+    # nothing to flush, producer isn't created yet
+    kafka_supplier.close()
+    assert kafka_supplier._producer is None
+
+    assert kafka_supplier.producer is kafka_supplier.producer
+
+
+def test_reused_avatar_variants_are_renewed(tmp_path):
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 200)).save(buffer, "JPEG")
+    make_avatar_variants(buffer.getvalue(), str(tmp_path), "a" * 32, (140,))
+    for variant in tmp_path.iterdir():
+        os.utime(variant, (0, 0))
+
+    # the same photo is uploaded again, so its variants must survive the garbage collection
+    make_avatar_variants(buffer.getvalue(), str(tmp_path), "a" * 32, (140,))
+
+    assert collect_avatar_garbage(str(tmp_path), set(), grace_seconds=3600) == []
+
+
+@pytest.mark.asyncio
+async def test_only_avatars_are_served_as_immutable(tmp_path):
+    (tmp_path / avatar_file_name("a" * 32, 140)).write_bytes(b"avatar")
+    (tmp_path / "robots.txt").write_bytes(b"not an avatar")
+
+    async with AsyncClient(app=ImmutableStaticFiles(directory=str(tmp_path)), base_url="http://as-coach") as ac:
+        response = await ac.get(f"/{avatar_file_name('a' * 32, 140)}")
+        assert "immutable" in response.headers["cache-control"]
+
+        response = await ac.get("/robots.txt")
+        assert response.status_code == 200
+        assert "cache-control" not in response.headers
+
+
+def test_avatar_garbage_collection_keeps_referenced_variants(tmp_path):
+    referenced_digest, superseded_digest = "a" * 32, "b" * 32
+    for digest in (referenced_digest, superseded_digest):
+        for extension in ("jpeg", "webp"):
+            (tmp_path / avatar_file_name(digest, 140, extension)).write_bytes(b"avatar")
+    (tmp_path / "79990000000_01_01_2024_10_00_00.jpeg").write_bytes(b"legacy avatar")
+    (tmp_path / "robots.txt").write_bytes(b"not an avatar")
+
+    referenced_files = {avatar_file_name(referenced_digest, 140)}
+    assert collect_avatar_garbage(str(tmp_path), referenced_files, grace_seconds=3600) == []
+
+    removed = collect_avatar_garbage(str(tmp_path), referenced_files, grace_seconds=-1)
+
+    assert sorted(removed) == sorted([
+        avatar_file_name(superseded_digest, 140, "jpeg"),
+        avatar_file_name(superseded_digest, 140, "webp"),
+        "79990000000_01_01_2024_10_00_00.jpeg",
+    ])
+    assert sorted(os.listdir(tmp_path)) == sorted([
+        avatar_file_name(referenced_digest, 140, "jpeg"),
+        avatar_file_name(referenced_digest, 140, "webp"),
+        "robots.txt",
+    ])
+
+
+def test_service_container_shares_repositories():
+    container = ServiceContainer()
+    container.build()
+
+    assert container.diet_service.diet_repository is container.diet_repository
+    assert container.diet_service.product_service is container.product_service
+    assert container.training_plan_service.diet_service is container.diet_service
+    assert container.training_plan_service.training_service.training_repository is container.training_repository
+    assert container.library_service.exercise_repository is container.exercise_repository